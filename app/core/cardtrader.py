@@ -0,0 +1,136 @@
+import logging
+import time
+from datetime import datetime
+from typing import List, Optional
+from uuid import UUID, uuid5
+
+import httpx
+
+from app.core import metrics
+
+
+logger = logging.getLogger(__name__)
+
+CARDTRADER_REQUEST_SECONDS = metrics.histogram(
+    "cardtrader_request_duration_seconds",
+    "Time spent on CardTrader API requests",
+    ["outcome"]
+)
+
+# Namespace of the card IDs derived from CardTrader blueprint IDs
+BLUEPRINT_NAMESPACE = UUID("5b7c3f0e-7d52-5c1e-9a55-2f0c3c8e6a11")
+
+# CardTrader condition names -> collection condition codes
+CONDITIONS = {
+    "Mint": "M",
+    "Near Mint": "NM",
+    "Slightly Played": "LP",
+    "Moderately Played": "MP",
+    "Played": "HP",
+    "Heavily Played": "HP",
+    "Poor": "HP",
+}
+
+
+def blueprint_card_id(blueprint_id: int) -> UUID:
+    """
+    Card ID of a CardTrader blueprint.
+
+    Args:
+        blueprint_id: CardTrader blueprint (printing) ID
+
+    Returns:
+        Deterministic UUID, the same for every user
+    """
+    return uuid5(BLUEPRINT_NAMESPACE, str(blueprint_id))
+
+
+def product_to_item(product: dict) -> dict:
+    """
+    Map a CardTrader product (listing) to collection item fields.
+
+    Args:
+        product: Product object from the CardTrader API
+
+    Returns:
+        Dict of ItemCreate fields
+    """
+    properties = product.get("properties_hash") or {}
+    condition = properties.get("condition")
+    return {
+        "cardtrader_id": product["id"],
+        "card_id": blueprint_card_id(product["blueprint_id"]),
+        "quantity": product["quantity"],
+        "condition": CONDITIONS.get(condition, condition or "NM"),
+        "language": properties.get("mtg_language") or "en",
+        "is_foil": bool(properties.get("mtg_foil")),
+        "is_signed": bool(properties.get("signed")),
+        "is_altered": bool(properties.get("altered")),
+        "source": "cardtrader",
+    }
+
+
+class CardTraderClient:
+    """
+    Minimal CardTrader API client for the inventory sync.
+
+    One instance (and one connection pool) is shared by every user being
+    synchronized; the user's API token is passed per call.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float = 30.0,
+        client: Optional[httpx.AsyncClient] = None
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self._client = client
+        self._owns_client = client is None
+
+    async def export_products(
+        self,
+        token: str,
+        updated_since: Optional[datetime] = None
+    ) -> List[dict]:
+        """
+        Fetch the user's listings, only those changed since a time if given.
+
+        Args:
+            token: The user's CardTrader API token
+            updated_since: Only return listings updated at or after this time
+
+        Returns:
+            List of product objects
+
+        Raises:
+            httpx.HTTPError: If the request fails
+        """
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.timeout)
+
+        params = {}
+        if updated_since is not None:
+            params["updated_since"] = updated_since.isoformat()
+
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            response = await self._client.get(
+                f"{self.base_url}/products/export",
+                params=params,
+                headers={"Authorization": f"Bearer {token}"}
+            )
+            response.raise_for_status()
+            products = response.json()
+            outcome = "success"
+            return products
+        finally:
+            CARDTRADER_REQUEST_SECONDS.labels(outcome).observe(time.perf_counter() - started)
+
+    async def close(self) -> None:
+        """Close the HTTP client if this instance created it."""
+        if self._client is not None and self._owns_client:
+            await self._client.aclose()
+        self._client = None
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Literal, Optional
 from pydantic_settings import BaseSettings
 from pydantic import Field, field_validator
 
@@ -12,6 +12,60 @@ class Settings(BaseSettings):
         description="MySQL database connection URL"
     )
     
+    DB_POOL_SIZE: int = Field(
+        default=5,
+        description="Connections kept open in the pool"
+    )
+    
+    DB_MAX_OVERFLOW: int = Field(
+        default=10,
+        description="Extra connections opened above DB_POOL_SIZE under load"
+    )
+    
+    DB_POOL_TIMEOUT: float = Field(
+        default=30.0,
+        description="Seconds to wait for a free connection before failing"
+    )
+    
+    DB_POOL_RECYCLE: int = Field(
+        default=3600,
+        description="Seconds after which a connection is replaced (keep below wait_timeout)"
+    )
+    
+    DB_PRE_PING: Literal["always", "idle", "never"] = Field(
+        default="idle",
+        description="Liveness check on checkout: every time, only after DB_PRE_PING_IDLE_SECONDS idle, or never"
+    )
+    
+    DB_PRE_PING_IDLE_SECONDS: float = Field(
+        default=30.0,
+        description="Idle time after which a connection is pinged on checkout (DB_PRE_PING=idle)"
+    )
+    
+    # Read replicas
+    READ_DATABASE_URLS: List[str] = Field(
+        default=[],
+        description="Replica connection URLs for GET routes (empty = read from the primary)"
+    )
+    
+    READ_YOUR_WRITES_SECONDS: float = Field(
+        default=5.0,
+        description="Seconds after a write during which a user's reads are fenced on the written version"
+    )
+    
+    REPLICA_RETRY_SECONDS: float = Field(
+        default=30.0,
+        description="Seconds a replica that failed to connect is skipped"
+    )
+    
+    @field_validator("READ_DATABASE_URLS", mode="before")
+    @classmethod
+    def parse_read_database_urls(cls, v):
+        if isinstance(v, str):
+            import json
+            return json.loads(v)
+        return v
+    
     # JWT Authentication
     AUTH_JWKS_URL: str = Field(
         ...,
@@ -28,6 +82,58 @@ class Settings(BaseSettings):
         description="Expected JWT issuer"
     )
     
+    JWKS_CACHE_TTL: int = Field(
+        default=3600,
+        description="Seconds after which the JWKS must be refetched"
+    )
+    
+    JWKS_REFRESH_AHEAD: int = Field(
+        default=300,
+        description="Seconds before expiry when the JWKS is refreshed in the background"
+    )
+    
+    JWKS_MIN_REFETCH_INTERVAL: int = Field(
+        default=30,
+        description="Minimum seconds between refetches triggered by an unknown 'kid'"
+    )
+    
+    JWKS_FETCH_TIMEOUT: float = Field(
+        default=10.0,
+        description="Timeout in seconds for JWKS HTTP requests"
+    )
+    
+    TOKEN_CACHE_MAXSIZE: int = Field(
+        default=10000,
+        description="Maximum number of verified tokens kept in memory"
+    )
+    
+    TOKEN_CACHE_TTL: int = Field(
+        default=300,
+        description="Maximum seconds a verified token is cached (capped at its 'exp')"
+    )
+    
+    TOKEN_NEGATIVE_CACHE_TTL: int = Field(
+        default=30,
+        description="Seconds a rejected token is cached"
+    )
+    
+    # List count cache
+    COUNT_CACHE_MAXSIZE: int = Field(
+        default=10000,
+        description="Maximum number of users whose list totals are kept in memory"
+    )
+    
+    COUNT_CACHE_FILTERS: int = Field(
+        default=32,
+        ge=1,
+        description="Filter combinations whose totals are kept per user (least recently used dropped)"
+    )
+    
+    COUNT_CACHE_TTL: int = Field(
+        default=60,
+        description="Seconds a cached list total is reused (bounds staleness across workers)"
+    )
+    
     # CORS
     CORS_ORIGINS: List[str] = Field(
         default=[
@@ -49,6 +155,116 @@ class Settings(BaseSettings):
             return json.loads(v)
         return v
     
+    # Administration
+    ADMIN_USER_IDS: List[str] = Field(
+        default=[],
+        description="User IDs ('sub' claims) allowed to call admin endpoints"
+    )
+    
+    @field_validator("ADMIN_USER_IDS", mode="before")
+    @classmethod
+    def parse_admin_user_ids(cls, v):
+        if isinstance(v, str):
+            import json
+            return json.loads(v)
+        return v
+    
+    # Metrics
+    METRICS_TOKEN: str = Field(
+        default="",
+        description="Bearer token required by /metrics (open when empty)"
+    )
+    
+    # Query profiler
+    QUERY_PROFILER_ENABLED: bool = Field(
+        default=False,
+        description="Collect per-statement-fingerprint stats and log slow queries"
+    )
+    
+    QUERY_PROFILER_SAMPLE_RATE: float = Field(
+        default=0.1,
+        ge=0.0,
+        le=1.0,
+        description="Fraction of statements added to the fingerprint stats"
+    )
+    
+    QUERY_PROFILER_SLOW_MS: float = Field(
+        default=200.0,
+        description="Statements slower than this are always logged with their route"
+    )
+    
+    QUERY_PROFILER_MAX_FINGERPRINTS: int = Field(
+        default=500,
+        description="Maximum number of distinct statement fingerprints tracked"
+    )
+    
+    QUERY_PROFILER_WINDOW: int = Field(
+        default=1000,
+        description="Latest samples kept per fingerprint for the p99"
+    )
+    
+    # CardTrader sync
+    CARDTRADER_API_URL: str = Field(
+        default="https://api.cardtrader.com/api/v2",
+        description="Base URL of the CardTrader API"
+    )
+    
+    CARDTRADER_TIMEOUT: float = Field(
+        default=30.0,
+        description="Seconds to wait for a CardTrader API response"
+    )
+    
+    CARDTRADER_SYNC_CONCURRENCY: int = Field(
+        default=4,
+        ge=1,
+        description="Users synchronized at the same time"
+    )
+    
+    CARDTRADER_SYNC_BATCH_SIZE: int = Field(
+        default=500,
+        ge=1,
+        description="Listings written per transaction"
+    )
+    
+    CARDTRADER_FULL_SYNC_HOURS: float = Field(
+        default=24.0,
+        description="Hours after which a full listing is pulled (to detect removed listings)"
+    )
+    
+    CARDTRADER_SYNC_OVERLAP_SECONDS: float = Field(
+        default=300.0,
+        description="Seconds incremental pulls reach back before the watermark (clock skew)"
+    )
+    
+    # CSV import
+    IMPORT_CHUNK_SIZE: int = Field(
+        default=2000,
+        ge=1,
+        description="CSV rows written per transaction"
+    )
+    
+    IMPORT_MAX_BYTES: int = Field(
+        default=64 * 1024 * 1024,
+        description="Largest CSV upload accepted"
+    )
+    
+    IMPORT_MAX_ERRORS: int = Field(
+        default=100,
+        description="Rejected rows reported per import (the rest are only counted)"
+    )
+    
+    IMPORT_TMP_DIR: Optional[str] = Field(
+        default=None,
+        description="Directory uploads are spooled to (system temp dir if unset)"
+    )
+    
+    # Change feed
+    TOMBSTONE_RETENTION_DAYS: int = Field(
+        default=30,
+        ge=1,
+        description="Days deleted items are reported by the change feed (older tokens expire)"
+    )
+    
     # Application
     APP_NAME: str = Field(
         default="Collection Service",
@@ -0,0 +1,211 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+
+import httpx
+from fastapi import HTTPException, status
+
+from app.core import metrics
+
+
+logger = logging.getLogger(__name__)
+
+JWKS_FETCH_SECONDS = metrics.histogram(
+    "jwks_fetch_duration_seconds",
+    "Time spent fetching the JWKS document",
+    ["outcome"]
+)
+
+
+class JWKSManager:
+    """
+    In-process store of the signing keys published at a JWKS URL.
+
+    - Keys are indexed by 'kid'
+    - Keys are refreshed in the background shortly before they expire
+    - Concurrent fetches are collapsed into a single HTTP call
+    - An unknown 'kid' triggers a refetch, at most once per
+      min_refetch_interval seconds
+    - Expired keys keep being served while a background refresh runs, at
+      most once per min_refetch_interval seconds, so an unreachable auth
+      server does not slow requests down (stale-while-error)
+    """
+
+    def __init__(
+        self,
+        jwks_url: str,
+        ttl: float = 3600,
+        refresh_ahead: float = 300,
+        min_refetch_interval: float = 30,
+        timeout: float = 10.0,
+        client: Optional[httpx.AsyncClient] = None
+    ):
+        self.jwks_url = jwks_url
+        self.ttl = ttl
+        self.refresh_ahead = min(refresh_ahead, ttl)
+        self.min_refetch_interval = min_refetch_interval
+        self.timeout = timeout
+        self.fetch_count = 0
+
+        self._client = client
+        self._document: Optional[dict] = None
+        self._keys: Dict[str, dict] = {}
+        self._fetched_at: Optional[float] = None
+        self._last_attempt: Optional[float] = None
+        self._inflight: Optional[asyncio.Future] = None
+        self._background: Optional[asyncio.Task] = None
+        self._loop_task: Optional[asyncio.Task] = None
+
+    @property
+    def age(self) -> Optional[float]:
+        """Seconds since the keys were last fetched (None if never)."""
+        if self._fetched_at is None:
+            return None
+        return time.monotonic() - self._fetched_at
+
+    async def get_jwks(self) -> dict:
+        """
+        Get the current JWKS document, fetching it if needed.
+
+        Returns:
+            Dict containing the JWKS
+
+        Raises:
+            HTTPException: If no keys could ever be fetched
+        """
+        await self._ensure_fresh()
+        return self._document
+
+    async def get_key(self, kid: str) -> Optional[dict]:
+        """
+        Get the public key for a 'kid'.
+
+        Args:
+            kid: Key ID from the token header
+
+        Returns:
+            Public key dict or None if the kid is not published
+
+        Raises:
+            HTTPException: If no keys could ever be fetched
+        """
+        await self._ensure_fresh()
+
+        key = self._keys.get(kid)
+        if key is not None:
+            return key
+
+        # Possibly a freshly rotated key: refetch, but not on every request
+        if (
+            self._last_attempt is None
+            or time.monotonic() - self._last_attempt >= self.min_refetch_interval
+        ):
+            try:
+                await self.refresh()
+            except httpx.HTTPError:
+                pass
+
+        return self._keys.get(kid)
+
+    async def refresh(self) -> None:
+        """
+        Fetch the JWKS now; concurrent callers share the same request.
+
+        Raises:
+            httpx.HTTPError: If the fetch fails
+        """
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.ensure_future(self._fetch())
+        await asyncio.shield(self._inflight)
+
+    async def start(self) -> None:
+        """Start the periodic background refresh loop."""
+        if self._loop_task is None or self._loop_task.done():
+            self._loop_task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        """Stop background work and close the HTTP client."""
+        for task in (self._loop_task, self._background):
+            if task is not None and not task.done():
+                task.cancel()
+        self._loop_task = None
+        self._background = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _ensure_fresh(self) -> None:
+        if self._document is None:
+            # Nothing to serve yet: the caller has to wait for the keys
+            try:
+                await self.refresh()
+            except httpx.HTTPError as e:
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail=f"Failed to fetch JWKS: {str(e)}"
+                )
+        elif self.age >= self.ttl - self.refresh_ahead:
+            self._refresh_in_background()
+
+    def _refresh_in_background(self) -> None:
+        if self._background is not None and not self._background.done():
+            return
+        if (
+            self._last_attempt is not None
+            and time.monotonic() - self._last_attempt < self.min_refetch_interval
+        ):
+            return
+        self._background = asyncio.create_task(self._background_refresh())
+
+    async def _background_refresh(self) -> None:
+        try:
+            await self.refresh()
+        except httpx.HTTPError as e:
+            if self.age >= self.ttl:
+                logger.warning("JWKS refresh failed, serving stale keys: %s", e)
+            else:
+                logger.warning("Background JWKS refresh failed: %s", e)
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            age = self.age
+            if age is None:
+                delay = 0
+            else:
+                delay = max(self.ttl - self.refresh_ahead - age, 0)
+            await asyncio.sleep(delay)
+            try:
+                await self.refresh()
+            except httpx.HTTPError as e:
+                logger.warning("Scheduled JWKS refresh failed: %s", e)
+                await asyncio.sleep(self.min_refetch_interval)
+
+    async def _fetch(self) -> None:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.timeout)
+
+        self._last_attempt = time.monotonic()
+        self.fetch_count += 1
+
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            response = await self._client.get(self.jwks_url)
+            response.raise_for_status()
+            try:
+                document = response.json()
+                keys = {
+                    key["kid"]: key
+                    for key in document.get("keys", [])
+                    if key.get("kid")
+                }
+            except (ValueError, AttributeError, TypeError) as e:
+                raise httpx.DecodingError(f"Malformed JWKS document: {e}")
+            outcome = "success"
+        finally:
+            JWKS_FETCH_SECONDS.labels(outcome).observe(time.perf_counter() - started)
+
+        self._document = document
+        self._keys = keys
+        self._fetched_at = time.monotonic()
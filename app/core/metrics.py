@@ -0,0 +1,172 @@
+from bisect import bisect_left
+from itertools import accumulate
+from typing import Callable, Dict, List, Sequence, Tuple
+
+
+# Seconds; from a warm pool checkout up to a pool/statement timeout
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+
+class Histogram:
+    """
+    In-process histogram with fixed upper bounds.
+
+    Bucket counts are cumulative (Prometheus semantics): the bucket with
+    upper bound ``le`` counts every observation <= ``le``.
+    """
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Record one observation."""
+        self._counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> list:
+        """(upper bound, cumulative count) pairs, ending with +Inf."""
+        bounds = [str(bound) for bound in self.buckets] + ["+Inf"]
+        return list(zip(bounds, accumulate(self._counts)))
+
+    def snapshot(self) -> dict:
+        """JSON-friendly view of the histogram."""
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "buckets": dict(self.cumulative())
+        }
+
+
+class Value:
+    """A single counter or gauge value."""
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Family:
+    """
+    A named metric with one child per combination of label values.
+
+    Children are created on first use and looked up by a plain tuple, so
+    recording a sample costs one dict lookup plus the update itself.
+    """
+
+    def __init__(
+        self,
+        kind: str,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        factory: Callable[[], object] = Value
+    ):
+        self.kind = kind
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._factory = factory
+        self._children: Dict[Tuple, object] = {}
+
+    def labels(self, *values):
+        """Return the child for these label values (in labelnames order)."""
+        child = self._children.get(values)
+        if child is None:
+            child = self._children[values] = self._factory()
+        return child
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}"
+        ]
+        for values, child in list(self._children.items()):
+            labels = dict(zip(self.labelnames, (str(value) for value in values)))
+            if isinstance(child, Histogram):
+                lines.extend(histogram_samples(self.name, labels, child))
+            else:
+                lines.append(sample(self.name, labels, child.value))
+        return lines
+
+
+_families: List[Family] = []
+_collectors: List[Callable[[], List[str]]] = []
+
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Family:
+    """Create and register a counter family."""
+    family = Family("counter", name, documentation, labelnames)
+    _families.append(family)
+    return family
+
+
+def gauge(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Family:
+    """Create and register a gauge family."""
+    family = Family("gauge", name, documentation, labelnames)
+    _families.append(family)
+    return family
+
+
+def histogram(
+    name: str,
+    documentation: str,
+    labelnames: Sequence[str] = (),
+    buckets: Sequence[float] = LATENCY_BUCKETS
+) -> Family:
+    """Create and register a histogram family."""
+    family = Family("histogram", name, documentation, labelnames, lambda: Histogram(buckets))
+    _families.append(family)
+    return family
+
+
+def register_collector(collector: Callable[[], List[str]]) -> None:
+    """Register a callable returning exposition lines computed at scrape time."""
+    _collectors.append(collector)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def sample(name: str, labels: Dict[str, str], value: float) -> str:
+    """Format one sample line of the text exposition format."""
+    if labels:
+        rendered = ",".join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+        return f"{name}{{{rendered}}} {value}"
+    return f"{name} {value}"
+
+
+def histogram_samples(name: str, labels: Dict[str, str], histogram: Histogram) -> List[str]:
+    """Format the _bucket/_sum/_count lines of a histogram."""
+    lines = [
+        sample(f"{name}_bucket", {**labels, "le": bound}, count)
+        for bound, count in histogram.cumulative()
+    ]
+    lines.append(sample(f"{name}_sum", labels, histogram.sum))
+    lines.append(sample(f"{name}_count", labels, histogram.count))
+    return lines
+
+
+def render_metrics() -> str:
+    """Render every registered metric in the Prometheus text format."""
+    lines: List[str] = []
+    for family in _families:
+        lines.extend(family.render())
+    for collector in _collectors:
+        lines.extend(collector())
+    return "\n".join(lines) + "\n"
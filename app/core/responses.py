@@ -0,0 +1,29 @@
+from typing import Optional
+
+from fastapi import status
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+
+def validated_response(
+    model: BaseModel,
+    status_code: int = status.HTTP_200_OK,
+    headers: Optional[dict] = None
+) -> ORJSONResponse:
+    """
+    Encode an already validated response model with orjson.
+    
+    Returning a Response makes FastAPI skip the second response_model
+    validation and the jsonable_encoder pass, so every row is validated
+    once. The model is dumped in JSON mode, so UUIDs and datetimes keep
+    pydantic's wire format (UTC as "Z", not orjson's "+00:00").
+    
+    Args:
+        model: Response model, validated by the route
+        status_code: HTTP status code
+        headers: Extra response headers
+        
+    Returns:
+        JSON response with the model's fields
+    """
+    return ORJSONResponse(model.model_dump(mode="json"), status_code=status_code, headers=headers)
@@ -1,13 +1,101 @@
-from typing import Optional
+from typing import Dict, Optional, Tuple
 from fastapi import HTTPException, status
 from jose import jwt, JWTError
-from cachetools import TTLCache
-import httpx
+from cachetools import TLRUCache
+import hashlib
+import time
 
+from app.core import metrics
+from app.core.jwks import JWKSManager
 
-# Cache for JWKS (24 hour TTL)
-_jwks_cache = TTLCache(maxsize=1, ttl=86400)
-_jwks_client = None
+
+# One key store per JWKS URL
+_jwks_managers: Dict[str, JWKSManager] = {}
+
+# Cache of verification results, keyed by token hash. Entries are
+# (payload, kid, error, expires_at) and expire at their own expires_at.
+_token_cache: Optional[TLRUCache] = None
+_token_cache_stats = {"hits": 0, "misses": 0}
+
+TOKEN_VERIFY_SECONDS = metrics.histogram(
+    "token_verify_duration_seconds",
+    "Time spent verifying bearer tokens",
+    ["outcome", "cache"]
+)
+
+
+def _get_token_cache() -> TLRUCache:
+    """Return the verified-token cache, creating it on first use."""
+    global _token_cache
+    
+    if _token_cache is None:
+        from app.core.config import settings
+        
+        _token_cache = TLRUCache(
+            maxsize=settings.TOKEN_CACHE_MAXSIZE,
+            ttu=lambda key, value, now: value[3],
+            timer=time.time
+        )
+    return _token_cache
+
+
+def _token_cache_key(token: str, audience: str, issuer: str) -> Tuple[str, str, str]:
+    """Build the cache key for a token; the raw token is never stored."""
+    return (hashlib.sha256(token.encode()).hexdigest(), audience, issuer)
+
+
+def get_token_cache_stats() -> dict:
+    """
+    Get verified-token cache counters.
+    
+    Returns:
+        Dict with hits, misses and current size
+    """
+    return {
+        **_token_cache_stats,
+        "size": len(_token_cache) if _token_cache is not None else 0
+    }
+
+
+def reset_token_cache() -> None:
+    """Drop all cached verification results and reset the counters."""
+    global _token_cache
+    
+    _token_cache = None
+    _token_cache_stats["hits"] = 0
+    _token_cache_stats["misses"] = 0
+
+
+def get_jwks_manager(jwks_url: str) -> JWKSManager:
+    """
+    Get the key store for a JWKS URL, creating it on first use.
+    
+    Args:
+        jwks_url: URL to fetch JWKS from
+        
+    Returns:
+        JWKSManager for the URL
+    """
+    manager = _jwks_managers.get(jwks_url)
+    if manager is None:
+        from app.core.config import settings
+        
+        manager = JWKSManager(
+            jwks_url,
+            ttl=settings.JWKS_CACHE_TTL,
+            refresh_ahead=settings.JWKS_REFRESH_AHEAD,
+            min_refetch_interval=settings.JWKS_MIN_REFETCH_INTERVAL,
+            timeout=settings.JWKS_FETCH_TIMEOUT
+        )
+        _jwks_managers[jwks_url] = manager
+    return manager
+
+
+async def close_jwks_managers() -> None:
+    """Stop background refreshes and close HTTP clients of all key stores."""
+    for manager in _jwks_managers.values():
+        await manager.stop()
+    _jwks_managers.clear()
 
 
 async def get_jwks(jwks_url: str) -> dict:
@@ -20,52 +108,21 @@ async def get_jwks(jwks_url: str) -> dict:
     Returns:
         Dict containing the JWKS
     """
-    global _jwks_cache, _jwks_client
-    
-    if jwks_url in _jwks_cache:
-        return _jwks_cache[jwks_url]
-    
-    if _jwks_client is None:
-        _jwks_client = httpx.AsyncClient(timeout=10.0)
-    
-    try:
-        response = await _jwks_client.get(jwks_url)
-        response.raise_for_status()
-        jwks = response.json()
-        _jwks_cache[jwks_url] = jwks
-        return jwks
-    except httpx.HTTPError as e:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail=f"Failed to fetch JWKS: {str(e)}"
-        )
+    return await get_jwks_manager(jwks_url).get_jwks()
 
 
-def get_signing_key(token: str, jwks: dict) -> Optional[dict]:
+def get_token_kid(token: str) -> Optional[str]:
     """
-    Find the signing key from JWKS based on token's 'kid'.
+    Read the 'kid' from a token's unverified header.
     
     Args:
         token: JWT token string
-        jwks: JWKS dict
         
     Returns:
-        Public key dict or None
+        Key ID or None
     """
     try:
-        # Decode unverified header to get 'kid'
-        unverified_header = jwt.get_unverified_header(token)
-        kid = unverified_header.get("kid")
-        
-        if not kid:
-            return None
-        
-        # Find matching key in JWKS
-        for key in jwks.get("keys", []):
-            if key.get("kid") == kid:
-                return key
-        
-        return None
+        return jwt.get_unverified_header(token).get("kid")
     except JWTError:
         return None
 
@@ -79,6 +136,10 @@ async def verify_token(
     """
     Verify JWT token using JWKS and extract payload.
     
+    Results are cached per token: valid payloads until the token's 'exp'
+    (at most TOKEN_CACHE_TTL seconds, and only while the signing key is
+    still in the JWKS), rejections for TOKEN_NEGATIVE_CACHE_TTL seconds.
+    
     Args:
         token: JWT token string (without 'Bearer ' prefix)
         jwks_url: URL to fetch JWKS from
@@ -93,30 +154,71 @@ async def verify_token(
     """
     from app.core.config import settings
     
-    # Fetch JWKS
-    jwks = await get_jwks(jwks_url)
-    
-    # Get signing key
-    key = get_signing_key(token, jwks)
-    if not key:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token: could not find signing key"
-        )
-    
+    started = time.perf_counter()
+    outcome, cache_result = "invalid", "miss"
     try:
-        # Verify and decode token
-        payload = jwt.decode(
-            token,
-            key,
-            algorithms=["RS256"],
-            audience=audience,
-            issuer=issuer
-        )
+        cache = _get_token_cache()
+        cache_key = _token_cache_key(token, audience, issuer)
+        
+        cached = cache.get(cache_key)
+        if cached is not None:
+            payload, kid, error, _ = cached
+            if error is not None:
+                _token_cache_stats["hits"] += 1
+                cache_result = "hit"
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail=error
+                )
+        
+            # Only serve the payload while its signing key is still published
+            if await get_jwks_manager(jwks_url).get_key(kid) is not None:
+                _token_cache_stats["hits"] += 1
+                cache_result = "hit"
+                outcome = "valid"
+                return payload
+            cache.pop(cache_key, None)
+        
+        _token_cache_stats["misses"] += 1
+        now = time.time()
+        
+        # Get signing key
+        kid = get_token_kid(token)
+        key = await get_jwks_manager(jwks_url).get_key(kid) if kid else None
+        if not key:
+            error = "Invalid token: could not find signing key"
+            cache[cache_key] = (None, None, error, now + settings.TOKEN_NEGATIVE_CACHE_TTL)
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail=error
+            )
+        
+        try:
+            # Verify and decode token
+            payload = jwt.decode(
+                token,
+                key,
+                algorithms=["RS256"],
+                audience=audience,
+                issuer=issuer
+            )
+        except JWTError as e:
+            error = f"Invalid token: {str(e)}"
+            cache[cache_key] = (None, None, error, now + settings.TOKEN_NEGATIVE_CACHE_TTL)
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail=error
+            )
+        
+        expires_at = now + settings.TOKEN_CACHE_TTL
+        exp = payload.get("exp")
+        if isinstance(exp, (int, float)):
+            expires_at = min(expires_at, exp)
+        cache[cache_key] = (payload, kid, None, expires_at)
+        outcome = "valid"
+        
         return payload
-    except JWTError as e:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail=f"Invalid token: {str(e)}"
+    finally:
+        TOKEN_VERIFY_SECONDS.labels(outcome, cache_result).observe(
+            time.perf_counter() - started
         )
-
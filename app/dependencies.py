@@ -1,4 +1,4 @@
-from typing import AsyncGenerator, Annotated
+from typing import AsyncGenerator, Annotated, Callable
 from fastapi import Depends, HTTPException, status, Header
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
@@ -25,6 +25,35 @@ async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+def get_session_maker() -> Callable[[], AsyncSession]:
+    """
+    Dependency to get the session factory for work that outlives the
+    request (background jobs open their own sessions).
+    
+    Returns:
+        The app.models.database session factory
+    """
+    from app.models.database import async_session_maker
+    
+    return async_session_maker
+
+
+async def get_db_read_session() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency to get a read-only database session.
+    
+    Uses app.models.database.read_session_maker: one consistent snapshot,
+    no flushes and no commit.
+    
+    Yields:
+        AsyncSession: Read-only database session
+    """
+    from app.models.database import read_session_maker
+    
+    async with read_session_maker() as session:
+        yield session
+
+
 async def verify_token_dependency(
     authorization: Annotated[str, Header(description="Bearer token")]
 ) -> dict:
@@ -85,3 +114,96 @@ async def verify_token_dependency(
         "payload": payload
     }
 
+
+
+async def require_admin(
+    current_user: dict = Depends(verify_token_dependency)
+) -> dict:
+    """
+    FastAPI dependency restricting a route to administrators.
+    
+    Args:
+        current_user: Authenticated user from verify_token_dependency
+        
+    Returns:
+        The authenticated user
+        
+    Raises:
+        HTTPException: If the user is not listed in ADMIN_USER_IDS
+    """
+    if str(current_user["user_id"]) not in settings.ADMIN_USER_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin privileges required"
+        )
+    
+    return current_user
+
+
+async def get_write_session(
+    current_user: dict = Depends(verify_token_dependency),
+    db: AsyncSession = Depends(get_db_session)
+) -> AsyncSession:
+    """
+    Database session for routes that write, opened only once the request
+    is authenticated.
+    
+    Depending on verify_token_dependency first means a rejected token
+    never creates a session or checks out a pooled connection.
+    
+    Args:
+        current_user: Authenticated user (resolved before the session)
+        db: Database session
+        
+    Returns:
+        The database session
+    """
+    return db
+
+
+async def get_read_session(
+    current_user: dict = Depends(verify_token_dependency),
+    db: AsyncSession = Depends(get_db_read_session)
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Read-only database session for GET routes, opened only once the
+    request is authenticated.
+    
+    Served by a read replica when READ_DATABASE_URLS is set and one can
+    serve the user (see app.models.replicas.ReplicaRouter), by the
+    primary otherwise.
+    
+    Args:
+        current_user: Authenticated user (resolved before the session)
+        db: Read-only session on the primary
+        
+    Yields:
+        AsyncSession: Read-only database session
+    """
+    from app.models.replicas import router
+    
+    replica_session = await router.open_session(current_user["user_id"])
+    if replica_session is None:
+        yield db
+        return
+    
+    async with replica_session:
+        yield replica_session
+
+
+async def get_admin_session(
+    current_user: dict = Depends(require_admin),
+    db: AsyncSession = Depends(get_db_session)
+) -> AsyncSession:
+    """
+    Database session for admin routes, opened only once the request is
+    authenticated and authorized.
+    
+    Args:
+        current_user: Administrator (resolved before the session)
+        db: Database session
+        
+    Returns:
+        The database session
+    """
+    return db
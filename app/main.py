@@ -1,11 +1,17 @@
-from fastapi import FastAPI
+from typing import Optional
+from fastapi import FastAPI, Header, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 from contextlib import asynccontextmanager
 from datetime import datetime
 
 from app.core.config import settings
-from app.routers import items
-from app.models import database
+from app.core import security
+from app.core.metrics import render_metrics
+from app.core.middleware import MetricsMiddleware
+from app.routers import items, summary, internal, cardtrader
+from app.models import database, replicas
+from app.services import import_service
 
 
 @asynccontextmanager
@@ -15,11 +21,15 @@ async def lifespan(app: FastAPI):
     """
     # Startup
     print(f"Starting {settings.APP_NAME} v{settings.APP_VERSION}")
+    await security.get_jwks_manager(settings.AUTH_JWKS_URL).start()
     
     yield
     
     # Shutdown
+    await import_service.cancel_imports()
+    await security.close_jwks_managers()
     await database.engine.dispose()
+    await replicas.router.dispose()
     print(f"Shutting down {settings.APP_NAME}")
 
 
@@ -28,6 +38,7 @@ app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
     description="Collection Service for TakeYourTrade platform",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
@@ -40,8 +51,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request metrics (outermost, so the latency covers every middleware)
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(items.router)
+app.include_router(summary.router)
+app.include_router(internal.router)
+app.include_router(cardtrader.router)
 
 
 @app.get("/", tags=["Health"])
@@ -64,6 +81,21 @@ async def health():
     }
 
 
+@app.get("/metrics", tags=["Health"], response_class=PlainTextResponse)
+async def metrics(authorization: Optional[str] = Header(default=None)):
+    """Prometheus metrics in the text exposition format."""
+    if settings.METRICS_TOKEN and authorization != f"Bearer {settings.METRICS_TOKEN}":
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token"
+        )
+    
+    return PlainTextResponse(
+        render_metrics(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 @app.get("/test/database", tags=["Test"])
 async def test_database():
     """Test database connection."""
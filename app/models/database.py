@@ -1,14 +1,20 @@
+from typing import Callable, List
+from sqlalchemy import Table, event, exc
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from sqlalchemy.sql import Insert
 from app.core.config import settings
+from app.models.pool import engine_options, instrument_pool
+from app.models.queries import instrument_queries
 
-# Create async engine
+# Create async engine (pool sizing and pre-ping strategy come from Settings)
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=settings.DEBUG,
-    pool_pre_ping=True,
-    pool_recycle=3600
+    **engine_options(settings.DATABASE_URL)
 )
+instrument_pool(engine)
+instrument_queries(engine)
 
 # Create async session factory
 async_session_maker = sessionmaker(
@@ -17,6 +23,83 @@ async_session_maker = sessionmaker(
     expire_on_commit=False
 )
 
+
+class ReadOnlySession(Session):
+    """
+    Session for read-only routes.
+    
+    Never flushes, and on MySQL/PostgreSQL runs in a read-only
+    transaction over one consistent snapshot, so every statement of a
+    request sees the same collection version. Closing the session ends
+    the transaction; there is nothing to commit.
+    """
+
+
+@event.listens_for(ReadOnlySession, "after_begin")
+def _begin_read_only(session, transaction, connection):
+    dialect_name = connection.dialect.name
+    if dialect_name == "mysql":
+        # Sent before any other statement, so it opens the transaction
+        connection.exec_driver_sql("START TRANSACTION READ ONLY, WITH CONSISTENT SNAPSHOT")
+    elif dialect_name == "postgresql":
+        connection.exec_driver_sql("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY")
+
+
+@event.listens_for(ReadOnlySession, "before_flush")
+def _reject_flush(session, flush_context, instances):
+    raise exc.InvalidRequestError("Read-only session cannot flush changes")
+
+
+# Session factory of GET routes
+read_session_maker = sessionmaker(
+    engine,
+    class_=AsyncSession,
+    sync_session_class=ReadOnlySession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # Base class for models
 Base = declarative_base()
 
+
+
+def upsert(
+    dialect_name: str,
+    table: Table,
+    rows: List[dict],
+    index_elements: List[str],
+    set_: Callable[[object], dict]
+) -> Insert:
+    """
+    Build a multi-row INSERT that updates conflicting rows in place.
+    
+    Emits INSERT ... ON DUPLICATE KEY UPDATE on MySQL/MariaDB and
+    INSERT ... ON CONFLICT DO UPDATE on PostgreSQL and SQLite (tests).
+    
+    Args:
+        dialect_name: Name of the bound dialect (e.g. 'mysql', 'sqlite')
+        table: Target table
+        rows: Row dicts, all with the same keys
+        index_elements: Unique columns the conflict is detected on
+            (ignored by MySQL, which uses any unique key)
+        set_: Callable receiving the proposed row (``inserted`` /
+            ``excluded``) and returning the column -> value updates
+    
+    Returns:
+        Executable insert statement
+    """
+    if dialect_name == "mysql":
+        from sqlalchemy.dialects.mysql import insert as mysql_insert
+        stmt = mysql_insert(table).values(rows)
+        return stmt.on_duplicate_key_update(set_(stmt.inserted))
+    
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    stmt = dialect_insert(table).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=index_elements,
+        set_=set_(stmt.excluded)
+    )
@@ -0,0 +1,108 @@
+from uuid import uuid4
+from sqlalchemy import Column, String, Integer, DateTime, Text, Index
+from sqlalchemy.dialects.mysql import JSON
+from sqlalchemy.sql import func
+
+from app.models.database import Base
+from app.models.types import BinaryUUID
+
+
+class ImportJob(Base):
+    """
+    Model holding the progress of a CSV import.
+    
+    The import runs in the background on the instance that received the
+    upload (see ImportService); progress is stored here after every
+    chunk so that any instance can answer the status polls.
+    """
+    
+    __tablename__ = "import_jobs"
+    
+    id = Column(
+        BinaryUUID,
+        primary_key=True,
+        default=uuid4,
+        nullable=False,
+        comment="Unique identifier for the import"
+    )
+    
+    user_id = Column(
+        BinaryUUID,
+        nullable=False,
+        comment="Owner of the collection imported into"
+    )
+    
+    status = Column(
+        String(16),
+        nullable=False,
+        default="pending",
+        comment="pending, running, completed or failed"
+    )
+    
+    rows_processed = Column(
+        Integer,
+        nullable=False,
+        default=0,
+        comment="Data rows read so far"
+    )
+    
+    created = Column(
+        Integer,
+        nullable=False,
+        default=0,
+        comment="Rows inserted as new items"
+    )
+    
+    updated = Column(
+        Integer,
+        nullable=False,
+        default=0,
+        comment="Rows that updated an item with the same cardtrader_id"
+    )
+    
+    rejected = Column(
+        Integer,
+        nullable=False,
+        default=0,
+        comment="Rows that failed validation"
+    )
+    
+    errors = Column(
+        JSON,
+        nullable=True,
+        comment="First rejected rows, as a JSON array of {line, error}"
+    )
+    
+    error = Column(
+        Text,
+        nullable=True,
+        comment="Reason the import failed"
+    )
+    
+    created_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        comment="Upload timestamp"
+    )
+    
+    updated_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now(),
+        comment="Last progress update"
+    )
+    
+    finished_at = Column(
+        DateTime(timezone=True),
+        nullable=True,
+        comment="Completion or failure timestamp"
+    )
+    
+    __table_args__ = (
+        Index('idx_import_jobs_user', 'user_id', 'created_at'),
+    )
+    
+    def __repr__(self):
+        return f"<ImportJob(id={self.id}, user_id={self.user_id}, status={self.status})>"
@@ -1,10 +1,12 @@
 from sqlalchemy import Column, String, Integer, Boolean, DateTime, Text, BigInteger, CheckConstraint, UniqueConstraint, Index
 from sqlalchemy.dialects.mysql import JSON
 from sqlalchemy.sql import func
+from datetime import datetime, timezone
 from uuid import uuid4
 import uuid
 
 from app.models.database import Base
+from app.models.types import BinaryUUID
 
 
 class CollectionItem(Base):
@@ -18,23 +20,22 @@ class CollectionItem(Base):
     
     # Primary Key
     id = Column(
-        String(36),
+        BinaryUUID,
         primary_key=True,
-        default=lambda: str(uuid4()),
+        default=uuid4,
         nullable=False,
         comment="Unique identifier for the collection item"
     )
     
     # Foreign Keys & Relationships
     user_id = Column(
-        String(36),
+        BinaryUUID,
         nullable=False,
-        index=True,
         comment="Owner of this collection item"
     )
     
     card_id = Column(
-        String(36),
+        BinaryUUID,
         nullable=False,
         index=True,
         comment="Reference to the card"
@@ -51,14 +52,12 @@ class CollectionItem(Base):
     condition = Column(
         String(10),
         nullable=False,
-        index=True,
         comment="Condition of the card (e.g., 'M', 'NM', 'LP', 'MP', 'HP')"
     )
     
     language = Column(
         String(5),
         nullable=False,
-        index=True,
         comment="Language code (e.g., 'en', 'it', 'jp')"
     )
     
@@ -100,7 +99,6 @@ class CollectionItem(Base):
     source = Column(
         String(50),
         nullable=True,
-        index=True,
         comment="Source of the item (e.g., 'cardtrader', 'manual')"
     )
     
@@ -108,7 +106,6 @@ class CollectionItem(Base):
         BigInteger,
         nullable=True,
         unique=True,
-        index=True,
         comment="External ID from CardTrader platform"
     )
     
@@ -118,10 +115,28 @@ class CollectionItem(Base):
         comment="Last synchronization timestamp with external source"
     )
     
+    # Stacking
+    is_stack = Column(
+        Boolean,
+        nullable=True,
+        comment="TRUE on the row merged creates add to (one per variant), NULL otherwise"
+    )
+    
+    # Change feed
+    change_version = Column(
+        BigInteger,
+        nullable=False,
+        default=0,
+        comment="Collection version of the last write to the item"
+    )
+    
     # Timestamps
     added_at = Column(
         DateTime(timezone=True),
         nullable=False,
+        # Set client-side with microseconds, so every row stores the same
+        # format as the bound keyset cursor values (SQLite compares text)
+        default=lambda: datetime.now(timezone.utc),
         server_default=func.now(),
         comment="Creation timestamp"
     )
@@ -138,6 +153,18 @@ class CollectionItem(Base):
     __table_args__ = (
         CheckConstraint('quantity > 0', name='check_positive_quantity'),
         Index('idx_user_card', 'user_id', 'card_id'),
+        # Merge target of a variant; NULLs (unstacked rows) never conflict
+        UniqueConstraint(
+            'user_id', 'card_id', 'condition', 'language', 'is_foil',
+            'is_signed', 'is_altered', 'is_stack', name='uq_user_stack'
+        ),
+        # Serves the default listing order (and keyset cursor) without a filesort
+        Index('idx_user_added', 'user_id', 'added_at', 'id'),
+        Index('idx_user_source_added', 'user_id', 'source', 'added_at'),
+        # Change feed keyset scans
+        Index('idx_user_changes', 'user_id', 'change_version', 'id'),
+        # Notes search (MySQL/MariaDB; a plain index elsewhere)
+        Index('ft_notes', 'notes', mysql_prefix='FULLTEXT'),
     )
     
     def __repr__(self):
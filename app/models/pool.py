@@ -0,0 +1,235 @@
+import time
+from typing import Dict, List
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.config import settings
+from app.core import metrics as app_metrics
+from app.core.metrics import Histogram
+
+
+# Instrumented engines by name, exported by the /metrics collector
+_engines: Dict[str, AsyncEngine] = {}
+
+
+class PoolMetrics:
+    """Counters and latency histograms of one connection pool."""
+
+    def __init__(self):
+        self.wait = Histogram()
+        self.checkout = Histogram()
+        self.connects = 0
+        self.pings = 0
+        self.ping_failures = 0
+        self.timeouts = 0
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Async queue pool recording how long checkouts take.
+
+    ``wait`` covers getting a slot (waiting for a checkin or opening an
+    overflow connection), ``checkout`` the whole checkout including the
+    pre-ping.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def recreate(self) -> "InstrumentedQueuePool":
+        pool = super().recreate()
+        # engine.dispose() swaps in a new pool: keep the counters
+        pool.metrics = self.metrics
+        return pool
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.timeouts += 1
+            raise
+        finally:
+            self.metrics.wait.observe(time.perf_counter() - started)
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            self.metrics.checkout.observe(time.perf_counter() - started)
+
+
+def engine_options(url: str) -> dict:
+    """
+    Pool keyword arguments for create_async_engine, from Settings.
+
+    Args:
+        url: Database URL the engine is created for
+
+    Returns:
+        Dict of create_async_engine keyword arguments
+    """
+    options = {
+        "pool_pre_ping": settings.DB_PRE_PING == "always",
+        "pool_recycle": settings.DB_POOL_RECYCLE
+    }
+
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        # Every connection is a separate in-memory database: keep
+        # SQLAlchemy's single-connection pool
+        return options
+
+    options.update(
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT
+    )
+    return options
+
+
+def instrument_pool(engine: AsyncEngine, name: str = "primary") -> None:
+    """
+    Register the pool event listeners of an engine.
+
+    Tracks when each connection was last returned and, with
+    DB_PRE_PING=idle, pings only connections idle for longer than
+    DB_PRE_PING_IDLE_SECONDS instead of every checkout.
+
+    Args:
+        engine: Engine created with engine_options()
+        name: Pool name in the exported metrics
+    """
+    sync_engine = engine.sync_engine
+    _engines[name] = engine
+
+    def metrics():
+        return getattr(sync_engine.pool, "metrics", None)
+
+    @event.listens_for(sync_engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        connection_record.info["checked_in_at"] = time.monotonic()
+        if metrics() is not None:
+            metrics().connects += 1
+
+    @event.listens_for(sync_engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    if settings.DB_PRE_PING != "idle":
+        return
+
+    @event.listens_for(sync_engine, "checkout")
+    def ping_if_idle(dbapi_connection, connection_record, connection_proxy):
+        idle = time.monotonic() - connection_record.info.get("checked_in_at", 0.0)
+        if idle < settings.DB_PRE_PING_IDLE_SECONDS:
+            return
+
+        if metrics() is not None:
+            metrics().pings += 1
+        try:
+            sync_engine.dialect.do_ping(dbapi_connection)
+        except Exception as e:
+            if metrics() is not None:
+                metrics().ping_failures += 1
+            # The pool discards this connection and checks out a new one
+            raise exc.DisconnectionError(f"Connection failed pre-ping: {e}") from e
+
+
+def get_pool_stats(engine: AsyncEngine) -> dict:
+    """
+    Live statistics of an engine's connection pool.
+
+    Args:
+        engine: Engine to inspect
+
+    Returns:
+        Dict with pool occupancy, counters and latency histograms
+    """
+    pool = engine.sync_engine.pool
+    stats = {
+        "pool": type(pool).__name__,
+        "pre_ping": settings.DB_PRE_PING,
+        "status": pool.status()
+    }
+
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            timeout=pool.timeout(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=max(pool.overflow(), 0)
+        )
+
+    pool_metrics = getattr(pool, "metrics", None)
+    if pool_metrics is not None:
+        stats.update(
+            connects=pool_metrics.connects,
+            pings=pool_metrics.pings,
+            ping_failures=pool_metrics.ping_failures,
+            timeouts=pool_metrics.timeouts,
+            wait_seconds=pool_metrics.wait.snapshot(),
+            checkout_seconds=pool_metrics.checkout.snapshot()
+        )
+
+    return stats
+
+
+POOL_GAUGES = {
+    "size": "Connections kept open in the pool",
+    "checked_in": "Idle connections in the pool",
+    "checked_out": "Connections currently in use",
+    "overflow": "Connections open above the pool size",
+}
+POOL_COUNTERS = {
+    "connects": "Connections opened",
+    "pings": "Pre-pings issued on checkout",
+    "ping_failures": "Pre-pings that failed (connection replaced)",
+    "timeouts": "Checkouts that timed out waiting for a connection",
+}
+POOL_HISTOGRAMS = {
+    "wait_seconds": "Time spent getting a pool slot",
+    "checkout_seconds": "Time spent checking out a connection, pre-ping included",
+}
+
+
+def _collect_pool_metrics() -> List[str]:
+    lines = []
+    stats = {name: get_pool_stats(engine) for name, engine in _engines.items()}
+
+    for key, documentation in POOL_GAUGES.items():
+        name = f"db_pool_{key}"
+        lines += [f"# HELP {name} {documentation}", f"# TYPE {name} gauge"]
+        lines += [
+            app_metrics.sample(name, {"pool": pool}, values[key])
+            for pool, values in stats.items() if key in values
+        ]
+
+    for key, documentation in POOL_COUNTERS.items():
+        name = f"db_pool_{key}_total"
+        lines += [f"# HELP {name} {documentation}", f"# TYPE {name} counter"]
+        lines += [
+            app_metrics.sample(name, {"pool": pool}, values[key])
+            for pool, values in stats.items() if key in values
+        ]
+
+    for key, documentation in POOL_HISTOGRAMS.items():
+        name = f"db_pool_{key}"
+        lines += [f"# HELP {name} {documentation}", f"# TYPE {name} histogram"]
+        for pool, engine in _engines.items():
+            pool_metrics = getattr(engine.sync_engine.pool, "metrics", None)
+            if pool_metrics is not None:
+                histogram = getattr(pool_metrics, key.replace("_seconds", ""))
+                lines += app_metrics.histogram_samples(name, {"pool": pool}, histogram)
+
+    return lines
+
+
+app_metrics.register_collector(_collect_pool_metrics)
@@ -0,0 +1,190 @@
+import logging
+import random
+import re
+import time
+from collections import deque
+from typing import Dict, List, Optional
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.middleware import current_route
+
+
+logger = logging.getLogger(__name__)
+
+DB_QUERY_SECONDS = metrics.histogram(
+    "db_query_duration_seconds",
+    "Time spent executing SQL statements",
+    ["pool", "operation"]
+)
+
+OPERATIONS = frozenset(("SELECT", "INSERT", "UPDATE", "DELETE"))
+
+# Literal and placeholder normalization, applied in order
+_FINGERPRINT_RULES = [
+    (re.compile(r"\bX'[0-9A-Fa-f]*'"), "?"),                     # hex literals
+    (re.compile(r"'(?:[^'\\]|\\.|'')*'"), "?"),                 # string literals
+    (re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?\b"), "?"),  # numbers
+    (re.compile(r"%\(\w+\)s|%s|:\w+|\$\d+"), "?"),               # bind placeholders
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)"), "(?+)"),         # IN / VALUES lists
+    (re.compile(r"\(\?\+\)(?:\s*,\s*\(\?\+\))+"), "(?+), ..."),  # multi-row VALUES
+    (re.compile(r"\s+"), " "),
+]
+
+
+def _operation(statement: str) -> str:
+    keyword = statement.lstrip()[:6].upper()
+    return keyword if keyword in OPERATIONS else "OTHER"
+
+
+def fingerprint(statement: str) -> str:
+    """
+    Normalize a statement so that executions differing only in literal
+    values, bind placeholders or IN/VALUES list lengths share one key.
+
+    Args:
+        statement: SQL text as sent to the driver
+
+    Returns:
+        Normalized statement text
+    """
+    for pattern, replacement in _FINGERPRINT_RULES:
+        statement = pattern.sub(replacement, statement)
+    return statement.strip()
+
+
+class FingerprintStats:
+    """Rolling statistics of one statement fingerprint."""
+
+    def __init__(self, window: int):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+        self.recent = deque(maxlen=window)
+        self.last_route: Optional[str] = None
+
+    def add(self, elapsed: float, rows: int, route: Optional[str]) -> None:
+        self.count += 1
+        self.total += elapsed
+        self.max = max(self.max, elapsed)
+        if rows > 0:
+            self.rows += rows
+        self.recent.append(elapsed)
+        if route is not None:
+            self.last_route = route
+
+    def p99(self) -> float:
+        ordered = sorted(self.recent)
+        return ordered[min(int(len(ordered) * 0.99), len(ordered) - 1)]
+
+
+class QueryProfiler:
+    """
+    Per-fingerprint statement statistics and slow query log.
+
+    Every statement is timed, but only a QUERY_PROFILER_SAMPLE_RATE
+    fraction is fingerprinted and added to the stats, which keeps the
+    cost low enough for production. Statements slower than
+    QUERY_PROFILER_SLOW_MS are always logged with the current route.
+    """
+
+    def __init__(self):
+        self._stats: Dict[str, FingerprintStats] = {}
+        self.dropped = 0
+        self.slow = 0
+
+    def record(self, statement: str, elapsed: float, rows: int) -> None:
+        """
+        Account one executed statement.
+
+        Args:
+            statement: SQL text as sent to the driver
+            elapsed: Execution time in seconds
+            rows: Driver row count (-1 when unknown)
+        """
+        slow = elapsed * 1000 >= settings.QUERY_PROFILER_SLOW_MS
+        if not slow and random.random() >= settings.QUERY_PROFILER_SAMPLE_RATE:
+            return
+
+        key = fingerprint(statement)
+        route = current_route()
+        if slow:
+            self.slow += 1
+            logger.warning(
+                "Slow query (%.1f ms) on %s: %s",
+                elapsed * 1000, route or "<no request>", key
+            )
+
+        stats = self._stats.get(key)
+        if stats is None:
+            if len(self._stats) >= settings.QUERY_PROFILER_MAX_FINGERPRINTS:
+                self.dropped += 1
+                return
+            stats = self._stats[key] = FingerprintStats(settings.QUERY_PROFILER_WINDOW)
+        stats.add(elapsed, rows, route)
+
+    def top(self, limit: int = 20, order_by: str = "total") -> List[dict]:
+        """
+        Return the fingerprints with the highest total time, p99 or count.
+
+        Args:
+            limit: Number of fingerprints to return
+            order_by: 'total', 'p99', 'max' or 'count'
+
+        Returns:
+            List of per-fingerprint stat dicts, worst first
+        """
+        entries = [
+            {
+                "fingerprint": key,
+                "samples": stats.count,
+                "total_ms": round(stats.total * 1000, 3),
+                "mean_ms": round(stats.total / stats.count * 1000, 3),
+                "p99_ms": round(stats.p99() * 1000, 3),
+                "max_ms": round(stats.max * 1000, 3),
+                "rows": stats.rows,
+                "last_route": stats.last_route
+            }
+            for key, stats in list(self._stats.items())
+        ]
+        sort_key = {"total": "total_ms", "p99": "p99_ms", "max": "max_ms", "count": "samples"}[order_by]
+        entries.sort(key=lambda entry: entry[sort_key], reverse=True)
+        return entries[:limit]
+
+    def reset(self) -> None:
+        """Forget all collected statistics."""
+        self._stats.clear()
+        self.dropped = 0
+        self.slow = 0
+
+
+profiler = QueryProfiler()
+
+
+def instrument_queries(engine: AsyncEngine, name: str = "primary") -> None:
+    """
+    Record the duration of every statement executed through an engine,
+    and feed the query profiler when QUERY_PROFILER_ENABLED is set.
+
+    Args:
+        engine: Engine to instrument
+        name: Pool name in the exported metrics
+    """
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def start_timer(conn, cursor, statement, parameters, context, executemany):
+        context._query_started = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def stop_timer(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_query_started", None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        DB_QUERY_SECONDS.labels(name, _operation(statement)).observe(elapsed)
+        if settings.QUERY_PROFILER_ENABLED:
+            profiler.record(statement, elapsed, cursor.rowcount)
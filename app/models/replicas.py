@@ -0,0 +1,164 @@
+import itertools
+import logging
+import time
+from typing import Dict, List, Optional
+from uuid import UUID
+from cachetools import TTLCache
+from sqlalchemy import event, exc, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core import metrics
+from app.core.config import settings
+from app.models.database import ReadOnlySession
+from app.models.pool import engine_options, instrument_pool
+from app.models.queries import instrument_queries
+from app.models.version import CollectionVersion
+
+
+logger = logging.getLogger(__name__)
+
+# Session info key: {user_id: version} bumped in the current transaction
+WRITTEN_VERSIONS = "written_versions"
+
+# Users whose read-your-writes fence is tracked at once
+FENCE_MAXSIZE = 100000
+
+READ_SESSIONS = metrics.counter(
+    "db_read_sessions_total",
+    "Read-only sessions opened, by target database",
+    ["target"]
+)
+
+REPLICA_SKIPS = metrics.counter(
+    "db_replica_skips_total",
+    "Replicas passed over for a read, by reason",
+    ["replica", "reason"]
+)
+
+
+class Replica:
+    """One read replica: its engine, session factory and health."""
+
+    def __init__(self, name: str, url: str):
+        self.name = name
+        self.engine = create_async_engine(url, echo=settings.DEBUG, **engine_options(url))
+        instrument_pool(self.engine, name)
+        instrument_queries(self.engine, name)
+        self.session_maker = sessionmaker(
+            self.engine,
+            class_=AsyncSession,
+            sync_session_class=ReadOnlySession,
+            autoflush=False,
+            expire_on_commit=False
+        )
+        # time.monotonic() until which the replica is skipped
+        self.down_until = 0.0
+
+
+class ReplicaRouter:
+    """
+    Picks the database a read-only session is opened on.
+
+    Replicas are used round robin. For READ_YOUR_WRITES_SECONDS after a
+    user's write, a replica only serves that user once it has replicated
+    the collection version the write committed; otherwise the read falls
+    back to the primary. Replicas that fail to connect are skipped for
+    REPLICA_RETRY_SECONDS.
+
+    Fences are kept per process: with several instances, the window only
+    covers reads served by the instance that took the write.
+    """
+
+    def __init__(self, urls: List[str]):
+        self.replicas = [Replica(f"replica{i}", url) for i, url in enumerate(urls)]
+        self._fences = TTLCache(maxsize=FENCE_MAXSIZE, ttl=settings.READ_YOUR_WRITES_SECONDS)
+        self._turn = itertools.count()
+
+    def record_writes(self, versions: Dict[UUID, int]) -> None:
+        """
+        Fence the next reads of users on the versions they just committed.
+
+        Args:
+            versions: Committed collection version by user ID
+        """
+        if not self.replicas:
+            return
+        for user_id, version in versions.items():
+            if version > self._fences.get(user_id, 0):
+                self._fences[user_id] = version
+
+    def _rotation(self) -> List[Replica]:
+        now = time.monotonic()
+        healthy = [replica for replica in self.replicas if replica.down_until <= now]
+        if not healthy:
+            return []
+        start = next(self._turn) % len(healthy)
+        return healthy[start:] + healthy[:start]
+
+    async def open_session(self, user_id: UUID) -> Optional[AsyncSession]:
+        """
+        Open a read-only session on a replica that can serve a user.
+
+        The session's snapshot is taken before the fence check, so every
+        statement run on it sees at least the fenced version.
+
+        Args:
+            user_id: User the reads are made for
+
+        Returns:
+            Replica session, or None to read from the primary
+        """
+        fence = self._fences.get(user_id)
+
+        for replica in self._rotation():
+            session = replica.session_maker()
+            try:
+                if fence is not None:
+                    result = await session.execute(
+                        select(CollectionVersion.version)
+                        .where(CollectionVersion.user_id == user_id)
+                    )
+                    if (result.scalar_one_or_none() or 0) < fence:
+                        REPLICA_SKIPS.labels(replica.name, "lagging").inc()
+                        await session.close()
+                        continue
+                else:
+                    # Check out now so an unreachable replica is detected
+                    # here rather than in the middle of the route
+                    await session.connection()
+            except (exc.DBAPIError, OSError) as e:
+                replica.down_until = time.monotonic() + settings.REPLICA_RETRY_SECONDS
+                REPLICA_SKIPS.labels(replica.name, "unavailable").inc()
+                logger.warning(
+                    "Replica %s unavailable, skipped for %.0f s: %s",
+                    replica.name, settings.REPLICA_RETRY_SECONDS, e
+                )
+                await session.close()
+                continue
+
+            READ_SESSIONS.labels(replica.name).inc()
+            return session
+
+        READ_SESSIONS.labels("primary").inc()
+        return None
+
+    async def dispose(self) -> None:
+        """Close the connection pools of every replica."""
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+
+router = ReplicaRouter(settings.READ_DATABASE_URLS)
+
+
+@event.listens_for(Session, "after_commit")
+def _fence_committed_writes(session):
+    versions = session.info.pop(WRITTEN_VERSIONS, None)
+    if versions:
+        router.record_writes(versions)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_writes(session):
+    session.info.pop(WRITTEN_VERSIONS, None)
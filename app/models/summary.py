@@ -0,0 +1,60 @@
+from sqlalchemy import Column, String, Integer, BigInteger
+
+from app.models.database import Base
+from app.models.types import BinaryUUID
+
+
+class CollectionSummary(Base):
+    """
+    Model holding pre-aggregated counters of a user's collection.
+    
+    One row per (user, dimension, bucket), kept up to date by the
+    ItemService write paths in the same transaction as the item change.
+    
+    Dimensions:
+        all       - bucket '' : every item of the user
+        cards     - bucket '' : item_count is the number of distinct cards
+        card      - bucket HEX(card_id) : stacks/copies of one card
+        language, condition, foil, source - bucket is the column value
+    """
+    
+    __tablename__ = "collection_summaries"
+    
+    user_id = Column(
+        BinaryUUID,
+        primary_key=True,
+        comment="Owner of the summarized collection"
+    )
+    
+    dimension = Column(
+        String(20),
+        primary_key=True,
+        comment="Aggregated dimension (e.g., 'all', 'language', 'card')"
+    )
+    
+    bucket = Column(
+        String(50),
+        primary_key=True,
+        default="",
+        comment="Value of the dimension ('' when not applicable)"
+    )
+    
+    item_count = Column(
+        Integer,
+        nullable=False,
+        default=0,
+        comment="Number of collection items (stacks) in the bucket"
+    )
+    
+    quantity = Column(
+        BigInteger,
+        nullable=False,
+        default=0,
+        comment="Total number of copies in the bucket"
+    )
+    
+    def __repr__(self):
+        return (
+            f"<CollectionSummary(user_id={self.user_id}, dimension={self.dimension}, "
+            f"bucket={self.bucket}, item_count={self.item_count}, quantity={self.quantity})>"
+        )
@@ -0,0 +1,58 @@
+from sqlalchemy import Column, String, Text, DateTime
+from sqlalchemy.sql import func
+
+from app.models.database import Base
+from app.models.types import BinaryUUID
+
+
+class CardTraderSyncState(Base):
+    """
+    Model holding a user's CardTrader link and sync watermark.
+    
+    One row per linked user. The sync worker pulls the listings changed
+    since last_synced_at and periodically the full inventory (to detect
+    removed listings), see CardTraderSyncService.
+    """
+    
+    __tablename__ = "cardtrader_sync_state"
+    
+    user_id = Column(
+        BinaryUUID,
+        primary_key=True,
+        comment="Linked collection owner"
+    )
+    
+    api_token = Column(
+        String(1024),
+        nullable=False,
+        comment="CardTrader API token of the user"
+    )
+    
+    last_synced_at = Column(
+        DateTime(timezone=True),
+        nullable=True,
+        comment="Start of the last successful sync (incremental watermark)"
+    )
+    
+    last_full_sync_at = Column(
+        DateTime(timezone=True),
+        nullable=True,
+        comment="Start of the last successful full sync"
+    )
+    
+    last_error = Column(
+        Text,
+        nullable=True,
+        comment="Error of the last failed sync (null after a success)"
+    )
+    
+    updated_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now(),
+        comment="Last update timestamp"
+    )
+    
+    def __repr__(self):
+        return f"<CardTraderSyncState(user_id={self.user_id}, last_synced_at={self.last_synced_at})>"
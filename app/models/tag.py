@@ -0,0 +1,44 @@
+from sqlalchemy import Column, String, Index
+
+from app.models.database import Base
+from app.models.types import BinaryUUID
+
+
+class CollectionItemTag(Base):
+    """
+    Model indexing the tags of collection items.
+    
+    One row per (item, tag), maintained by ItemService next to the JSON
+    tags column so that tag filters are index range scans on
+    (user_id, tag) instead of JSON scans of the whole collection.
+    """
+    
+    __tablename__ = "collection_item_tags"
+    
+    user_id = Column(
+        BinaryUUID,
+        primary_key=True,
+        comment="Owner of the tagged item"
+    )
+    
+    # Binary collation: the PK must not equate tags normalize_tag keeps
+    # apart (accents, or case on other backends)
+    tag = Column(
+        String(64).with_variant(String(64, collation="utf8mb4_bin"), "mysql"),
+        primary_key=True,
+        comment="Tag of collection_items.tags, normalized (trimmed, lowercase)"
+    )
+    
+    item_id = Column(
+        BinaryUUID,
+        primary_key=True,
+        comment="Tagged collection item"
+    )
+    
+    __table_args__ = (
+        # Removing an item's tags on update/delete
+        Index('idx_item_tags_item', 'item_id'),
+    )
+    
+    def __repr__(self):
+        return f"<CollectionItemTag(item_id={self.item_id}, tag={self.tag})>"
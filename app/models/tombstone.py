@@ -0,0 +1,51 @@
+from sqlalchemy import Column, BigInteger, DateTime, Index
+from sqlalchemy.sql import func
+
+from app.models.database import Base
+from app.models.types import BinaryUUID
+
+
+class CollectionItemTombstone(Base):
+    """
+    Model recording deleted collection items for the change feed.
+    
+    One row per deleted item, written by ItemService in the deleting
+    transaction with the collection version of the delete. Rows older
+    than TOMBSTONE_RETENTION_DAYS are compacted away (see ChangeService),
+    after which older change tokens of the user are rejected.
+    """
+    
+    __tablename__ = "collection_item_tombstones"
+    
+    user_id = Column(
+        BinaryUUID,
+        primary_key=True,
+        comment="Owner of the deleted item"
+    )
+    
+    version = Column(
+        BigInteger,
+        primary_key=True,
+        comment="Collection version of the delete"
+    )
+    
+    item_id = Column(
+        BinaryUUID,
+        primary_key=True,
+        comment="Deleted collection item"
+    )
+    
+    deleted_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        comment="Deletion timestamp"
+    )
+    
+    __table_args__ = (
+        # Compaction scans
+        Index('idx_tombstones_deleted', 'deleted_at'),
+    )
+    
+    def __repr__(self):
+        return f"<CollectionItemTombstone(item_id={self.item_id}, version={self.version})>"
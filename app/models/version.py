@@ -0,0 +1,39 @@
+from sqlalchemy import Column, BigInteger
+
+from app.models.database import Base
+from app.models.types import BinaryUUID
+
+
+class CollectionVersion(Base):
+    """
+    Model holding a per-user collection version.
+    
+    The version is bumped by every ItemService write in the same
+    transaction as the item change, so any change to the collection
+    yields a new version (used to derive ETags).
+    """
+    
+    __tablename__ = "collection_versions"
+    
+    user_id = Column(
+        BinaryUUID,
+        primary_key=True,
+        comment="Owner of the collection"
+    )
+    
+    version = Column(
+        BigInteger,
+        nullable=False,
+        default=0,
+        comment="Incremented by every write to the collection"
+    )
+    
+    purged_version = Column(
+        BigInteger,
+        nullable=False,
+        default=0,
+        comment="Highest version of a compacted tombstone (older change tokens expire)"
+    )
+    
+    def __repr__(self):
+        return f"<CollectionVersion(user_id={self.user_id}, version={self.version})>"
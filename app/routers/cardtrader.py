@@ -0,0 +1,84 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.responses import validated_response
+from app.dependencies import get_read_session, get_write_session, verify_token_dependency
+from app.schemas.cardtrader import CardTraderLink, CardTraderSyncStatus
+from app.services.cardtrader_sync_service import CardTraderSyncService
+
+router = APIRouter(
+    prefix="/api/v1/collections/cardtrader",
+    tags=["CardTrader Sync"]
+)
+
+
+@router.put(
+    "",
+    response_model=CardTraderSyncStatus,
+    summary="Link a CardTrader account"
+)
+async def link_account(
+    link: CardTraderLink,
+    current_user: dict = Depends(verify_token_dependency),
+    db: AsyncSession = Depends(get_write_session)
+) -> CardTraderSyncStatus:
+    """
+    Store the user's CardTrader API token for the sync worker.
+    
+    **Authentication Required**
+    
+    - Replaces a previously linked token
+    - The next sync pulls the whole inventory
+    """
+    state = await CardTraderSyncService.link(
+        db=db,
+        user_id=current_user["user_id"],
+        api_token=link.api_token
+    )
+    
+    return validated_response(CardTraderSyncStatus.model_validate(state))
+
+
+@router.get(
+    "",
+    response_model=CardTraderSyncStatus,
+    summary="Get the CardTrader sync status"
+)
+async def get_sync_status(
+    current_user: dict = Depends(verify_token_dependency),
+    db: AsyncSession = Depends(get_read_session)
+) -> CardTraderSyncStatus:
+    """
+    Get the watermarks and last error of the user's CardTrader sync.
+    
+    **Authentication Required**
+    """
+    state = await CardTraderSyncService.get_state(db=db, user_id=current_user["user_id"])
+    if state is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="CardTrader account not linked"
+        )
+    
+    return validated_response(CardTraderSyncStatus.model_validate(state))
+
+
+@router.delete(
+    "",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Unlink the CardTrader account"
+)
+async def unlink_account(
+    current_user: dict = Depends(verify_token_dependency),
+    db: AsyncSession = Depends(get_write_session)
+) -> None:
+    """
+    Forget the user's CardTrader token. Synced items are kept.
+    
+    **Authentication Required**
+    """
+    if not await CardTraderSyncService.unlink(db=db, user_id=current_user["user_id"]):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="CardTrader account not linked"
+        )
@@ -0,0 +1,78 @@
+from typing import Literal
+from fastapi import APIRouter, Depends, Query
+
+from app.core.config import settings
+from app.dependencies import require_admin
+from app.models import database
+from app.models.pool import get_pool_stats
+from app.models.queries import profiler
+
+router = APIRouter(
+    prefix="/internal",
+    tags=["Internal"]
+)
+
+
+@router.get(
+    "/pool",
+    summary="Database connection pool statistics (admin)"
+)
+async def pool_stats(
+    current_user: dict = Depends(require_admin)
+) -> dict:
+    """
+    Live statistics of the database connection pool.
+    
+    **Admin Required**
+    
+    - Pool size, checked-out and overflow connections
+    - Connects, pre-pings and checkout timeouts since startup
+    - Slot wait time and checkout latency histograms (seconds)
+    """
+    return get_pool_stats(database.engine)
+
+
+@router.get(
+    "/queries",
+    summary="Slowest statement fingerprints (admin)"
+)
+async def query_stats(
+    limit: int = Query(default=20, ge=1, le=200, description="Fingerprints to return"),
+    order_by: Literal["total", "p99", "max", "count"] = Query(default="total", description="Ranking metric"),
+    current_user: dict = Depends(require_admin)
+) -> dict:
+    """
+    Top statement fingerprints collected by the query profiler.
+    
+    **Admin Required**
+    
+    - Literals are normalized away, so one fingerprint covers every
+      execution of the same statement shape
+    - Stats cover the sampled statements (see **sample_rate**)
+    - Empty unless QUERY_PROFILER_ENABLED is set
+    """
+    return {
+        "enabled": settings.QUERY_PROFILER_ENABLED,
+        "sample_rate": settings.QUERY_PROFILER_SAMPLE_RATE,
+        "slow_threshold_ms": settings.QUERY_PROFILER_SLOW_MS,
+        "slow_queries": profiler.slow,
+        "dropped": profiler.dropped,
+        "fingerprints": profiler.top(limit=limit, order_by=order_by)
+    }
+
+
+@router.delete(
+    "/queries",
+    summary="Reset the query profiler statistics (admin)"
+)
+async def reset_query_stats(
+    current_user: dict = Depends(require_admin)
+) -> dict:
+    """
+    Forget every collected statement statistic.
+    
+    **Admin Required**
+    """
+    profiler.reset()
+    
+    return {"status": "success"}
@@ -1,17 +1,129 @@
-from typing import List, Optional
+import csv
+import hashlib
+import io
+import json
+import os
+from datetime import datetime
+from typing import AsyncIterator, Callable, List, Literal, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.dependencies import get_db_session, verify_token_dependency
-from app.schemas.item import ItemCreate, ItemUpdate, ItemResponse, ItemListResponse
+from app.core.responses import validated_response
+from app.dependencies import get_read_session, get_session_maker, get_write_session, verify_token_dependency
+from app.schemas.item import (
+    ItemCreate,
+    ItemUpdate,
+    ItemResponse,
+    ItemListResponse,
+    ItemChangesResponse,
+    ItemBulkCreate,
+    ItemBulkResponse,
+    ItemAdjust,
+    ItemBatchAdjust,
+    ItemAdjustResponse,
+    ItemOwnedQuery,
+    ItemOwnedResponse,
+    ImportJobResponse,
+)
+from app.services.change_service import ChangeService
+from app.services.import_service import ImportService
 from app.services.item_service import ItemService
+from app.services.version_service import VersionService
 
 router = APIRouter(
     prefix="/api/v1/collections/items",
     tags=["Collection Items"]
 )
 
+# Exported columns, in the same order as ItemResponse
+EXPORT_COLUMNS = list(ItemResponse.model_fields)
+
+# Most tags a list request can filter on
+MAX_TAG_FILTERS = 20
+
+# Content types accepted for a CSV import body
+IMPORT_MEDIA_TYPES = ("text/csv", "application/csv", "text/plain", "application/octet-stream")
+
+
+def _export_value(value):
+    """Convert a database value to its JSON/CSV export representation."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+async def _render_ndjson(batches: AsyncIterator[List[dict]]) -> AsyncIterator[str]:
+    async for rows in batches:
+        yield "".join(
+            json.dumps(
+                {name: _export_value(row[name]) for name in EXPORT_COLUMNS},
+                separators=(",", ":")
+            ) + "\n"
+            for row in rows
+        )
+
+
+async def _render_csv(batches: AsyncIterator[List[dict]]) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    
+    async for rows in batches:
+        for row in rows:
+            values = []
+            for name in EXPORT_COLUMNS:
+                value = _export_value(row[name])
+                if isinstance(value, list):
+                    value = json.dumps(value)
+                values.append(value)
+            writer.writerow(values)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def _collection_etag(user_id: UUID, version: int, request: Request) -> str:
+    """
+    Strong ETag of a collection read.
+    
+    Every write bumps the collection version, so the same user, version
+    and URL always produce the same response body.
+    """
+    url = f"{request.url.path}?{request.url.query}"
+    digest = hashlib.sha256(f"{user_id}:{version}:{url}".encode()).hexdigest()[:32]
+    return f'"{version}-{digest}"'
+
+
+def _cache_headers(etag: str) -> dict:
+    # Responses depend on the bearer token: never store them in shared caches
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+
+def _not_modified(request: Request, etag: str, wildcard: bool = True) -> Optional[Response]:
+    """
+    Return a 304 response if If-None-Match matches the ETag, else None.
+    
+    "*" matches any existing representation; pass wildcard=False while
+    the resource is not known to exist.
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return None
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    if (wildcard and "*" in candidates) or etag in candidates:
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers=_cache_headers(etag)
+        )
+    return None
+
 
 @router.post(
     "/",
@@ -21,8 +133,9 @@ router = APIRouter(
 )
 async def create_item(
     item: ItemCreate,
+    merge: bool = Query(default=False, description="Add the copies to the existing stack of the same variant"),
     current_user: dict = Depends(verify_token_dependency),
-    db: AsyncSession = Depends(get_db_session)
+    db: AsyncSession = Depends(get_write_session)
 ) -> ItemResponse:
     """
     Create a new item in the user's collection.
@@ -34,9 +147,29 @@ async def create_item(
     - **condition**: Card condition (e.g., 'M', 'NM', 'LP')
     - **language**: Language code (e.g., 'en', 'it')
     - **is_foil**: Whether the card is foil
+    - With `merge=true` the quantity is added to the user's stack of the
+      same card, condition, language, foil, signed and altered flags
+      (200 with the stack); the stack is created if missing (201).
+      Notes, tags and source only apply to a new stack
     """
     user_id = current_user["user_id"]
     
+    if merge:
+        if item.cardtrader_id is not None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="CardTrader listings cannot be merged"
+            )
+        stack, created = await ItemService.add_to_stack(
+            db=db,
+            user_id=user_id,
+            item_data=item.model_dump(exclude_none=True)
+        )
+        return validated_response(
+            ItemResponse.model_validate(stack),
+            status_code=status.HTTP_201_CREATED if created else status.HTTP_200_OK
+        )
+    
     # Create item
     created_item = await ItemService.create_item(
         db=db,
@@ -44,7 +177,200 @@ async def create_item(
         item_data=item.model_dump(exclude_none=True)
     )
     
-    return ItemResponse.model_validate(created_item)
+    return validated_response(
+        ItemResponse.model_validate(created_item),
+        status_code=status.HTTP_201_CREATED
+    )
+
+
+@router.post(
+    "/bulk",
+    response_model=ItemBulkResponse,
+    summary="Create or update collection items in bulk"
+)
+async def bulk_upsert_items(
+    payload: ItemBulkCreate,
+    current_user: dict = Depends(verify_token_dependency),
+    db: AsyncSession = Depends(get_write_session)
+) -> ItemBulkResponse:
+    """
+    Create or update many items in one request (e.g. a CardTrader import).
+    
+    **Authentication Required**
+    
+    - Accepts up to 5000 items
+    - Items whose **cardtrader_id** already exists in the collection are updated
+    - Invalid rows are reported as rejected without failing the others
+    - Returns one outcome per row, in request order
+    """
+    user_id = current_user["user_id"]
+    
+    results = await ItemService.bulk_upsert_items(
+        db=db,
+        user_id=user_id,
+        items=payload.items
+    )
+    
+    counts = {"created": 0, "updated": 0, "rejected": 0}
+    for outcome in results:
+        counts[outcome["status"]] += 1
+    
+    return validated_response(ItemBulkResponse(results=results, **counts))
+
+
+@router.post(
+    "/adjust",
+    response_model=ItemAdjustResponse,
+    summary="Adjust the quantities of many items"
+)
+async def adjust_items(
+    payload: ItemBatchAdjust,
+    current_user: dict = Depends(verify_token_dependency),
+    db: AsyncSession = Depends(get_write_session)
+) -> ItemAdjustResponse:
+    """
+    Add or remove copies of many items in one transaction (e.g. a trade).
+    
+    **Authentication Required**
+    
+    - Accepts up to 5000 adjustments
+    - All or nothing: returns 404 if an item is not found or belongs to
+      another user, 409 if a quantity would drop below one (below zero
+      with `delete_if_empty`), and nothing is changed
+    - With `delete_if_empty` items reaching zero are deleted
+    """
+    deltas = {}
+    for adjustment in payload.adjustments:
+        deltas[adjustment.item_id] = deltas.get(adjustment.item_id, 0) + adjustment.delta
+    
+    items, deleted = await ItemService.adjust_quantities(
+        db=db,
+        user_id=current_user["user_id"],
+        deltas=deltas,
+        delete_if_empty=payload.delete_if_empty
+    )
+    
+    return validated_response(
+        ItemAdjustResponse(
+            items=[ItemResponse.model_validate(item) for item in items],
+            deleted=deleted
+        )
+    )
+
+
+@router.post(
+    "/owned",
+    response_model=ItemOwnedResponse,
+    summary="Look up the owned copies of many cards"
+)
+async def owned_cards(
+    payload: ItemOwnedQuery,
+    current_user: dict = Depends(verify_token_dependency),
+    db: AsyncSession = Depends(get_read_session)
+) -> ItemOwnedResponse:
+    """
+    Aggregate how many copies of each requested card the user owns.
+    
+    **Authentication Required**
+    
+    - Accepts up to 5000 card IDs
+    - Returns per-card totals split by condition, language and foil
+    - Cards not in the collection are omitted; results follow request order
+    - Read-only: served from a replica when configured
+    """
+    user_id = current_user["user_id"]
+    
+    cards = await ItemService.owned_cards(
+        db=db,
+        user_id=user_id,
+        card_ids=payload.card_ids
+    )
+    
+    return validated_response(ItemOwnedResponse(cards=cards))
+
+
+@router.post(
+    "/import",
+    response_model=ImportJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Import collection items from a CSV file"
+)
+async def import_items(
+    request: Request,
+    current_user: dict = Depends(verify_token_dependency),
+    db: AsyncSession = Depends(get_write_session),
+    session_maker: Callable[[], AsyncSession] = Depends(get_session_maker)
+) -> ImportJobResponse:
+    """
+    Upload a CSV file (as the request body, `Content-Type: text/csv`) and
+    import it in the background.
+    
+    **Authentication Required**
+    
+    - The header row names the columns: **card_id**, **condition** and
+      **language** are required, other ItemCreate fields are optional and
+      unknown columns are ignored (an export can be imported back)
+    - **tags** is a JSON array or a comma-separated list
+    - Rows are validated like single creates; rows with an existing
+      **cardtrader_id** update that item
+    - Returns 202 with the import job; poll the `Location` URL for progress
+      and the rejected rows
+    """
+    user_id = current_user["user_id"]
+    
+    if request.headers.get("content-type", "").split(";")[0].strip() not in IMPORT_MEDIA_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Send the CSV file as the request body with Content-Type: text/csv"
+        )
+    
+    # The session only checks out a connection once the upload is spooled
+    path = await ImportService.spool_upload(request.stream())
+    try:
+        ImportService.check_header(path)
+        job = await ImportService.create_job(db=db, user_id=user_id)
+    except BaseException:
+        os.unlink(path)
+        raise
+    
+    ImportService.start(session_maker, job.id, user_id, path)
+    
+    return validated_response(
+        ImportJobResponse.model_validate(job),
+        status_code=status.HTTP_202_ACCEPTED,
+        headers={"Location": str(request.url_for("get_import", job_id=job.id))}
+    )
+
+
+@router.get(
+    "/import/{job_id}",
+    response_model=ImportJobResponse,
+    summary="Get the progress of a CSV import"
+)
+async def get_import(
+    job_id: UUID,
+    current_user: dict = Depends(verify_token_dependency),
+    db: AsyncSession = Depends(get_read_session)
+) -> ImportJobResponse:
+    """
+    Get the status, counters and first rejected rows of an import.
+    
+    **Authentication Required**
+    
+    - Returns 404 if the import is not found or belongs to another user
+    """
+    job = await ImportService.get_job(
+        db=db,
+        job_id=job_id,
+        user_id=current_user["user_id"]
+    )
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Import not found or access denied"
+        )
+    
+    return validated_response(ImportJobResponse.model_validate(job))
 
 
 @router.get(
@@ -53,13 +379,19 @@ async def create_item(
     summary="List collection items"
 )
 async def list_items(
+    request: Request,
     limit: int = Query(default=100, ge=1, le=500, description="Maximum items to return"),
     offset: int = Query(default=0, ge=0, description="Number of items to skip"),
+    cursor: Optional[str] = Query(default=None, description="Cursor returned by the previous page"),
     language: Optional[str] = Query(default=None, description="Filter by language"),
     is_foil: Optional[bool] = Query(default=None, description="Filter by foil status"),
     source: Optional[str] = Query(default=None, description="Filter by source"),
+    include_total: bool = Query(default=True, description="Compute the total count (null when false)"),
+    tag: Optional[List[str]] = Query(default=None, description="Filter by tag (repeatable)"),
+    tag_match: Literal["any", "all"] = Query(default="any", description="Match any or all of the tags"),
+    q: Optional[str] = Query(default=None, min_length=1, max_length=200, description="Search the notes"),
     current_user: dict = Depends(verify_token_dependency),
-    db: AsyncSession = Depends(get_db_session)
+    db: AsyncSession = Depends(get_read_session)
 ) -> ItemListResponse:
     """
     List items in the user's collection with optional filtering and pagination.
@@ -69,24 +401,143 @@ async def list_items(
     - Returns paginated list of items
     - Supports filtering by language, foil status, and source
     - Results ordered by creation date (newest first)
+    - Pass `next_cursor` back as `cursor` to fetch the following page;
+      cursor pages cost the same regardless of depth
+    - Pass `include_total=false` to skip counting (e.g. infinite scroll)
+    - Repeat `tag` to filter by several tags (`tag_match=all` to require
+      every one of them); tags match regardless of case and surrounding
+      spaces
+    - `q` matches items whose notes contain every word
+    - Returns an ETag; a matching `If-None-Match` gets 304 Not Modified
+      without loading the items
     """
     user_id = current_user["user_id"]
     
-    items, total = await ItemService.list_items(
+    if cursor is not None and offset:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Use either 'cursor' or 'offset', not both"
+        )
+    
+    if tag is not None and len(tag) > MAX_TAG_FILTERS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_TAG_FILTERS} tags can be filtered on"
+        )
+    
+    version = await VersionService.get_version(db, user_id)
+    etag = _collection_etag(user_id, version, request)
+    not_modified = _not_modified(request, etag)
+    if not_modified is not None:
+        return not_modified
+    
+    items, total, next_cursor = await ItemService.list_items(
         db=db,
         user_id=user_id,
         limit=limit,
         offset=offset,
         language=language,
         is_foil=is_foil,
-        source=source
+        source=source,
+        cursor=cursor,
+        include_total=include_total,
+        version=version,
+        tags=tag,
+        match_all_tags=tag_match == "all",
+        q=q
     )
     
-    return ItemListResponse(
-        items=[ItemResponse.model_validate(item) for item in items],
-        total=total,
-        limit=limit,
-        offset=offset
+    return validated_response(
+        ItemListResponse(
+            items=[ItemResponse.model_validate(item) for item in items],
+            total=total,
+            limit=limit,
+            offset=offset,
+            next_cursor=next_cursor
+        ),
+        headers=_cache_headers(etag)
+    )
+
+
+@router.get(
+    "/changes",
+    response_model=ItemChangesResponse,
+    summary="Get the changes since a sync token"
+)
+async def list_changes(
+    since: Optional[str] = Query(default=None, description="Token returned by the previous call"),
+    limit: int = Query(default=500, ge=1, le=1000, description="Maximum changes to return"),
+    current_user: dict = Depends(verify_token_dependency),
+    db: AsyncSession = Depends(get_read_session)
+) -> ItemChangesResponse:
+    """
+    Get the items created or updated, and the IDs of those deleted, since a token.
+    
+    **Authentication Required**
+    
+    - Without `since` every item is returned (first sync)
+    - Call again with `next_token` while `has_more` is true; store the
+      last `next_token` for the next sync
+    - Cost depends on the number of changes, not on the collection size
+    - Returns 410 Gone if deletes the token has not seen were compacted
+      (older than the retention period): sync again without `since`
+    - Returns 400 for a malformed token
+    """
+    changes = await ChangeService.list_changes(
+        db=db,
+        user_id=current_user["user_id"],
+        token=since,
+        limit=limit
+    )
+    
+    return validated_response(
+        ItemChangesResponse(
+            items=[ItemResponse.model_validate(item) for item in changes["items"]],
+            deleted=changes["deleted"],
+            next_token=changes["next_token"],
+            has_more=changes["has_more"]
+        )
+    )
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    summary="Export the whole collection"
+)
+async def export_items(
+    format: Literal["ndjson", "csv"] = Query(default="ndjson", description="Export format"),
+    current_user: dict = Depends(verify_token_dependency),
+    db: AsyncSession = Depends(get_read_session)
+) -> StreamingResponse:
+    """
+    Stream every item in the user's collection as NDJSON or CSV.
+    
+    **Authentication Required**
+    
+    - Rows are read from a server-side cursor and written as they arrive
+    - Memory use does not depend on the collection size
+    - Results ordered by creation date (newest first)
+    """
+    user_id = current_user["user_id"]
+    
+    batches = ItemService.stream_items(
+        db=db,
+        user_id=user_id,
+        columns=EXPORT_COLUMNS
+    )
+    
+    if format == "csv":
+        body, media_type = _render_csv(batches), "text/csv"
+    else:
+        body, media_type = _render_ndjson(batches), "application/x-ndjson"
+    
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="collection.{format}"'
+        }
     )
 
 
@@ -97,8 +548,9 @@ async def list_items(
 )
 async def get_item(
     item_id: UUID,
+    request: Request,
     current_user: dict = Depends(verify_token_dependency),
-    db: AsyncSession = Depends(get_db_session)
+    db: AsyncSession = Depends(get_read_session)
 ) -> ItemResponse:
     """
     Get details of a specific collection item.
@@ -107,16 +559,28 @@ async def get_item(
     
     - Returns 404 if item not found or access denied
     - Only returns items owned by the authenticated user
+    - Returns an ETag; a matching `If-None-Match` gets 304 Not Modified
+      without loading the item (`*` only once the item is found)
     """
     user_id = current_user["user_id"]
     
+    version = await VersionService.get_version(db, user_id)
+    etag = _collection_etag(user_id, version, request)
+    not_modified = _not_modified(request, etag, wildcard=False)
+    if not_modified is not None:
+        return not_modified
+    
     item = await ItemService.get_item_by_id(
         db=db,
         item_id=item_id,
         user_id=user_id
     )
     
-    return ItemResponse.model_validate(item)
+    not_modified = _not_modified(request, etag)
+    if not_modified is not None:
+        return not_modified
+    
+    return validated_response(ItemResponse.model_validate(item), headers=_cache_headers(etag))
 
 
 @router.patch(
@@ -128,7 +592,7 @@ async def update_item(
     item_id: UUID,
     item_update: ItemUpdate,
     current_user: dict = Depends(verify_token_dependency),
-    db: AsyncSession = Depends(get_db_session)
+    db: AsyncSession = Depends(get_write_session)
 ) -> ItemResponse:
     """
     Update an existing collection item.
@@ -149,7 +613,42 @@ async def update_item(
         item_data=item_update.model_dump(exclude_none=True)
     )
     
-    return ItemResponse.model_validate(updated_item)
+    return validated_response(ItemResponse.model_validate(updated_item))
+
+
+@router.post(
+    "/{item_id}/adjust",
+    response_model=ItemResponse,
+    responses={status.HTTP_204_NO_CONTENT: {"description": "Item deleted at zero"}},
+    summary="Adjust the quantity of an item"
+)
+async def adjust_item(
+    item_id: UUID,
+    payload: ItemAdjust,
+    current_user: dict = Depends(verify_token_dependency),
+    db: AsyncSession = Depends(get_write_session)
+) -> ItemResponse:
+    """
+    Add or remove copies of an item without reading it first.
+    
+    **Authentication Required**
+    
+    - Applied atomically, so concurrent adjustments are never lost
+      (unlike a PATCH of the absolute quantity)
+    - Returns 404 if the item is not found or belongs to another user
+    - Returns 409 if the quantity would drop below one, or below zero
+      with `delete_if_empty`, which deletes the item at zero (204)
+    """
+    items, deleted = await ItemService.adjust_quantities(
+        db=db,
+        user_id=current_user["user_id"],
+        deltas={item_id: payload.delta},
+        delete_if_empty=payload.delete_if_empty
+    )
+    
+    if deleted:
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+    return validated_response(ItemResponse.model_validate(items[0]))
 
 
 @router.delete(
@@ -160,7 +659,7 @@ async def update_item(
 async def delete_item(
     item_id: UUID,
     current_user: dict = Depends(verify_token_dependency),
-    db: AsyncSession = Depends(get_db_session)
+    db: AsyncSession = Depends(get_write_session)
 ) -> None:
     """
     Delete a collection item.
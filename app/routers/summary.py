@@ -0,0 +1,63 @@
+from typing import Optional
+from uuid import UUID
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.responses import validated_response
+from app.dependencies import get_admin_session, get_read_session, verify_token_dependency, require_admin
+from app.schemas.summary import CollectionSummaryResponse
+from app.services.summary_service import SummaryService
+
+router = APIRouter(
+    prefix="/api/v1/collections",
+    tags=["Collection Summary"]
+)
+
+
+@router.get(
+    "/summary",
+    response_model=CollectionSummaryResponse,
+    summary="Get collection summary"
+)
+async def get_summary(
+    current_user: dict = Depends(verify_token_dependency),
+    db: AsyncSession = Depends(get_read_session)
+) -> CollectionSummaryResponse:
+    """
+    Get aggregated counters for the user's collection.
+    
+    **Authentication Required**
+    
+    - Total items, total copies and distinct cards
+    - Breakdown by language, condition, foil status and source
+    - Served from pre-aggregated counters, independent of collection size
+    """
+    user_id = current_user["user_id"]
+    
+    summary = await SummaryService.get_summary(db=db, user_id=user_id)
+    
+    return validated_response(CollectionSummaryResponse(**summary))
+
+
+@router.post(
+    "/summary/rebuild",
+    summary="Rebuild collection summaries (admin)"
+)
+async def rebuild_summary(
+    user_id: Optional[UUID] = Query(default=None, description="Only rebuild this user's summary"),
+    current_user: dict = Depends(require_admin),
+    db: AsyncSession = Depends(get_admin_session)
+) -> dict:
+    """
+    Recompute summaries from the collection items with GROUP BY.
+    
+    **Admin Required**
+    
+    - Rebuilds a single user when **user_id** is given, every user otherwise
+    """
+    await SummaryService.rebuild(db=db, user_id=user_id)
+    
+    return {
+        "status": "success",
+        "user_id": str(user_id) if user_id else None
+    }
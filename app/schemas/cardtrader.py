@@ -0,0 +1,19 @@
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel, Field
+
+
+class CardTraderLink(BaseModel):
+    """Schema for linking a CardTrader account."""
+    
+    api_token: str = Field(..., min_length=1, max_length=1024, description="CardTrader API token")
+
+
+class CardTraderSyncStatus(BaseModel):
+    """Schema for the CardTrader sync state (the token is never returned)."""
+    
+    last_synced_at: Optional[datetime] = Field(default=None, description="Start of the last successful sync")
+    last_full_sync_at: Optional[datetime] = Field(default=None, description="Start of the last full sync")
+    last_error: Optional[str] = Field(default=None, description="Error of the last failed sync")
+    
+    model_config = {"from_attributes": True}
@@ -1,9 +1,21 @@
-from typing import Optional, List
+from typing import Annotated, Optional, List, Literal, Any, Dict
 from datetime import datetime
 from uuid import UUID
 from pydantic import BaseModel, Field, field_validator
 
 
+# Maximum number of items accepted by the bulk endpoint in one request
+BULK_MAX_ITEMS = 5000
+
+# Maximum number of card IDs accepted by the owned endpoint in one request
+OWNED_MAX_CARDS = 5000
+
+# Longest tag (collection_item_tags.tag is VARCHAR(64))
+TAG_MAX_LENGTH = 64
+
+Tag = Annotated[str, Field(min_length=1, max_length=TAG_MAX_LENGTH)]
+
+
 class ItemBase(BaseModel):
     """Base schema with common fields for CollectionItem."""
     
@@ -15,7 +27,7 @@ class ItemBase(BaseModel):
     is_signed: Optional[bool] = Field(default=False, description="Is signed")
     is_altered: Optional[bool] = Field(default=False, description="Is altered")
     notes: Optional[str] = Field(default=None, description="Additional notes")
-    tags: Optional[List[str]] = Field(default=None, description="Custom tags")
+    tags: Optional[List[Tag]] = Field(default=None, description="Custom tags")
     source: Optional[str] = Field(default=None, max_length=50, description="Item source")
     cardtrader_id: Optional[int] = Field(default=None, description="CardTrader ID")
     
@@ -48,7 +60,7 @@ class ItemUpdate(BaseModel):
     is_signed: Optional[bool] = None
     is_altered: Optional[bool] = None
     notes: Optional[str] = None
-    tags: Optional[List[str]] = None
+    tags: Optional[List[Tag]] = None
     source: Optional[str] = Field(None, max_length=50)
     cardtrader_id: Optional[int] = None
     last_synced_at: Optional[datetime] = None
@@ -59,6 +71,8 @@ class ItemResponse(ItemBase):
     
     id: UUID = Field(..., description="Item unique identifier")
     user_id: UUID = Field(..., description="Owner user ID")
+    # Rows written before TAG_MAX_LENGTH may carry longer tags
+    tags: Optional[List[str]] = Field(default=None, description="Custom tags")
     added_at: datetime = Field(..., description="Creation timestamp")
     updated_at: datetime = Field(..., description="Last update timestamp")
     
@@ -69,7 +83,177 @@ class ItemListResponse(BaseModel):
     """Schema for paginated list of CollectionItems."""
     
     items: List[ItemResponse]
-    total: int = Field(..., description="Total number of items")
+    total: Optional[int] = Field(
+        ...,
+        description="Total number of items (null when include_total=false)"
+    )
     limit: int = Field(..., description="Items per page")
     offset: int = Field(..., description="Current offset")
+    next_cursor: Optional[str] = Field(
+        default=None,
+        description="Cursor for the next page (null on the last page)"
+    )
+
 
+class ItemChangesResponse(BaseModel):
+    """Schema for a page of the collection change feed."""
+    
+    items: List[ItemResponse] = Field(..., description="Items created or updated since the token")
+    deleted: List[UUID] = Field(..., description="IDs of the items deleted since the token")
+    next_token: str = Field(
+        ...,
+        description="Token for the next call (the following page if has_more)"
+    )
+    has_more: bool = Field(..., description="Whether more changes are pending")
+
+
+
+class ItemBulkCreate(BaseModel):
+    """Schema for bulk creating/upserting CollectionItems."""
+    
+    # Rows are validated one by one so that invalid rows are reported as
+    # rejected instead of failing the whole request
+    items: List[Dict[str, Any]] = Field(
+        ...,
+        min_length=1,
+        max_length=BULK_MAX_ITEMS,
+        description="Items to create or update (keyed on cardtrader_id)"
+    )
+
+
+class ItemBulkResult(BaseModel):
+    """Outcome of a single row of a bulk request."""
+    
+    index: int = Field(..., description="Position of the row in the request")
+    status: Literal["created", "updated", "rejected"]
+    id: Optional[UUID] = Field(default=None, description="Item unique identifier")
+    cardtrader_id: Optional[int] = Field(default=None, description="CardTrader ID")
+    error: Optional[str] = Field(default=None, description="Rejection reason")
+
+
+class ItemBulkResponse(BaseModel):
+    """Schema for bulk create/upsert response."""
+    
+    results: List[ItemBulkResult]
+    created: int = Field(..., description="Number of created items")
+    updated: int = Field(..., description="Number of updated items")
+    rejected: int = Field(..., description="Number of rejected items")
+
+
+class ItemAdjust(BaseModel):
+    """Schema for adjusting the quantity of a CollectionItem."""
+    
+    delta: int = Field(..., description="Copies to add (negative to remove)")
+    delete_if_empty: bool = Field(
+        default=False,
+        description="Delete the item if its quantity reaches zero"
+    )
+    
+    @field_validator("delta")
+    @classmethod
+    def validate_delta(cls, v):
+        """Reject adjustments that change nothing."""
+        if v == 0:
+            raise ValueError("delta must not be zero")
+        return v
+
+
+class ItemAdjustment(BaseModel):
+    """Quantity change of one item in a batch adjustment."""
+    
+    item_id: UUID = Field(..., description="Item unique identifier")
+    delta: int = Field(..., description="Copies to add (negative to remove)")
+    
+    @field_validator("delta")
+    @classmethod
+    def validate_delta(cls, v):
+        """Reject adjustments that change nothing."""
+        if v == 0:
+            raise ValueError("delta must not be zero")
+        return v
+
+
+class ItemBatchAdjust(BaseModel):
+    """Schema for adjusting the quantities of many CollectionItems at once."""
+    
+    adjustments: List[ItemAdjustment] = Field(
+        ...,
+        min_length=1,
+        max_length=BULK_MAX_ITEMS,
+        description="Quantity changes (deltas of a repeated item are added up)"
+    )
+    delete_if_empty: bool = Field(
+        default=False,
+        description="Delete the items whose quantity reaches zero"
+    )
+
+
+class ItemAdjustResponse(BaseModel):
+    """Schema for a batch adjustment response."""
+    
+    items: List[ItemResponse] = Field(..., description="Adjusted items, in request order")
+    deleted: List[UUID] = Field(..., description="IDs of the items deleted at zero")
+
+
+class ItemOwnedQuery(BaseModel):
+    """Schema for looking up the owned copies of many cards."""
+    
+    card_ids: List[UUID] = Field(
+        ...,
+        min_length=1,
+        max_length=OWNED_MAX_CARDS,
+        description="Cards to look up (duplicates are ignored)"
+    )
+
+
+class OwnedVariant(BaseModel):
+    """Owned copies of a card in one condition/language/foil combination."""
+    
+    condition: str = Field(..., description="Card condition")
+    language: str = Field(..., description="Language code")
+    is_foil: bool = Field(..., description="Is foil")
+    quantity: int = Field(..., description="Number of copies")
+
+
+class OwnedCard(BaseModel):
+    """Owned copies of one card."""
+    
+    card_id: UUID = Field(..., description="Reference to the card")
+    quantity: int = Field(..., description="Total number of copies")
+    variants: List[OwnedVariant]
+
+
+class ItemOwnedResponse(BaseModel):
+    """Schema for the owned lookup response (cards not owned are omitted)."""
+    
+    cards: List[OwnedCard]
+
+
+class ImportRowError(BaseModel):
+    """A CSV row rejected by an import."""
+    
+    line: int = Field(..., description="Line of the row in the uploaded file")
+    error: str = Field(..., description="Rejection reason")
+
+
+class ImportJobResponse(BaseModel):
+    """Schema for the status of a CSV import."""
+    
+    id: UUID = Field(..., description="Import unique identifier")
+    status: Literal["pending", "running", "completed", "failed"]
+    rows_processed: int = Field(..., description="Data rows read so far")
+    created: int = Field(..., description="Number of created items")
+    updated: int = Field(..., description="Number of items updated by cardtrader_id")
+    rejected: int = Field(..., description="Number of rejected rows")
+    errors: List[ImportRowError] = Field(default_factory=list, description="First rejected rows")
+    error: Optional[str] = Field(default=None, description="Reason the import failed")
+    created_at: datetime = Field(..., description="Upload timestamp")
+    finished_at: Optional[datetime] = Field(default=None, description="Completion timestamp")
+    
+    model_config = {"from_attributes": True}
+    
+    @field_validator("errors", mode="before")
+    @classmethod
+    def validate_errors(cls, v):
+        """Jobs without rejected rows store NULL."""
+        return v or []
@@ -0,0 +1,21 @@
+from typing import Dict
+from pydantic import BaseModel, Field
+
+
+class SummaryBucket(BaseModel):
+    """Counters for one value of a summary dimension."""
+    
+    items: int = Field(..., description="Number of collection items (stacks)")
+    quantity: int = Field(..., description="Total number of copies")
+
+
+class CollectionSummaryResponse(BaseModel):
+    """Schema for the aggregated view of a user's collection."""
+    
+    total_items: int = Field(..., description="Number of collection items (stacks)")
+    total_quantity: int = Field(..., description="Total number of copies")
+    unique_cards: int = Field(..., description="Number of distinct cards")
+    by_language: Dict[str, SummaryBucket] = Field(..., description="Breakdown by language")
+    by_condition: Dict[str, SummaryBucket] = Field(..., description="Breakdown by condition")
+    by_foil: Dict[str, SummaryBucket] = Field(..., description="Breakdown by foil status ('true'/'false')")
+    by_source: Dict[str, SummaryBucket] = Field(..., description="Breakdown by source ('none' when unset)")
@@ -0,0 +1,318 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+from uuid import UUID
+from sqlalchemy import select, update, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import HTTPException, status
+
+from app.core import metrics
+from app.core.cardtrader import CardTraderClient, product_to_item
+from app.core.config import settings
+from app.models.database import upsert
+from app.models.item import CollectionItem
+from app.models.sync_state import CardTraderSyncState
+from app.services.item_service import ItemService
+
+
+logger = logging.getLogger(__name__)
+
+SYNC_ITEMS = metrics.counter(
+    "cardtrader_sync_items_total",
+    "Listings processed by the CardTrader sync, by outcome",
+    ["outcome"]
+)
+
+SYNC_RUNS = metrics.counter(
+    "cardtrader_sync_runs_total",
+    "Per-user CardTrader syncs, by mode and outcome",
+    ["mode", "outcome"]
+)
+
+# Columns a sync overwrites; notes and tags stay under the user's control
+SYNC_UPDATE_COLUMNS = (
+    "card_id", "quantity", "condition", "language", "is_foil",
+    "is_signed", "is_altered", "source"
+)
+
+# Longest error message kept in the sync state
+ERROR_MAX_LENGTH = 1000
+
+
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Read naive datetimes (MySQL DATETIME, SQLite) as UTC."""
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+class CardTraderSyncService:
+    """Service layer for the CardTrader inventory sync."""
+
+    @staticmethod
+    async def get_state(
+        db: AsyncSession,
+        user_id: UUID
+    ) -> Optional[CardTraderSyncState]:
+        """
+        Get a user's CardTrader link and sync state.
+
+        Args:
+            db: Database session
+            user_id: Owner's user ID
+
+        Returns:
+            CardTraderSyncState or None if the user is not linked
+        """
+        result = await db.execute(
+            select(CardTraderSyncState).where(CardTraderSyncState.user_id == user_id)
+        )
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def link(
+        db: AsyncSession,
+        user_id: UUID,
+        api_token: str
+    ) -> CardTraderSyncState:
+        """
+        Store a user's CardTrader API token.
+
+        Resets the watermarks, so the next sync pulls the full inventory
+        of the (possibly different) CardTrader account.
+
+        Args:
+            db: Database session
+            user_id: Owner's user ID
+            api_token: CardTrader API token
+
+        Returns:
+            The sync state
+        """
+        table = CardTraderSyncState.__table__
+        await db.execute(
+            upsert(
+                db.get_bind().dialect.name,
+                table,
+                [{"user_id": user_id, "api_token": api_token}],
+                index_elements=["user_id"],
+                set_=lambda proposed: {
+                    "api_token": proposed.api_token,
+                    "last_synced_at": None,
+                    "last_full_sync_at": None,
+                    "last_error": None
+                }
+            )
+        )
+        await db.commit()
+        state = await CardTraderSyncService.get_state(db, user_id)
+        await db.refresh(state)
+        return state
+
+    @staticmethod
+    async def unlink(
+        db: AsyncSession,
+        user_id: UUID
+    ) -> bool:
+        """
+        Forget a user's CardTrader token; synced items are kept.
+
+        Args:
+            db: Database session
+            user_id: Owner's user ID
+
+        Returns:
+            True if the user was linked
+        """
+        table = CardTraderSyncState.__table__
+        result = await db.execute(delete(table).where(table.c.user_id == user_id))
+        await db.commit()
+        return result.rowcount > 0
+
+    @staticmethod
+    async def _existing_items(
+        db: AsyncSession,
+        user_id: UUID,
+        cardtrader_ids: Optional[List[int]]
+    ) -> Dict[int, dict]:
+        """
+        Load the synced columns of a user's CardTrader items.
+
+        Args:
+            db: Database session
+            user_id: Owner's user ID
+            cardtrader_ids: IDs to load, or None for every item with one
+
+        Returns:
+            Synced columns (plus source) by cardtrader_id
+        """
+        table = CollectionItem.__table__
+        query = select(
+            table.c.cardtrader_id,
+            *(table.c[name] for name in SYNC_UPDATE_COLUMNS)
+        ).where(table.c.user_id == user_id)
+
+        if cardtrader_ids is None:
+            result = await db.execute(query.where(table.c.cardtrader_id.isnot(None)))
+            return {row["cardtrader_id"]: dict(row) for row in result.mappings()}
+
+        existing = {}
+        batch_size = settings.CARDTRADER_SYNC_BATCH_SIZE
+        for i in range(0, len(cardtrader_ids), batch_size):
+            result = await db.execute(
+                query.where(table.c.cardtrader_id.in_(cardtrader_ids[i:i + batch_size]))
+            )
+            existing.update((row["cardtrader_id"], dict(row)) for row in result.mappings())
+        return existing
+
+    @staticmethod
+    async def sync_user(
+        db: AsyncSession,
+        client: CardTraderClient,
+        user_id: UUID,
+        full: bool = False
+    ) -> dict:
+        """
+        Bring a user's CardTrader items up to date with their listings.
+
+        Pulls the listings updated since the user's watermark (minus
+        CARDTRADER_SYNC_OVERLAP_SECONDS), or the whole inventory on the
+        first sync, when requested, or CARDTRADER_FULL_SYNC_HOURS after
+        the last full one. Listings are diffed by cardtrader_id against
+        the stored items: unchanged ones are skipped, the others are
+        upserted with last_synced_at stamped, and listings sold out
+        (quantity 0) are deleted. A full sync also deletes the
+        'cardtrader' items no longer listed, which an incremental pull
+        cannot see.
+
+        Writes are applied in transactions of CARDTRADER_SYNC_BATCH_SIZE
+        items; the watermark only advances once every batch is written,
+        so an interrupted sync is resumed (and re-diffed) from the
+        previous one.
+
+        Args:
+            db: Database session
+            client: CardTrader API client
+            user_id: Owner's user ID
+            full: Pull the whole inventory regardless of the watermark
+
+        Returns:
+            Dict of counters (fetched, created, updated, unchanged,
+            deleted, rejected) and the sync mode
+
+        Raises:
+            HTTPException: If the user is not linked
+            Exception: Any fetch or write error, also stored as last_error
+        """
+        state = await CardTraderSyncService.get_state(db, user_id)
+        if state is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="CardTrader account not linked"
+            )
+
+        api_token = state.api_token
+        last_synced_at = _utc(state.last_synced_at)
+        last_full_sync_at = _utc(state.last_full_sync_at)
+        # Do not hold a transaction open during the API call
+        await db.rollback()
+
+        started = datetime.now(timezone.utc)
+        full = (
+            full
+            or last_synced_at is None
+            or last_full_sync_at is None
+            or started - last_full_sync_at >= timedelta(hours=settings.CARDTRADER_FULL_SYNC_HOURS)
+        )
+        mode = "full" if full else "incremental"
+        stats = {
+            "mode": mode, "fetched": 0, "created": 0, "updated": 0,
+            "unchanged": 0, "deleted": 0, "rejected": 0
+        }
+
+        try:
+            since = None
+            if not full:
+                since = last_synced_at - timedelta(seconds=settings.CARDTRADER_SYNC_OVERLAP_SECONDS)
+            products = await client.export_products(api_token, since)
+            stats["fetched"] = len(products)
+
+            listed: Dict[int, dict] = {}
+            for product in products:
+                listed[product["id"]] = product_to_item(product)
+
+            existing = await CardTraderSyncService._existing_items(
+                db, user_id, None if full else list(listed)
+            )
+            await db.rollback()
+
+            changed = []
+            removed = []
+            for cardtrader_id, item in listed.items():
+                current = existing.get(cardtrader_id)
+                if item["quantity"] <= 0:
+                    if current is not None:
+                        removed.append(cardtrader_id)
+                elif current is not None and all(
+                    current[name] == item[name] for name in SYNC_UPDATE_COLUMNS
+                ):
+                    stats["unchanged"] += 1
+                else:
+                    changed.append(item)
+            if full:
+                removed.extend(
+                    cardtrader_id for cardtrader_id, current in existing.items()
+                    if cardtrader_id not in listed and current["source"] == "cardtrader"
+                )
+
+            batch_size = settings.CARDTRADER_SYNC_BATCH_SIZE
+            for i in range(0, len(changed), batch_size):
+                results = await ItemService.bulk_upsert_items(
+                    db,
+                    user_id,
+                    changed[i:i + batch_size],
+                    update_columns=SYNC_UPDATE_COLUMNS,
+                    synced_at=started
+                )
+                for outcome in results:
+                    stats[outcome["status"]] += 1
+                    if outcome["status"] == "rejected":
+                        logger.warning(
+                            "CardTrader listing %s of user %s rejected: %s",
+                            outcome["cardtrader_id"], user_id, outcome["error"]
+                        )
+            for i in range(0, len(removed), batch_size):
+                stats["deleted"] += await ItemService.delete_by_cardtrader_ids(
+                    db, user_id, removed[i:i + batch_size]
+                )
+
+            values = {"last_synced_at": started, "last_error": None}
+            if full:
+                values["last_full_sync_at"] = started
+            await CardTraderSyncService._update_state(db, user_id, values)
+        except Exception as e:
+            await db.rollback()
+            SYNC_RUNS.labels(mode, "error").inc()
+            message = getattr(e, "detail", None) or str(e) or type(e).__name__
+            await CardTraderSyncService._update_state(
+                db, user_id, {"last_error": message[:ERROR_MAX_LENGTH]}
+            )
+            raise
+
+        SYNC_RUNS.labels(mode, "success").inc()
+        for outcome in ("created", "updated", "unchanged", "deleted", "rejected"):
+            if stats[outcome]:
+                SYNC_ITEMS.labels(outcome).inc(stats[outcome])
+        return stats
+
+    @staticmethod
+    async def _update_state(
+        db: AsyncSession,
+        user_id: UUID,
+        values: dict
+    ) -> None:
+        table = CardTraderSyncState.__table__
+        await db.execute(
+            update(table).where(table.c.user_id == user_id).values(**values)
+        )
+        await db.commit()
@@ -0,0 +1,285 @@
+import base64
+import json
+from datetime import datetime
+from typing import List, NamedTuple, Optional
+from uuid import UUID
+from sqlalchemy import select, insert, update, delete, and_, or_, case, func as sql_func
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import HTTPException, status
+
+from app.models.item import CollectionItem
+from app.models.tombstone import CollectionItemTombstone
+from app.models.version import CollectionVersion
+
+
+# Rows per multi-row statement when recording deletes
+TOMBSTONE_BATCH_SIZE = 500
+
+# Order of the entries sharing a version in the change stream
+WRITE, DELETE = 0, 1
+
+
+class ChangePosition(NamedTuple):
+    """
+    Position in a user's change stream, carried by change tokens.
+
+    Entries are ordered by (version, kind, id); the position is the last
+    entry returned. floor is the version up to which the client's copy
+    was complete when it started reading the stream (its last caught-up
+    token, or the version at its first sync): deletes at or below it
+    concern items the client never received.
+    """
+
+    version: int
+    kind: int
+    id: Optional[UUID]
+    floor: int
+
+
+def encode_change_token(position: ChangePosition) -> str:
+    """
+    Encode a change stream position into an opaque token.
+
+    Args:
+        position: Last position returned to the client
+
+    Returns:
+        URL-safe token string
+    """
+    raw = json.dumps(
+        {
+            "v": position.version,
+            "k": position.kind,
+            "i": str(position.id) if position.id else None,
+            "f": position.floor
+        },
+        separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_change_token(token: str) -> ChangePosition:
+    """
+    Decode a token produced by encode_change_token.
+
+    Args:
+        token: Opaque token string
+
+    Returns:
+        The position it encodes
+
+    Raises:
+        HTTPException: If the token is malformed
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        position = ChangePosition(
+            int(data["v"]),
+            int(data["k"]),
+            UUID(data["i"]) if data["i"] else None,
+            int(data["f"])
+        )
+    except (ValueError, KeyError, TypeError):
+        position = None
+    if (
+        position is None
+        or position.kind not in (WRITE, DELETE)
+        or (position.kind == WRITE and position.id is None)
+        or min(position.version, position.floor) < 0
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid change token"
+        )
+    return position
+
+
+class ChangeService:
+    """Service layer for the collection change feed."""
+
+    @staticmethod
+    async def record_deletes(
+        db: AsyncSession,
+        user_id: UUID,
+        version: int,
+        item_ids: List[UUID]
+    ) -> None:
+        """
+        Write the tombstones of deleted items.
+
+        Runs inside the deleting transaction and does not commit.
+
+        Args:
+            db: Database session
+            user_id: Owner's user ID
+            version: Collection version of the delete
+            item_ids: IDs of the deleted items
+        """
+        rows = [
+            {"user_id": user_id, "version": version, "item_id": item_id}
+            for item_id in item_ids
+        ]
+        table = CollectionItemTombstone.__table__
+        for i in range(0, len(rows), TOMBSTONE_BATCH_SIZE):
+            await db.execute(insert(table), rows[i:i + TOMBSTONE_BATCH_SIZE])
+
+    @staticmethod
+    async def list_changes(
+        db: AsyncSession,
+        user_id: UUID,
+        token: Optional[str] = None,
+        limit: int = 500
+    ) -> dict:
+        """
+        Get the changes to a collection since a change token.
+
+        Items carry the collection version of their last write
+        (change_version) and deletes leave a tombstone with theirs, so
+        the changes since a token are two keyset range scans, whatever
+        the collection size. Without a token every item is returned (a
+        first sync). A page ends after limit entries; its next_token
+        resumes right after them, and the token of the last page is the
+        current collection version, to be stored by the client.
+
+        Args:
+            db: Database session
+            user_id: Owner's user ID
+            token: Token returned by a previous call, if any
+            limit: Maximum number of entries (items plus deletes)
+
+        Returns:
+            Dict with items, deleted (item IDs), next_token and has_more
+
+        Raises:
+            HTTPException: If the token is malformed, or expired because
+                deletes it has not seen were compacted (410, the client
+                must sync from scratch)
+        """
+        result = await db.execute(
+            select(CollectionVersion.version, CollectionVersion.purged_version)
+            .where(CollectionVersion.user_id == user_id)
+        )
+        current, purged = result.one_or_none() or (0, 0)
+
+        if token is None:
+            position = ChangePosition(-1, DELETE, None, current)
+        else:
+            position = decode_change_token(token)
+            if position.version > current or position.floor > current:
+                # Issued from a more recent snapshot (e.g. by a replica
+                # ahead of this one): nothing newer to report yet
+                return {"items": [], "deleted": [], "next_token": token, "has_more": False}
+            if purged > max(position.version, position.floor):
+                raise HTTPException(
+                    status_code=status.HTTP_410_GONE,
+                    detail="Change token expired, full resync required"
+                )
+
+        table = CollectionItem.__table__
+        items_query = select(CollectionItem).where(CollectionItem.user_id == user_id)
+        if position.kind == WRITE:
+            items_query = items_query.where(or_(
+                table.c.change_version > position.version,
+                and_(table.c.change_version == position.version, table.c.id > position.id)
+            ))
+        else:
+            items_query = items_query.where(table.c.change_version > position.version)
+        result = await db.execute(
+            items_query.order_by(table.c.change_version, table.c.id).limit(limit + 1)
+        )
+        entries = [
+            (item.change_version, WRITE, item.id, item)
+            for item in result.scalars()
+        ]
+
+        tombstones = CollectionItemTombstone.__table__
+        tombstones_query = select(tombstones.c.version, tombstones.c.item_id).where(
+            tombstones.c.user_id == user_id
+        )
+        if position.floor >= position.version:
+            tombstones_query = tombstones_query.where(tombstones.c.version > position.floor)
+        elif position.kind == WRITE:
+            tombstones_query = tombstones_query.where(tombstones.c.version >= position.version)
+        elif position.id is not None:
+            tombstones_query = tombstones_query.where(or_(
+                tombstones.c.version > position.version,
+                and_(tombstones.c.version == position.version, tombstones.c.item_id > position.id)
+            ))
+        else:
+            tombstones_query = tombstones_query.where(tombstones.c.version > position.version)
+        result = await db.execute(
+            tombstones_query.order_by(tombstones.c.version, tombstones.c.item_id).limit(limit + 1)
+        )
+        entries.extend((row.version, DELETE, row.item_id, None) for row in result)
+
+        entries.sort(key=lambda entry: entry[:3])
+        has_more = len(entries) > limit
+        entries = entries[:limit]
+
+        if has_more:
+            version, kind, item_id, _ = entries[-1]
+            next_position = ChangePosition(version, kind, item_id, position.floor)
+        else:
+            next_position = ChangePosition(current, DELETE, None, current)
+
+        return {
+            "items": [item for _, kind, _, item in entries if kind == WRITE],
+            "deleted": [item_id for _, kind, item_id, _ in entries if kind == DELETE],
+            "next_token": encode_change_token(next_position),
+            "has_more": has_more
+        }
+
+    @staticmethod
+    async def compact_tombstones(
+        db: AsyncSession,
+        before: datetime
+    ) -> int:
+        """
+        Delete the tombstones recorded before a time.
+
+        Each user's purged_version is raised to their newest compacted
+        tombstone first, in the same transaction, so the change tokens
+        that could have missed a compacted delete are rejected. Users are
+        compacted in separate transactions.
+
+        Args:
+            db: Database session
+            before: Compact tombstones recorded before this time
+
+        Returns:
+            Number of tombstones deleted
+        """
+        tombstones = CollectionItemTombstone.__table__
+        result = await db.execute(
+            select(tombstones.c.user_id, sql_func.max(tombstones.c.version).label("version"))
+            .where(tombstones.c.deleted_at < before)
+            .group_by(tombstones.c.user_id)
+        )
+        compactable = result.all()
+        await db.rollback()
+
+        versions = CollectionVersion.__table__
+        deleted = 0
+        for user_id, version in compactable:
+            try:
+                await db.execute(
+                    update(versions)
+                    .where(versions.c.user_id == user_id)
+                    .values(purged_version=case(
+                        (versions.c.purged_version < version, version),
+                        else_=versions.c.purged_version
+                    ))
+                )
+                result = await db.execute(
+                    delete(tombstones).where(
+                        tombstones.c.user_id == user_id,
+                        tombstones.c.version <= version
+                    )
+                )
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                raise
+            deleted += result.rowcount
+        return deleted
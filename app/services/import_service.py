@@ -0,0 +1,290 @@
+import asyncio
+import csv
+import json
+import logging
+import os
+import tempfile
+from datetime import datetime, timezone
+from typing import AsyncIterator, Callable, List, Optional, Set, Tuple
+from uuid import UUID
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.models.import_job import ImportJob
+from app.schemas.item import ItemCreate
+from app.services.item_service import ItemService
+
+
+logger = logging.getLogger(__name__)
+
+# CSV columns read into ItemCreate; any other column (e.g. the id and
+# timestamps of an export) is ignored
+IMPORT_FIELDS = frozenset(ItemCreate.model_fields)
+
+REQUIRED_COLUMNS = tuple(
+    name for name, field in ItemCreate.model_fields.items() if field.is_required()
+)
+
+# Imports running in this process (referenced until done)
+_tasks: Set[asyncio.Task] = set()
+
+
+def running_imports() -> List[asyncio.Task]:
+    """Return the import tasks running in this process."""
+    return list(_tasks)
+
+
+async def cancel_imports() -> None:
+    """Interrupt the running imports (on shutdown); they are marked failed."""
+    tasks = running_imports()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _row_payload(row: dict) -> dict:
+    """
+    Convert a CSV row to an ItemCreate payload.
+
+    Empty cells are left out (so the schema defaults apply) and tags are
+    read as a JSON array, as exported, or as a comma-separated list.
+    """
+    payload = {
+        name: value for name, value in row.items()
+        if name in IMPORT_FIELDS and value not in ("", None)
+    }
+    tags = payload.get("tags")
+    if tags is not None:
+        if tags.lstrip().startswith("["):
+            try:
+                payload["tags"] = json.loads(tags)
+            except ValueError:
+                pass
+        else:
+            payload["tags"] = [tag.strip() for tag in tags.split(",") if tag.strip()]
+    return payload
+
+
+def _read_chunk(reader: csv.DictReader, size: int) -> List[Tuple[int, dict]]:
+    """Read up to size rows, with the file line each one ends on."""
+    rows = []
+    for row in reader:
+        rows.append((reader.line_num, _row_payload(row)))
+        if len(rows) == size:
+            break
+    return rows
+
+
+class ImportService:
+    """Service layer for background CSV imports."""
+
+    @staticmethod
+    async def spool_upload(chunks: AsyncIterator[bytes]) -> str:
+        """
+        Write an upload to a temporary file as it is received.
+
+        Args:
+            chunks: Request body chunks
+
+        Returns:
+            Path of the temporary file (owned by the caller)
+
+        Raises:
+            HTTPException: If the upload exceeds IMPORT_MAX_BYTES
+        """
+        spool = tempfile.NamedTemporaryFile(
+            prefix="import-", suffix=".csv", dir=settings.IMPORT_TMP_DIR, delete=False
+        )
+        size = 0
+        try:
+            with spool:
+                async for chunk in chunks:
+                    size += len(chunk)
+                    if size > settings.IMPORT_MAX_BYTES:
+                        raise HTTPException(
+                            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                            detail=f"CSV larger than {settings.IMPORT_MAX_BYTES} bytes"
+                        )
+                    spool.write(chunk)
+        except BaseException:
+            os.unlink(spool.name)
+            raise
+        return spool.name
+
+    @staticmethod
+    def check_header(path: str) -> None:
+        """
+        Verify that a CSV file has a header with the required columns.
+
+        Args:
+            path: CSV file
+
+        Raises:
+            HTTPException: If the file is not UTF-8, is empty or misses
+                required columns
+        """
+        try:
+            with open(path, newline="", encoding="utf-8-sig") as f:
+                header = next(csv.reader(f), None)
+        except (UnicodeDecodeError, csv.Error) as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unreadable CSV header: {str(e)}"
+            )
+
+        if not header:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Empty CSV file"
+            )
+        missing = [name for name in REQUIRED_COLUMNS if name not in header]
+        if missing:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Missing CSV columns: {', '.join(missing)}"
+            )
+
+    @staticmethod
+    async def create_job(
+        db: AsyncSession,
+        user_id: UUID
+    ) -> ImportJob:
+        """
+        Record a pending import.
+
+        Args:
+            db: Database session
+            user_id: Owner's user ID
+
+        Returns:
+            Created ImportJob
+        """
+        job = ImportJob(user_id=user_id, status="pending")
+        db.add(job)
+        await db.commit()
+        await db.refresh(job)
+        return job
+
+    @staticmethod
+    async def get_job(
+        db: AsyncSession,
+        job_id: UUID,
+        user_id: UUID
+    ) -> Optional[ImportJob]:
+        """
+        Get an import of a user.
+
+        Args:
+            db: Database session
+            job_id: Import ID
+            user_id: Owner's user ID
+
+        Returns:
+            ImportJob or None if not found / not owned by the user
+        """
+        result = await db.execute(
+            select(ImportJob).where(ImportJob.id == job_id, ImportJob.user_id == user_id)
+        )
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    def start(
+        session_maker: Callable[[], AsyncSession],
+        job_id: UUID,
+        user_id: UUID,
+        path: str
+    ) -> asyncio.Task:
+        """
+        Run an import in the background of this process.
+
+        Args:
+            session_maker: Factory of the session the import writes with
+            job_id: Import ID
+            user_id: Owner's user ID
+            path: Spooled CSV file, deleted once the import ends
+
+        Returns:
+            The import task
+        """
+        task = asyncio.create_task(ImportService.run(session_maker, job_id, user_id, path))
+        _tasks.add(task)
+        task.add_done_callback(_tasks.discard)
+        return task
+
+    @staticmethod
+    async def run(
+        session_maker: Callable[[], AsyncSession],
+        job_id: UUID,
+        user_id: UUID,
+        path: str
+    ) -> None:
+        """
+        Import a spooled CSV file into a user's collection.
+
+        The file is parsed IMPORT_CHUNK_SIZE rows at a time, off the event
+        loop; each chunk is validated and written by
+        ItemService.bulk_upsert_items in its own transaction, then the
+        job's progress is updated. Memory use does not depend on the file
+        size. A failed chunk fails the import; the chunks written before
+        it are kept, as reported by the job counters.
+
+        A job whose process dies mid-import stays 'running'.
+
+        Args:
+            session_maker: Factory of the session the import writes with
+            job_id: Import ID
+            user_id: Owner's user ID
+            path: Spooled CSV file, deleted once the import ends
+        """
+        counts = {"rows_processed": 0, "created": 0, "updated": 0, "rejected": 0}
+        errors = []
+        reader = None
+
+        async with session_maker() as db:
+            try:
+                await ImportService._update(db, job_id, status="running")
+                with open(path, newline="", encoding="utf-8-sig") as f:
+                    reader = csv.DictReader(f)
+                    while True:
+                        rows = await asyncio.to_thread(_read_chunk, reader, settings.IMPORT_CHUNK_SIZE)
+                        if not rows:
+                            break
+
+                        results = await ItemService.bulk_upsert_items(
+                            db, user_id, [payload for _, payload in rows]
+                        )
+                        counts["rows_processed"] += len(rows)
+                        for outcome in results:
+                            counts[outcome["status"]] += 1
+                            if outcome["status"] == "rejected" and len(errors) < settings.IMPORT_MAX_ERRORS:
+                                errors.append({"line": rows[outcome["index"]][0], "error": outcome["error"]})
+                        await ImportService._update(db, job_id, errors=errors or None, **counts)
+
+                await ImportService._update(
+                    db, job_id, status="completed", finished_at=datetime.now(timezone.utc)
+                )
+            except (Exception, asyncio.CancelledError) as e:
+                if isinstance(e, asyncio.CancelledError):
+                    message = "Import interrupted"
+                elif isinstance(e, (UnicodeDecodeError, csv.Error)):
+                    message = f"Unreadable CSV at line {reader.line_num if reader else 1}: {str(e)}"
+                else:
+                    message = getattr(e, "detail", None) or str(e)
+                logger.error("Import %s of user %s failed: %s", job_id, user_id, message)
+                await db.rollback()
+                await ImportService._update(
+                    db, job_id, status="failed", error=message,
+                    finished_at=datetime.now(timezone.utc)
+                )
+                if isinstance(e, asyncio.CancelledError):
+                    raise
+            finally:
+                os.unlink(path)
+
+    @staticmethod
+    async def _update(db: AsyncSession, job_id: UUID, **values) -> None:
+        table = ImportJob.__table__
+        await db.execute(update(table).where(table.c.id == job_id).values(**values))
+        await db.commit()
@@ -1,11 +1,198 @@
-from typing import Optional, List, Tuple
-from uuid import UUID
-from sqlalchemy import select, func as sql_func
+import base64
+import json
+import re
+from datetime import datetime
+from typing import Optional, List, Tuple, Any, Dict, AsyncIterator
+from uuid import UUID, uuid4
+from cachetools import LRUCache, TTLCache
+from pydantic import ValidationError
+from sqlalchemy import select, insert, update, delete, and_, or_, case, bindparam, true, func as sql_func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from fastapi import HTTPException, status
 
+from app.core.config import settings
+from app.models.database import upsert
 from app.models.item import CollectionItem
+from app.schemas.item import ItemCreate
+from app.services.change_service import ChangeService
+from app.services.summary_service import SummaryService, SUMMARY_FIELDS, summary_fields
+from app.services.tag_service import TagService, normalize_tag
+from app.services.version_service import VersionService
+
+
+# Rows per multi-row INSERT statement in bulk writes
+BULK_BATCH_SIZE = 500
+
+# Rows fetched per round trip when streaming a whole collection
+EXPORT_BATCH_SIZE = 1000
+
+# card_ids per IN list in owned lookups
+OWNED_BATCH_SIZE = 1000
+
+# Columns overwritten when a bulk row matches an existing cardtrader_id
+BULK_UPDATE_COLUMNS = (
+    "card_id", "quantity", "condition", "language", "is_foil",
+    "is_signed", "is_altered", "notes", "tags", "source"
+)
+
+# Columns identifying a card variant, the key items are stacked on
+STACK_COLUMNS = ("card_id", "condition", "language", "is_foil", "is_signed", "is_altered")
+
+# Variant groups consolidated per transaction
+CONSOLIDATE_BATCH_SIZE = 500
+
+# Fields only the tag and notes filters depend on
+SEARCH_FIELDS = ("notes", "tags")
+
+# Shortest word in the InnoDB FULLTEXT index (innodb_ft_min_token_size)
+FULLTEXT_MIN_WORD_LENGTH = 3
+
+# Per-user list totals: user -> (collection version, LRU {filters: total})
+_count_cache: Optional[TTLCache] = None
+
+
+def _get_count_cache() -> TTLCache:
+    """Return the list total cache, creating it on first use."""
+    global _count_cache
+    
+    if _count_cache is None:
+        _count_cache = TTLCache(
+            maxsize=settings.COUNT_CACHE_MAXSIZE,
+            ttl=settings.COUNT_CACHE_TTL
+        )
+    return _count_cache
+
+
+def invalidate_counts(user_id: UUID) -> None:
+    """Forget the cached list totals of a user after a committed write."""
+    if _count_cache is not None:
+        _count_cache.pop(str(user_id), None)
+
+
+def reset_count_cache() -> None:
+    """Drop the list total cache (used by tests)."""
+    global _count_cache
+    _count_cache = None
+
+
+def encode_cursor(item: CollectionItem) -> str:
+    """
+    Encode the keyset position of an item into an opaque cursor.
+    
+    Args:
+        item: Last item of the current page
+        
+    Returns:
+        URL-safe cursor string
+    """
+    raw = json.dumps(
+        {"a": item.added_at.isoformat(), "i": str(item.id)},
+        separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """
+    Decode a cursor produced by encode_cursor.
+    
+    Args:
+        cursor: Opaque cursor string
+        
+    Returns:
+        Tuple of (added_at, id) of the last item already returned
+        
+    Raises:
+        HTTPException: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(data["a"]), UUID(data["i"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def notes_filter(q: str, dialect_name: str):
+    """
+    Build the condition matching items whose notes contain every word of q.
+    
+    On MySQL/MariaDB words are looked up in the FULLTEXT index (prefix
+    match); words shorter than the indexed minimum, and every word on
+    other backends, fall back to a LIKE substring match.
+    
+    Args:
+        q: Search text
+        dialect_name: Name of the bound dialect
+        
+    Returns:
+        SQL condition, or None when q holds no words
+    """
+    words = re.findall(r"\w+", q)
+    if not words:
+        return None
+    
+    conditions = []
+    if dialect_name == "mysql":
+        indexed = [word for word in words if len(word) >= FULLTEXT_MIN_WORD_LENGTH]
+        if indexed:
+            from sqlalchemy.dialects.mysql import match
+            conditions.append(
+                match(
+                    CollectionItem.notes,
+                    against=" ".join(f"+{word}*" for word in indexed)
+                ).in_boolean_mode()
+            )
+        words = [word for word in words if len(word) < FULLTEXT_MIN_WORD_LENGTH]
+    
+    conditions += [CollectionItem.notes.contains(word, autoescape=True) for word in words]
+    return and_(*conditions)
+
+
+def _item_not_found() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="Item not found or access denied"
+    )
+
+
+async def _adjust_error(
+    db: AsyncSession,
+    user_id: UUID,
+    deltas: Dict[UUID, int],
+    delete_if_empty: bool
+) -> HTTPException:
+    """Explain why an adjustment batch did not apply to every item."""
+    table = CollectionItem.__table__
+    item_ids = list(deltas)
+    quantities = {}
+    for i in range(0, len(item_ids), BULK_BATCH_SIZE):
+        result = await db.execute(
+            select(table.c.id, table.c.quantity)
+            .where(table.c.user_id == user_id)
+            .where(table.c.id.in_(item_ids[i:i + BULK_BATCH_SIZE]))
+        )
+        quantities.update(result.all())
+    
+    missing = [item_id for item_id in item_ids if item_id not in quantities]
+    if missing:
+        if len(item_ids) == 1:
+            return _item_not_found()
+        return HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Items not found or access denied: {', '.join(map(str, missing))}"
+        )
+    
+    minimum = 0 if delete_if_empty else 1
+    short = [item_id for item_id in item_ids if quantities[item_id] + deltas[item_id] < minimum]
+    detail = "Insufficient quantity"
+    if len(item_ids) > 1:
+        detail += f" for items: {', '.join(map(str, short))}"
+    return HTTPException(status_code=status.HTTP_409_CONFLICT, detail=detail)
 
 
 class ItemService:
@@ -32,12 +219,21 @@ class ItemService:
             HTTPException: If creation fails
         """
         try:
+            version = await VersionService.bump(db, user_id)
             item = CollectionItem(
                 user_id=user_id,
+                change_version=version,
                 **item_data
             )
             db.add(item)
+            await db.flush()
+            if item.tags:
+                await TagService.add(db, user_id, {item.id: item.tags})
+            await SummaryService.apply_changes(
+                db, user_id, added=[summary_fields(item)]
+            )
             await db.commit()
+            invalidate_counts(user_id)
             await db.refresh(item)
             return item
         except Exception as e:
@@ -47,6 +243,320 @@ class ItemService:
                 detail=f"Failed to create item: {str(e)}"
             )
     
+    @staticmethod
+    async def add_to_stack(
+        db: AsyncSession,
+        user_id: UUID,
+        item_data: dict
+    ) -> Tuple[CollectionItem, bool]:
+        """
+        Add copies to the user's stack of a card variant, creating it if needed.
+        
+        A single INSERT ... ON DUPLICATE KEY UPDATE quantity = quantity + N
+        on the uq_user_stack key, so concurrent adds never lose copies nor
+        create a second stack. The other fields (notes, tags, source) only
+        apply when the stack is created. Rows created without merging are
+        not stacks; see consolidate_stacks.
+        
+        Args:
+            db: Database session
+            user_id: Owner's user ID
+            item_data: Dictionary containing item fields (no cardtrader_id)
+            
+        Returns:
+            Tuple of (the stack, whether it was created)
+            
+        Raises:
+            HTTPException: If the write fails
+        """
+        table = CollectionItem.__table__
+        dialect_name = db.get_bind().dialect.name
+        item_id = uuid4()
+        
+        try:
+            version = await VersionService.bump(db, user_id)
+            row = {
+                **item_data,
+                "id": item_id,
+                "user_id": user_id,
+                # Part of the stack key: null flags (left out by the
+                # router) mean False, as on a plain create
+                "is_signed": bool(item_data.get("is_signed")),
+                "is_altered": bool(item_data.get("is_altered")),
+                "is_stack": True,
+                "change_version": version
+            }
+            await db.execute(
+                upsert(
+                    dialect_name,
+                    table,
+                    [row],
+                    index_elements=["user_id", *STACK_COLUMNS, "is_stack"],
+                    set_=lambda proposed: {
+                        "quantity": table.c.quantity + proposed.quantity,
+                        "change_version": proposed.change_version,
+                        "updated_at": sql_func.now()
+                    }
+                )
+            )
+            result = await db.execute(
+                select(CollectionItem)
+                .where(CollectionItem.user_id == user_id)
+                .where(*(table.c[name] == row[name] for name in STACK_COLUMNS))
+                .where(CollectionItem.is_stack == true())
+                .execution_options(populate_existing=True)
+            )
+            item = result.scalar_one()
+            created = item.id == item_id
+            
+            if created:
+                if item.tags:
+                    await TagService.add(db, user_id, {item.id: item.tags})
+                await SummaryService.apply_changes(
+                    db, user_id, added=[summary_fields(item)]
+                )
+            else:
+                after = summary_fields(item)
+                before = dict(after, quantity=after["quantity"] - row["quantity"])
+                await SummaryService.apply_changes(
+                    db, user_id, removed=[before], added=[after]
+                )
+            await db.commit()
+            invalidate_counts(user_id)
+            await db.refresh(item)
+            return item, created
+        except Exception as e:
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to create item: {str(e)}"
+            )
+    
+    @staticmethod
+    async def bulk_upsert_items(
+        db: AsyncSession,
+        user_id: UUID,
+        items: List[Dict[str, Any]],
+        update_columns: Tuple[str, ...] = BULK_UPDATE_COLUMNS,
+        synced_at: Optional[datetime] = None
+    ) -> List[dict]:
+        """
+        Create or update many items in a single transaction.
+        
+        Rows carrying a cardtrader_id that already exists in the user's
+        collection update that item; every other valid row is inserted.
+        Rows are written with multi-row INSERT ... ON DUPLICATE KEY UPDATE
+        statements of BULK_BATCH_SIZE rows each. The collection version is
+        bumped first and the matching items are locked while resolved, like
+        update_item; a cardtrader_id owned by another user is rejected, even
+        when that user inserts it concurrently.
+        
+        Args:
+            db: Database session
+            user_id: Owner's user ID
+            items: Raw item payloads, validated one by one
+            update_columns: Columns overwritten on existing items (must
+                include every summary field)
+            synced_at: If set, stamped as last_synced_at on every written row
+            
+        Returns:
+            Per-row outcome dicts (index, status, id, cardtrader_id, error)
+            
+        Raises:
+            HTTPException: If the write fails
+        """
+        results: List[dict] = []
+        valid: List[Tuple[int, ItemCreate]] = []
+        seen_cardtrader_ids = set()
+        
+        for index, raw in enumerate(items):
+            try:
+                item = ItemCreate.model_validate(raw)
+            except ValidationError as e:
+                error = e.errors()[0]
+                location = ".".join(str(part) for part in error["loc"])
+                results.append({
+                    "index": index,
+                    "status": "rejected",
+                    "cardtrader_id": raw.get("cardtrader_id") if isinstance(raw, dict) else None,
+                    "error": f"{location}: {error['msg']}" if location else error["msg"]
+                })
+                continue
+            
+            if item.cardtrader_id is not None:
+                if item.cardtrader_id in seen_cardtrader_ids:
+                    results.append({
+                        "index": index,
+                        "status": "rejected",
+                        "cardtrader_id": item.cardtrader_id,
+                        "error": "Duplicate cardtrader_id in request"
+                    })
+                    continue
+                seen_cardtrader_ids.add(item.cardtrader_id)
+            
+            valid.append((index, item))
+        
+        if not valid:
+            results.sort(key=lambda outcome: outcome["index"])
+            return results
+        
+        table = CollectionItem.__table__
+        dialect_name = db.get_bind().dialect.name
+        
+        def update_set(proposed) -> dict:
+            values = {name: proposed[name] for name in update_columns}
+            if synced_at is not None:
+                values["last_synced_at"] = proposed["last_synced_at"]
+            values["change_version"] = proposed["change_version"]
+            values["updated_at"] = sql_func.now()
+            # cardtrader_id is unique across users: a row of another user
+            # inserted since the lookup below is left untouched
+            owned = table.c.user_id == proposed["user_id"]
+            return {
+                name: case((owned, value), else_=table.c[name])
+                for name, value in values.items()
+            }
+        
+        try:
+            version = await VersionService.bump(db, user_id)
+            
+            # Resolve which cardtrader_ids already exist, who owns them and
+            # their current summary fields; the rows stay locked until the
+            # commit, so they cannot change or vanish in between
+            existing: Dict[int, dict] = {}
+            cardtrader_ids = list(seen_cardtrader_ids)
+            for i in range(0, len(cardtrader_ids), BULK_BATCH_SIZE):
+                result = await db.execute(
+                    select(
+                        table.c.cardtrader_id,
+                        table.c.id,
+                        table.c.user_id,
+                        *(table.c[name] for name in SUMMARY_FIELDS)
+                    ).where(
+                        table.c.cardtrader_id.in_(cardtrader_ids[i:i + BULK_BATCH_SIZE])
+                    ).with_for_update()
+                )
+                for row in result.mappings():
+                    existing[row["cardtrader_id"]] = dict(row)
+            
+            rows = []
+            removed = []
+            updated_ids = []
+            outcomes = {}
+            for index, item in valid:
+                match = existing.get(item.cardtrader_id)
+                if match is not None and str(match["user_id"]) != str(user_id):
+                    results.append({
+                        "index": index,
+                        "status": "rejected",
+                        "cardtrader_id": item.cardtrader_id,
+                        "error": "cardtrader_id belongs to another collection"
+                    })
+                    continue
+                
+                if match is not None:
+                    item_id = match["id"]
+                    removed.append(summary_fields(match))
+                    updated_ids.append(item_id)
+                else:
+                    item_id = uuid4()
+                data = item.model_dump()
+                row = {
+                    **data,
+                    "id": item_id,
+                    "user_id": user_id,
+                    "is_signed": bool(item.is_signed),
+                    "is_altered": bool(item.is_altered),
+                    "change_version": version
+                }
+                if synced_at is not None:
+                    row["last_synced_at"] = synced_at
+                rows.append(row)
+                outcomes[item_id] = {
+                    "index": index,
+                    "status": "updated" if match is not None else "created",
+                    "id": item_id,
+                    "cardtrader_id": item.cardtrader_id
+                }
+            
+            # Rows without a cardtrader_id cannot conflict: a plain INSERT run
+            # as executemany is compiled once, and batched into multi-row
+            # statements by the driver
+            keyed_rows = [row for row in rows if row["cardtrader_id"] is not None]
+            plain_rows = [row for row in rows if row["cardtrader_id"] is None]
+            
+            for i in range(0, len(keyed_rows), BULK_BATCH_SIZE):
+                await db.execute(
+                    upsert(
+                        dialect_name,
+                        table,
+                        keyed_rows[i:i + BULK_BATCH_SIZE],
+                        index_elements=["cardtrader_id"],
+                        set_=update_set
+                    )
+                )
+            for i in range(0, len(plain_rows), BULK_BATCH_SIZE):
+                await db.execute(insert(table), plain_rows[i:i + BULK_BATCH_SIZE])
+            
+            # New cardtrader_ids claimed by another user since the lookup
+            # hit the guard above instead of being inserted
+            created_keys = [
+                row["cardtrader_id"] for row in keyed_rows
+                if outcomes[row["id"]]["status"] == "created"
+            ]
+            taken = set()
+            for i in range(0, len(created_keys), BULK_BATCH_SIZE):
+                result = await db.execute(
+                    select(table.c.cardtrader_id)
+                    .where(table.c.cardtrader_id.in_(created_keys[i:i + BULK_BATCH_SIZE]))
+                    .where(table.c.user_id != user_id)
+                )
+                taken.update(result.scalars())
+            if taken:
+                for row in rows:
+                    if row["cardtrader_id"] in taken:
+                        outcome = outcomes.pop(row["id"])
+                        outcome.update(
+                            status="rejected", id=None,
+                            error="cardtrader_id belongs to another collection"
+                        )
+                        results.append(outcome)
+                rows = [row for row in rows if row["cardtrader_id"] not in taken]
+            results.extend(outcomes.values())
+            
+            if not rows:
+                await db.rollback()
+                results.sort(key=lambda outcome: outcome["index"])
+                return results
+            
+            # Items whose tags column is left alone keep their indexed tags
+            if "tags" in update_columns:
+                tagged_rows = rows
+            else:
+                updated = set(updated_ids)
+                tagged_rows = [row for row in rows if row["id"] not in updated]
+                updated_ids = []
+            
+            await TagService.remove(db, updated_ids)
+            await TagService.add(db, user_id, {row["id"]: row["tags"] for row in tagged_rows})
+            await SummaryService.apply_changes(
+                db,
+                user_id,
+                removed=removed,
+                added=[summary_fields(row) for row in rows]
+            )
+            await db.commit()
+            invalidate_counts(user_id)
+        except Exception as e:
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to write items: {str(e)}"
+            )
+        
+        results.sort(key=lambda outcome: outcome["index"])
+        return results
+    
     @staticmethod
     async def get_item_by_id(
         db: AsyncSession,
@@ -75,10 +585,7 @@ class ItemService:
         item = result.scalar_one_or_none()
         
         if not item:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Item not found or access denied"
-            )
+            raise _item_not_found()
         
         return item
     
@@ -90,22 +597,47 @@ class ItemService:
         offset: int = 0,
         language: Optional[str] = None,
         is_foil: Optional[bool] = None,
-        source: Optional[str] = None
-    ) -> Tuple[List[CollectionItem], int]:
+        source: Optional[str] = None,
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+        version: Optional[int] = None,
+        tags: Optional[List[str]] = None,
+        match_all_tags: bool = False,
+        q: Optional[str] = None
+    ) -> Tuple[List[CollectionItem], Optional[int], Optional[str]]:
         """
         List items for a user with optional filtering and pagination.
         
+        Pages are ordered by (added_at, id) descending. When a cursor is
+        given the page starts right after the encoded position (keyset
+        pagination), so the cost does not grow with the page depth;
+        otherwise the classic offset is applied.
+        
+        The total is cached per user and filter combination until the
+        next write of that user (or COUNT_CACHE_TTL seconds, which bounds
+        staleness when another worker handled the write); only the
+        COUNT_CACHE_FILTERS most recently used combinations are kept per
+        user, whatever the free-text searches sent. Callers that
+        know the collection version pass it, so totals cached at another
+        version are never reused.
+        
         Args:
             db: Database session
             user_id: Owner's user ID
             limit: Maximum number of items to return
-            offset: Number of items to skip
+            offset: Number of items to skip (ignored in cursor mode)
             language: Optional language filter
             is_foil: Optional foil filter
             source: Optional source filter
+            cursor: Optional cursor returned by a previous page
+            include_total: Whether to compute the total count
+            version: Collection version read in the same transaction
+            tags: Optional tag filter (items carrying any of the tags)
+            match_all_tags: Require every tag instead of any of them
+            q: Optional notes search text (every word must match)
             
         Returns:
-            Tuple of (items list, total count)
+            Tuple of (items list, total count or None, next cursor or None)
         """
         # Build base query
         query = select(CollectionItem).where(CollectionItem.user_id == user_id)
@@ -120,22 +652,169 @@ class ItemService:
         if source is not None:
             query = query.where(CollectionItem.source == source)
         
+        if tags:
+            query = query.where(
+                CollectionItem.id.in_(TagService.tagged_items(user_id, tags, match_all_tags))
+            )
+        
+        if q is not None:
+            condition = notes_filter(q, db.get_bind().dialect.name)
+            if condition is not None:
+                query = query.where(condition)
+        
         # Get total count
-        count_query = select(sql_func.count()).select_from(
-            query.subquery()
-        )
-        total_result = await db.execute(count_query)
-        total = total_result.scalar_one()
+        total = None
+        if include_total:
+            cache = _get_count_cache()
+            cache_key = str(user_id)
+            entry = cache.get(cache_key)
+            if entry is None or entry[0] != version:
+                # Totals cached at another collection version are stale
+                entry = cache[cache_key] = (
+                    version, LRUCache(maxsize=settings.COUNT_CACHE_FILTERS)
+                )
+            counts = entry[1]
+            
+            filters = (
+                language, is_foil, source,
+                tuple(sorted({normalize_tag(tag) for tag in tags})) if tags else None,
+                match_all_tags, q
+            )
+            total = counts.get(filters)
+            if total is None:
+                count_query = select(sql_func.count()).select_from(
+                    query.subquery()
+                )
+                total_result = await db.execute(count_query)
+                total = total_result.scalar_one()
+                # A write committed meanwhile dropped the entry, and this
+                # count may predate it: return it without caching
+                if cache.get(cache_key) is entry:
+                    counts[filters] = total
         
         # Apply pagination and ordering
-        query = query.order_by(CollectionItem.added_at.desc())
-        query = query.limit(limit).offset(offset)
+        query = query.order_by(
+            CollectionItem.added_at.desc(),
+            CollectionItem.id.desc()
+        )
+        
+        if cursor is not None:
+            added_at, item_id = decode_cursor(cursor)
+            query = query.where(
+                or_(
+                    CollectionItem.added_at < added_at,
+                    and_(
+                        CollectionItem.added_at == added_at,
+                        CollectionItem.id < item_id
+                    )
+                )
+            )
+        else:
+            query = query.offset(offset)
+        
+        # Fetch one extra row to know whether another page exists
+        query = query.limit(limit + 1)
         
         # Execute query
         result = await db.execute(query)
-        items = result.scalars().all()
+        items = list(result.scalars().all())
         
-        return list(items), total
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            next_cursor = encode_cursor(items[-1])
+        
+        return items, total, next_cursor
+    
+    @staticmethod
+    async def owned_cards(
+        db: AsyncSession,
+        user_id: UUID,
+        card_ids: List[UUID]
+    ) -> List[dict]:
+        """
+        Aggregate the owned copies of many cards.
+        
+        Runs one GROUP BY query per OWNED_BATCH_SIZE card IDs, each an
+        IN list of range lookups on idx_user_card, so the cost depends on
+        the requested cards rather than on the collection size.
+        
+        Args:
+            db: Database session
+            user_id: Owner's user ID
+            card_ids: Cards to look up
+            
+        Returns:
+            Dicts matching OwnedCard, in request order, for owned cards only
+        """
+        card_ids = list(dict.fromkeys(card_ids))
+        table = CollectionItem.__table__
+        owned: Dict[UUID, dict] = {}
+        
+        for i in range(0, len(card_ids), OWNED_BATCH_SIZE):
+            result = await db.execute(
+                select(
+                    table.c.card_id,
+                    table.c.condition,
+                    table.c.language,
+                    table.c.is_foil,
+                    sql_func.sum(table.c.quantity).label("quantity")
+                )
+                .where(table.c.user_id == user_id)
+                .where(table.c.card_id.in_(card_ids[i:i + OWNED_BATCH_SIZE]))
+                .group_by(
+                    table.c.card_id,
+                    table.c.condition,
+                    table.c.language,
+                    table.c.is_foil
+                )
+            )
+            for row in result.mappings():
+                card = owned.setdefault(
+                    row["card_id"],
+                    {"card_id": row["card_id"], "quantity": 0, "variants": []}
+                )
+                card["quantity"] += row["quantity"]
+                card["variants"].append({
+                    "condition": row["condition"],
+                    "language": row["language"],
+                    "is_foil": row["is_foil"],
+                    "quantity": row["quantity"]
+                })
+        
+        return [owned[card_id] for card_id in card_ids if card_id in owned]
+    
+    @staticmethod
+    async def stream_items(
+        db: AsyncSession,
+        user_id: UUID,
+        columns: List[str]
+    ) -> AsyncIterator[List[dict]]:
+        """
+        Stream a user's whole collection in batches from a server-side cursor.
+        
+        Rows are plain mappings (no ORM objects) and only EXPORT_BATCH_SIZE
+        of them are held in memory at a time.
+        
+        Args:
+            db: Database session
+            user_id: Owner's user ID
+            columns: Names of the columns to fetch
+            
+        Yields:
+            Lists of row mappings, newest first
+        """
+        table = CollectionItem.__table__
+        query = (
+            select(*(table.c[name] for name in columns))
+            .where(table.c.user_id == user_id)
+            .order_by(table.c.added_at.desc(), table.c.id.desc())
+            .execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        
+        result = await db.stream(query)
+        async for partition in result.mappings().partitions():
+            yield partition
     
     @staticmethod
     async def update_item(
@@ -147,6 +826,11 @@ class ItemService:
         """
         Update an existing item, verifying ownership.
         
+        Issues a single UPDATE scoped to the owner and reads the new row
+        back with RETURNING where the backend supports it (one SELECT
+        after the UPDATE otherwise). The old row is only locked and read
+        first when summary fields change.
+        
         Args:
             db: Database session
             item_id: Item ID
@@ -159,18 +843,61 @@ class ItemService:
         Raises:
             HTTPException: If item not found, access denied, or update fails
         """
-        # Get item first to verify ownership
-        item = await ItemService.get_item_by_id(db, item_id, user_id)
+        values = {key: value for key, value in item_data.items() if value is not None}
+        if not values:
+            return await ItemService.get_item_by_id(db, item_id, user_id)
+        
+        table = CollectionItem.__table__
+        owned = and_(table.c.id == item_id, table.c.user_id == user_id)
+        returning = db.get_bind().dialect.update_returning
         
-        # Update fields
-        for key, value in item_data.items():
-            if value is not None:
-                setattr(item, key, value)
+        if any(name in values for name in (*STACK_COLUMNS, "cardtrader_id")):
+            # The item leaves its stack rather than colliding with another
+            values["is_stack"] = None
         
         try:
+            values["change_version"] = await VersionService.bump(db, user_id)
+            before = None
+            if any(name in values for name in SUMMARY_FIELDS):
+                result = await db.execute(
+                    select(*(table.c[name] for name in SUMMARY_FIELDS))
+                    .where(owned)
+                    .with_for_update()
+                )
+                before = result.mappings().one_or_none()
+                if before is None:
+                    raise _item_not_found()
+            
+            statement = update(table).where(owned).values(**values)
+            if returning:
+                result = await db.execute(statement.returning(*table.c))
+                row = result.mappings().one_or_none()
+            else:
+                result = await db.execute(statement)
+                row = None
+                if result.rowcount:
+                    result = await db.execute(select(*table.c).where(owned))
+                    row = result.mappings().one_or_none()
+            if row is None:
+                raise _item_not_found()
+            
+            if "tags" in values:
+                await TagService.remove(db, [item_id])
+                await TagService.add(db, user_id, {item_id: values["tags"]})
+            
+            if before is not None:
+                after = summary_fields(dict(row))
+                if after != summary_fields(dict(before)):
+                    await SummaryService.apply_changes(
+                        db, user_id, removed=[dict(before)], added=[after]
+                    )
             await db.commit()
-            await db.refresh(item)
-            return item
+            if before is not None or any(name in values for name in SEARCH_FIELDS):
+                invalidate_counts(user_id)
+            return CollectionItem(**row)
+        except HTTPException:
+            await db.rollback()
+            raise
         except Exception as e:
             await db.rollback()
             raise HTTPException(
@@ -178,6 +905,116 @@ class ItemService:
                 detail=f"Failed to update item: {str(e)}"
             )
     
+    @staticmethod
+    async def adjust_quantities(
+        db: AsyncSession,
+        user_id: UUID,
+        deltas: Dict[UUID, int],
+        delete_if_empty: bool = False
+    ) -> Tuple[List[CollectionItem], List[UUID]]:
+        """
+        Add copies to (or remove copies from) items, in one transaction.
+        
+        Quantities are changed in place by UPDATE ... SET quantity =
+        quantity + delta WHERE quantity + delta > 0, one statement per
+        BULK_BATCH_SIZE items (the delta is a CASE on the id): no row is
+        read first, so concurrent adjustments (trades, sales) all apply.
+        Items brought to exactly zero are deleted if delete_if_empty is
+        set, as check_positive_quantity forbids empty rows. The batch is
+        all or nothing.
+        
+        Args:
+            db: Database session
+            user_id: Owner's user ID for ownership verification
+            deltas: Quantity change by item ID
+            delete_if_empty: Delete the items whose quantity reaches zero
+            
+        Returns:
+            Tuple of (updated items, IDs of the deleted items)
+            
+        Raises:
+            HTTPException: 404 if an item is not found or not owned, 409 if
+                a quantity would go below one (below zero when deleting
+                empty items), 500 if the write fails
+        """
+        table = CollectionItem.__table__
+        dialect = db.get_bind().dialect
+        item_ids = list(deltas)
+        columns = [table.c.id, table.c.tags] + [table.c[name] for name in SUMMARY_FIELDS]
+        
+        try:
+            version = await VersionService.bump(db, user_id)
+            updated, deleted = [], []
+            for i in range(0, len(item_ids), BULK_BATCH_SIZE):
+                batch = item_ids[i:i + BULK_BATCH_SIZE]
+                owned = and_(table.c.user_id == user_id, table.c.id.in_(batch))
+                remaining = table.c.quantity + case(
+                    *((table.c.id == item_id, deltas[item_id]) for item_id in batch)
+                )
+                
+                if delete_if_empty:
+                    emptied = and_(owned, remaining == 0)
+                    if dialect.delete_returning:
+                        result = await db.execute(delete(table).where(emptied).returning(*columns))
+                        rows = result.mappings().all()
+                    else:
+                        result = await db.execute(select(*columns).where(emptied).with_for_update())
+                        rows = result.mappings().all()
+                        if rows:
+                            await db.execute(
+                                delete(table).where(table.c.id.in_([row["id"] for row in rows]))
+                            )
+                    deleted.extend(rows)
+                
+                statement = (
+                    update(table)
+                    .where(owned, remaining > 0)
+                    .values(quantity=remaining, change_version=version)
+                )
+                if dialect.update_returning:
+                    result = await db.execute(statement.returning(*table.c))
+                    updated.extend(result.mappings().all())
+                else:
+                    result = await db.execute(statement)
+                    if result.rowcount:
+                        # Only this transaction writes the new version
+                        result = await db.execute(
+                            select(*table.c).where(owned, table.c.change_version == version)
+                        )
+                        updated.extend(result.mappings().all())
+            
+            if len(updated) + len(deleted) < len(item_ids):
+                raise await _adjust_error(db, user_id, deltas, delete_if_empty)
+            
+            removed = [summary_fields(dict(row)) for row in deleted]
+            added = []
+            for row in updated:
+                after = summary_fields(dict(row))
+                removed.append(dict(after, quantity=after["quantity"] - deltas[row["id"]]))
+                added.append(after)
+            await SummaryService.apply_changes(db, user_id, removed=removed, added=added)
+            
+            deleted_ids = [row["id"] for row in deleted]
+            if deleted_ids:
+                await TagService.remove(db, [row["id"] for row in deleted if row["tags"]])
+                await ChangeService.record_deletes(db, user_id, version, deleted_ids)
+            await db.commit()
+            if deleted_ids:
+                invalidate_counts(user_id)
+        except HTTPException:
+            await db.rollback()
+            raise
+        except Exception as e:
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to adjust items: {str(e)}"
+            )
+        
+        position = {item_id: index for index, item_id in enumerate(item_ids)}
+        updated.sort(key=lambda row: position[row["id"]])
+        return [CollectionItem(**row) for row in updated], deleted_ids
+    
     @staticmethod
     async def delete_item(
         db: AsyncSession,
@@ -187,6 +1024,10 @@ class ItemService:
         """
         Delete an item, verifying ownership.
         
+        Issues a single DELETE scoped to the owner, returning the summary
+        fields of the deleted row where the backend supports it (locking
+        and reading them first otherwise).
+        
         Args:
             db: Database session
             item_id: Item ID
@@ -198,17 +1039,201 @@ class ItemService:
         Raises:
             HTTPException: If item not found, access denied, or deletion fails
         """
-        # Get item first to verify ownership
-        item = await ItemService.get_item_by_id(db, item_id, user_id)
+        table = CollectionItem.__table__
+        owned = and_(table.c.id == item_id, table.c.user_id == user_id)
+        columns = [table.c[name] for name in SUMMARY_FIELDS] + [table.c.tags]
         
         try:
-            await db.delete(item)
+            version = await VersionService.bump(db, user_id)
+            if db.get_bind().dialect.delete_returning:
+                result = await db.execute(delete(table).where(owned).returning(*columns))
+                row = result.mappings().one_or_none()
+            else:
+                result = await db.execute(select(*columns).where(owned).with_for_update())
+                row = result.mappings().one_or_none()
+                if row is not None:
+                    await db.execute(delete(table).where(owned))
+            if row is None:
+                raise _item_not_found()
+            
+            if row["tags"]:
+                await TagService.remove(db, [item_id])
+            await SummaryService.apply_changes(db, user_id, removed=[dict(row)])
+            await ChangeService.record_deletes(db, user_id, version, [item_id])
             await db.commit()
+            invalidate_counts(user_id)
             return True
+        except HTTPException:
+            await db.rollback()
+            raise
         except Exception as e:
             await db.rollback()
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Failed to delete item: {str(e)}"
             )
-
+    
+    @staticmethod
+    async def delete_by_cardtrader_ids(
+        db: AsyncSession,
+        user_id: UUID,
+        cardtrader_ids: List[int]
+    ) -> int:
+        """
+        Delete a user's items by CardTrader ID, in a single transaction.
+        
+        IDs not found in the user's collection are ignored.
+        
+        Args:
+            db: Database session
+            user_id: Owner's user ID
+            cardtrader_ids: CardTrader IDs of the items to delete
+            
+        Returns:
+            Number of deleted items
+            
+        Raises:
+            HTTPException: If the deletion fails
+        """
+        table = CollectionItem.__table__
+        columns = [table.c.id, table.c.tags] + [table.c[name] for name in SUMMARY_FIELDS]
+        
+        try:
+            version = await VersionService.bump(db, user_id)
+            rows = []
+            for i in range(0, len(cardtrader_ids), BULK_BATCH_SIZE):
+                result = await db.execute(
+                    select(*columns)
+                    .where(table.c.user_id == user_id)
+                    .where(table.c.cardtrader_id.in_(cardtrader_ids[i:i + BULK_BATCH_SIZE]))
+                    .with_for_update()
+                )
+                rows.extend(result.mappings().all())
+            if not rows:
+                await db.rollback()
+                return 0
+            
+            item_ids = [row["id"] for row in rows]
+            for i in range(0, len(item_ids), BULK_BATCH_SIZE):
+                await db.execute(delete(table).where(table.c.id.in_(item_ids[i:i + BULK_BATCH_SIZE])))
+            await TagService.remove(db, [row["id"] for row in rows if row["tags"]])
+            await SummaryService.apply_changes(
+                db, user_id, removed=[summary_fields(dict(row)) for row in rows]
+            )
+            await ChangeService.record_deletes(db, user_id, version, item_ids)
+            await db.commit()
+            invalidate_counts(user_id)
+            return len(rows)
+        except Exception as e:
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to delete items: {str(e)}"
+            )
+    
+    @staticmethod
+    async def consolidate_stacks(
+        db: AsyncSession,
+        user_id: UUID
+    ) -> dict:
+        """
+        Merge a user's duplicate rows of each card variant into one stack.
+        
+        Only plain rows take part: no cardtrader_id (listings are kept
+        one per row), no notes and no tags. Per variant, the rows are
+        merged into the existing stack, or else into the oldest row,
+        which becomes the stack; the others are deleted. A variant with
+        a single plain row just becomes a stack, so later merged creates
+        add to it. Variants are processed CONSOLIDATE_BATCH_SIZE per
+        transaction.
+        
+        Args:
+            db: Database session
+            user_id: Owner's user ID
+            
+        Returns:
+            Dict of counters: stacks (written) and merged (rows deleted)
+            
+        Raises:
+            HTTPException: If a write fails
+        """
+        table = CollectionItem.__table__
+        candidates = and_(
+            table.c.user_id == user_id,
+            table.c.cardtrader_id.is_(None),
+            or_(table.c.notes.is_(None), table.c.is_stack == true())
+        )
+        variant = [table.c[name] for name in STACK_COLUMNS]
+        result = await db.execute(
+            select(*variant)
+            .where(candidates)
+            .group_by(*variant)
+            .having(or_(sql_func.count() > 1, sql_func.max(table.c.is_stack).is_(None)))
+        )
+        variants = sorted(tuple(row) for row in result)
+        await db.rollback()
+        
+        stats = {"stacks": 0, "merged": 0}
+        for i in range(0, len(variants), CONSOLIDATE_BATCH_SIZE):
+            batch = set(variants[i:i + CONSOLIDATE_BATCH_SIZE])
+            try:
+                version = await VersionService.bump(db, user_id)
+                result = await db.execute(
+                    select(
+                        table.c.id, table.c.is_stack, table.c.tags, table.c.added_at,
+                        *(table.c[name] for name in dict.fromkeys(SUMMARY_FIELDS + STACK_COLUMNS))
+                    )
+                    .where(candidates)
+                    .where(table.c.card_id.in_({key[0] for key in batch}))
+                    .with_for_update()
+                )
+                groups: Dict[tuple, List[dict]] = {}
+                for row in result.mappings():
+                    key = tuple(row[name] for name in STACK_COLUMNS)
+                    if key in batch and (row["is_stack"] or not row["tags"]):
+                        groups.setdefault(key, []).append(dict(row))
+                
+                survivors, removed, added, deleted_ids = [], [], [], []
+                for rows in groups.values():
+                    if len(rows) == 1 and rows[0]["is_stack"]:
+                        continue
+                    rows.sort(key=lambda row: (not row["is_stack"], row["added_at"], row["id"]))
+                    survivor, duplicates = rows[0], rows[1:]
+                    quantity = sum(row["quantity"] for row in rows)
+                    survivors.append({"b_id": survivor["id"], "b_quantity": quantity})
+                    deleted_ids.extend(row["id"] for row in duplicates)
+                    removed.extend(summary_fields(row) for row in rows)
+                    added.append(summary_fields(dict(survivor, quantity=quantity)))
+                
+                if not survivors:
+                    await db.rollback()
+                    continue
+                
+                await db.execute(
+                    update(table)
+                    .where(table.c.id == bindparam("b_id"))
+                    .values(
+                        quantity=bindparam("b_quantity"),
+                        is_stack=True,
+                        change_version=version,
+                        updated_at=sql_func.now()
+                    ),
+                    survivors
+                )
+                for j in range(0, len(deleted_ids), BULK_BATCH_SIZE):
+                    await db.execute(
+                        delete(table).where(table.c.id.in_(deleted_ids[j:j + BULK_BATCH_SIZE]))
+                    )
+                await SummaryService.apply_changes(db, user_id, removed=removed, added=added)
+                await ChangeService.record_deletes(db, user_id, version, deleted_ids)
+                await db.commit()
+            except Exception as e:
+                await db.rollback()
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"Failed to consolidate items: {str(e)}"
+                )
+            invalidate_counts(user_id)
+            stats["stacks"] += len(survivors)
+            stats["merged"] += len(deleted_ids)
+        return stats
@@ -0,0 +1,266 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import select, delete, insert, literal, case, func as sql_func
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import HTTPException, status
+
+from app.models.database import upsert
+from app.models.item import CollectionItem
+from app.models.summary import CollectionSummary
+
+
+# Item fields the summary depends on
+SUMMARY_FIELDS = ("card_id", "quantity", "condition", "language", "is_foil", "source")
+
+# Dimensions returned by the summary endpoint (the per-card rows are internal)
+REPORTED_DIMENSIONS = ("all", "cards", "language", "condition", "foil", "source")
+
+# Rows per multi-row statement when applying many bucket deltas
+SUMMARY_BATCH_SIZE = 500
+
+
+def summary_fields(item) -> dict:
+    """
+    Extract the summary-relevant fields of an item.
+
+    Args:
+        item: CollectionItem or dict with the item columns
+
+    Returns:
+        Dict with the SUMMARY_FIELDS values
+    """
+    if isinstance(item, dict):
+        return {name: item.get(name) for name in SUMMARY_FIELDS}
+    return {name: getattr(item, name) for name in SUMMARY_FIELDS}
+
+
+def _card_bucket(card_id) -> str:
+    # Same text as SQL HEX() on the BINARY(16) column, so rebuilds match
+    if not isinstance(card_id, UUID):
+        card_id = UUID(str(card_id))
+    return card_id.hex.upper()
+
+
+def _buckets(fields: dict) -> List[Tuple[str, str]]:
+    return [
+        ("all", ""),
+        ("card", _card_bucket(fields["card_id"])),
+        ("condition", fields["condition"]),
+        ("language", fields["language"]),
+        ("foil", "true" if fields["is_foil"] else "false"),
+        ("source", fields["source"] or ""),
+    ]
+
+
+class SummaryService:
+    """Service layer for the per-user collection summary."""
+
+    @staticmethod
+    async def apply_changes(
+        db: AsyncSession,
+        user_id: UUID,
+        removed: Iterable[dict] = (),
+        added: Iterable[dict] = ()
+    ) -> None:
+        """
+        Adjust the summary counters for removed and added item states.
+
+        An update is a removal of the old state plus an addition of the new
+        one. Runs inside the caller's transaction and does not commit.
+
+        Args:
+            db: Database session
+            user_id: Owner's user ID
+            removed: summary_fields() of item states that no longer exist
+            added: summary_fields() of item states that now exist
+        """
+        deltas: Dict[Tuple[str, str], List[int]] = {}
+        for sign, states in ((-1, removed), (1, added)):
+            for fields in states:
+                for key in _buckets(fields):
+                    delta = deltas.setdefault(key, [0, 0])
+                    delta[0] += sign
+                    delta[1] += sign * (fields["quantity"] or 0)
+
+        deltas = {key: delta for key, delta in deltas.items() if delta != [0, 0]}
+        if not deltas:
+            return
+
+        await SummaryService._upsert_deltas(db, user_id, deltas)
+
+        # Track distinct cards: a card bucket crossing zero adds/removes one
+        card_deltas = {
+            bucket: delta[0]
+            for (dimension, bucket), delta in deltas.items()
+            if dimension == "card" and delta[0] != 0
+        }
+        buckets = list(card_deltas)
+        distinct_delta = 0
+        for i in range(0, len(buckets), SUMMARY_BATCH_SIZE):
+            result = await db.execute(
+                select(CollectionSummary.bucket, CollectionSummary.item_count)
+                .where(CollectionSummary.user_id == user_id)
+                .where(CollectionSummary.dimension == "card")
+                .where(CollectionSummary.bucket.in_(buckets[i:i + SUMMARY_BATCH_SIZE]))
+                .with_for_update()
+            )
+            for bucket, after in result.all():
+                before = after - card_deltas[bucket]
+                if before <= 0 < after:
+                    distinct_delta += 1
+                elif after <= 0 < before:
+                    distinct_delta -= 1
+
+        if distinct_delta:
+            await SummaryService._upsert_deltas(
+                db, user_id, {("cards", ""): [distinct_delta, 0]}
+            )
+
+    @staticmethod
+    async def _upsert_deltas(
+        db: AsyncSession,
+        user_id: UUID,
+        deltas: Dict[Tuple[str, str], List[int]]
+    ) -> None:
+        rows = [
+            {
+                "user_id": user_id,
+                "dimension": dimension,
+                "bucket": bucket,
+                "item_count": delta[0],
+                "quantity": delta[1]
+            }
+            for (dimension, bucket), delta in deltas.items()
+        ]
+        dialect_name = db.get_bind().dialect.name
+        table = CollectionSummary.__table__
+
+        for i in range(0, len(rows), SUMMARY_BATCH_SIZE):
+            await db.execute(
+                upsert(
+                    dialect_name,
+                    table,
+                    rows[i:i + SUMMARY_BATCH_SIZE],
+                    index_elements=["user_id", "dimension", "bucket"],
+                    set_=lambda proposed: {
+                        "item_count": table.c.item_count + proposed.item_count,
+                        "quantity": table.c.quantity + proposed.quantity
+                    }
+                )
+            )
+
+    @staticmethod
+    async def get_summary(
+        db: AsyncSession,
+        user_id: UUID
+    ) -> dict:
+        """
+        Get the aggregated counters of a user's collection.
+
+        Reads only the handful of pre-aggregated rows, independently of
+        the collection size.
+
+        Args:
+            db: Database session
+            user_id: Owner's user ID
+
+        Returns:
+            Dict matching CollectionSummaryResponse
+        """
+        result = await db.execute(
+            select(
+                CollectionSummary.dimension,
+                CollectionSummary.bucket,
+                CollectionSummary.item_count,
+                CollectionSummary.quantity
+            )
+            .where(CollectionSummary.user_id == user_id)
+            .where(CollectionSummary.dimension.in_(REPORTED_DIMENSIONS))
+            .where(CollectionSummary.item_count > 0)
+        )
+
+        summary = {
+            "total_items": 0,
+            "total_quantity": 0,
+            "unique_cards": 0,
+            "by_language": {},
+            "by_condition": {},
+            "by_foil": {},
+            "by_source": {}
+        }
+        for dimension, bucket, item_count, quantity in result.all():
+            if dimension == "all":
+                summary["total_items"] = item_count
+                summary["total_quantity"] = quantity
+            elif dimension == "cards":
+                summary["unique_cards"] = item_count
+            else:
+                summary[f"by_{dimension}"][bucket or "none"] = {
+                    "items": item_count,
+                    "quantity": quantity
+                }
+
+        return summary
+
+    @staticmethod
+    async def rebuild(
+        db: AsyncSession,
+        user_id: Optional[UUID] = None
+    ) -> None:
+        """
+        Recompute the summary from collection_items with GROUP BY.
+
+        Args:
+            db: Database session
+            user_id: Only rebuild this user's summary (all users if None)
+
+        Raises:
+            HTTPException: If the rebuild fails
+        """
+        items = CollectionItem.__table__
+        summary = CollectionSummary.__table__
+        columns = ["user_id", "dimension", "bucket", "item_count", "quantity"]
+
+        def grouped(dimension: str, bucket_expr, count_expr=None, quantity_expr=None):
+            query = select(
+                items.c.user_id,
+                literal(dimension),
+                bucket_expr,
+                count_expr if count_expr is not None else sql_func.count(),
+                quantity_expr if quantity_expr is not None else sql_func.sum(items.c.quantity)
+            ).group_by(items.c.user_id)
+            if dimension not in ("all", "cards"):
+                query = query.group_by(bucket_expr)
+            if user_id is not None:
+                query = query.where(items.c.user_id == user_id)
+            return insert(summary).from_select(columns, query)
+
+        foil_bucket = case((items.c.is_foil, literal("true")), else_=literal("false"))
+
+        try:
+            clear = delete(summary)
+            if user_id is not None:
+                clear = clear.where(summary.c.user_id == user_id)
+            await db.execute(clear)
+
+            for statement in (
+                grouped("all", literal("")),
+                grouped(
+                    "cards", literal(""),
+                    sql_func.count(items.c.card_id.distinct()), literal(0)
+                ),
+                grouped("card", sql_func.hex(items.c.card_id)),
+                grouped("condition", items.c.condition),
+                grouped("language", items.c.language),
+                grouped("foil", foil_bucket),
+                grouped("source", sql_func.coalesce(items.c.source, literal(""))),
+            ):
+                await db.execute(statement)
+
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to rebuild summary: {str(e)}"
+            )
@@ -0,0 +1,114 @@
+from typing import Dict, Iterable, List, Optional
+from uuid import UUID
+from sqlalchemy import select, delete, insert, func as sql_func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from app.models.tag import CollectionItemTag
+
+
+# Rows / item IDs per multi-row statement
+TAG_BATCH_SIZE = 500
+
+
+def normalize_tag(tag: str) -> str:
+    """
+    Indexed form of a tag: trimmed and lowercased.
+
+    Tags differing only by case or surrounding spaces are the same tag
+    for the index and the filters, on every backend; the tags column
+    keeps them as written.
+
+    Args:
+        tag: Tag as written by the user
+
+    Returns:
+        Normalized tag (empty if the tag was blank)
+    """
+    return tag.strip().lower()
+
+
+class TagService:
+    """Service layer for the collection_item_tags index."""
+
+    @staticmethod
+    async def add(
+        db: AsyncSession,
+        user_id: UUID,
+        tags_by_item: Dict[UUID, Optional[List[str]]]
+    ) -> None:
+        """
+        Index the tags of items that have no indexed tags yet.
+
+        Tags are indexed in normalized form (see normalize_tag), once per
+        item.
+
+        Runs inside the caller's transaction and does not commit.
+
+        Args:
+            db: Database session
+            user_id: Owner's user ID
+            tags_by_item: Tags (or None) by item ID
+        """
+        rows = [
+            {"user_id": user_id, "tag": tag, "item_id": item_id}
+            for item_id, tags in tags_by_item.items()
+            for tag in dict.fromkeys(normalize_tag(tag) for tag in tags or ())
+            if tag
+        ]
+        table = CollectionItemTag.__table__
+        for i in range(0, len(rows), TAG_BATCH_SIZE):
+            await db.execute(insert(table), rows[i:i + TAG_BATCH_SIZE])
+
+    @staticmethod
+    async def remove(
+        db: AsyncSession,
+        item_ids: Iterable[UUID]
+    ) -> None:
+        """
+        Drop the indexed tags of items (before a retag or a delete).
+
+        Runs inside the caller's transaction and does not commit.
+
+        Args:
+            db: Database session
+            item_ids: IDs of the items
+        """
+        item_ids = list(item_ids)
+        table = CollectionItemTag.__table__
+        for i in range(0, len(item_ids), TAG_BATCH_SIZE):
+            await db.execute(
+                delete(table).where(table.c.item_id.in_(item_ids[i:i + TAG_BATCH_SIZE]))
+            )
+
+    @staticmethod
+    def tagged_items(
+        user_id: UUID,
+        tags: List[str],
+        match_all: bool = False
+    ) -> Select:
+        """
+        Subquery selecting the IDs of a user's items carrying the tags.
+
+        Meant for an IN clause: as a semi-join the optimizer can either
+        materialize the (user_id, tag) range, for selective tags, or probe
+        it while walking the listing index, for common ones.
+
+        Args:
+            user_id: Owner's user ID
+            tags: Tags to look for, matched in normalized form
+            match_all: Require every tag instead of any of them
+
+        Returns:
+            SELECT of item_id
+        """
+        tags = list(dict.fromkeys(normalize_tag(tag) for tag in tags))
+        table = CollectionItemTag.__table__
+        query = (
+            select(table.c.item_id)
+            .where(table.c.user_id == user_id)
+            .where(table.c.tag.in_(tags))
+        )
+        if match_all and len(tags) > 1:
+            query = query.group_by(table.c.item_id).having(sql_func.count() == len(tags))
+        return query
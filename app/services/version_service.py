@@ -0,0 +1,82 @@
+from uuid import UUID
+from sqlalchemy import select, func as sql_func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.database import upsert
+from app.models.replicas import WRITTEN_VERSIONS
+from app.models.version import CollectionVersion
+
+
+class VersionService:
+    """Service layer for the per-user collection version."""
+
+    @staticmethod
+    async def bump(
+        db: AsyncSession,
+        user_id: UUID
+    ) -> int:
+        """
+        Increment the collection version of a user.
+
+        Runs inside the caller's transaction and does not commit. The
+        version row stays locked until the transaction ends, so writes of
+        the same user are numbered in commit order. The new version is
+        remembered in the session info, for the replica router to fence
+        the user's next reads on once the transaction commits.
+
+        Args:
+            db: Database session
+            user_id: Owner's user ID
+
+        Returns:
+            The new version
+        """
+        table = CollectionVersion.__table__
+        dialect_name = db.get_bind().dialect.name
+
+        if dialect_name == "mysql":
+            # No RETURNING: LAST_INSERT_ID(expr) hands the new value back
+            # in the OK packet, read as lastrowid
+            from sqlalchemy.dialects.mysql import insert as mysql_insert
+            stmt = mysql_insert(table).values(
+                user_id=user_id,
+                version=sql_func.last_insert_id(1)
+            ).on_duplicate_key_update(
+                version=sql_func.last_insert_id(table.c.version + 1)
+            )
+            result = await db.execute(stmt)
+            version = result.lastrowid
+        else:
+            stmt = upsert(
+                dialect_name,
+                table,
+                [{"user_id": user_id, "version": 1}],
+                index_elements=["user_id"],
+                set_=lambda proposed: {"version": table.c.version + 1}
+            ).returning(table.c.version)
+            result = await db.execute(stmt)
+            version = result.scalar_one()
+
+        db.info.setdefault(WRITTEN_VERSIONS, {})[user_id] = version
+        return version
+
+    @staticmethod
+    async def get_version(
+        db: AsyncSession,
+        user_id: UUID
+    ) -> int:
+        """
+        Get the collection version of a user (0 if never written).
+
+        Args:
+            db: Database session
+            user_id: Owner's user ID
+
+        Returns:
+            Current version
+        """
+        result = await db.execute(
+            select(CollectionVersion.version)
+            .where(CollectionVersion.user_id == user_id)
+        )
+        return result.scalar_one_or_none() or 0
@@ -0,0 +1,98 @@
+"""
+CardTrader inventory sync worker.
+
+Synchronizes every linked user (or the given ones), at most
+CARDTRADER_SYNC_CONCURRENCY at a time, each on its own database session.
+Meant to be run periodically (cron, Kubernetes CronJob); each run only
+pulls the listings changed since the users' previous sync.
+
+Usage:
+    python -m app.workers.cardtrader_sync
+    python -m app.workers.cardtrader_sync --user <uuid> --full
+"""
+import argparse
+import asyncio
+import logging
+from typing import Callable, Dict, List, Optional, Union
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cardtrader import CardTraderClient
+from app.core.config import settings
+from app.models.sync_state import CardTraderSyncState
+from app.services.cardtrader_sync_service import CardTraderSyncService
+
+
+logger = logging.getLogger(__name__)
+
+
+async def run_sync(
+    session_maker: Callable[[], AsyncSession],
+    client: CardTraderClient,
+    user_ids: Optional[List[UUID]] = None,
+    full: bool = False
+) -> Dict[UUID, Union[dict, Exception]]:
+    """
+    Synchronize users concurrently under a global limit.
+
+    A failing user is logged (and its error stored in the sync state)
+    without stopping the others.
+
+    Args:
+        session_maker: Factory of database sessions
+        client: CardTrader API client, shared by every user
+        user_ids: Users to synchronize (every linked user if None)
+        full: Pull whole inventories regardless of the watermarks
+
+    Returns:
+        Sync counters, or the raised exception, by user ID
+    """
+    if user_ids is None:
+        async with session_maker() as db:
+            result = await db.execute(select(CardTraderSyncState.user_id))
+            user_ids = list(result.scalars())
+
+    semaphore = asyncio.Semaphore(settings.CARDTRADER_SYNC_CONCURRENCY)
+
+    async def sync_one(user_id: UUID) -> Union[dict, Exception]:
+        async with semaphore:
+            async with session_maker() as db:
+                try:
+                    stats = await CardTraderSyncService.sync_user(db, client, user_id, full=full)
+                except Exception as e:
+                    logger.error("CardTrader sync of user %s failed: %s", user_id, e)
+                    return e
+        logger.info("CardTrader sync of user %s: %s", user_id, stats)
+        return stats
+
+    outcomes = await asyncio.gather(*(sync_one(user_id) for user_id in user_ids))
+    return dict(zip(user_ids, outcomes))
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Synchronize CardTrader inventories")
+    parser.add_argument("--user", type=UUID, action="append", help="Only sync this user (repeatable)")
+    parser.add_argument("--full", action="store_true", help="Pull whole inventories")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    from app.models.database import async_session_maker, engine
+
+    client = CardTraderClient(settings.CARDTRADER_API_URL, timeout=settings.CARDTRADER_TIMEOUT)
+    try:
+        outcomes = await run_sync(async_session_maker, client, args.user, args.full)
+    finally:
+        await client.close()
+        await engine.dispose()
+
+    failed = sum(isinstance(outcome, Exception) for outcome in outcomes.values())
+    print(f"Synchronized {len(outcomes) - failed} users, {failed} failed")
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
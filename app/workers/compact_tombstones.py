@@ -0,0 +1,47 @@
+"""
+Tombstone compaction worker.
+
+Deletes the change feed tombstones older than TOMBSTONE_RETENTION_DAYS;
+clients holding a change token from before them must sync from scratch.
+Meant to be run periodically (cron, Kubernetes CronJob).
+
+Usage:
+    python -m app.workers.compact_tombstones
+    python -m app.workers.compact_tombstones --days 7
+"""
+import argparse
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import settings
+from app.services.change_service import ChangeService
+
+
+logger = logging.getLogger(__name__)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Compact change feed tombstones")
+    parser.add_argument(
+        "--days", type=int, default=settings.TOMBSTONE_RETENTION_DAYS,
+        help="Keep the tombstones of the last DAYS days"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    from app.models.database import async_session_maker, engine
+
+    before = datetime.now(timezone.utc) - timedelta(days=args.days)
+    try:
+        async with async_session_maker() as db:
+            deleted = await ChangeService.compact_tombstones(db, before)
+    finally:
+        await engine.dispose()
+
+    print(f"Deleted {deleted} tombstones recorded before {before.isoformat()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
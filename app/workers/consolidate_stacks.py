@@ -0,0 +1,87 @@
+"""
+Stack consolidation worker.
+
+Merges the duplicate rows of each card variant (created before merged
+creates, or without them) into one stack per user, see
+ItemService.consolidate_stacks. Users are processed one at a time,
+each in batches of variants. Meant to be run off-peak (cron,
+Kubernetes CronJob); a run finding nothing to merge only reads.
+
+Usage:
+    python -m app.workers.consolidate_stacks
+    python -m app.workers.consolidate_stacks --user <uuid>
+"""
+import argparse
+import asyncio
+import logging
+from typing import Callable, Dict, List, Optional, Union
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.item import CollectionItem
+from app.services.item_service import ItemService
+
+
+logger = logging.getLogger(__name__)
+
+
+async def run_consolidation(
+    session_maker: Callable[[], AsyncSession],
+    user_ids: Optional[List[UUID]] = None
+) -> Dict[UUID, Union[dict, Exception]]:
+    """
+    Consolidate the stacks of users, one after the other.
+
+    A failing user is logged without stopping the others.
+
+    Args:
+        session_maker: Factory of database sessions
+        user_ids: Users to consolidate (every user with items if None)
+
+    Returns:
+        Consolidation counters, or the raised exception, by user ID
+    """
+    if user_ids is None:
+        async with session_maker() as db:
+            result = await db.execute(select(CollectionItem.user_id).distinct())
+            user_ids = list(result.scalars())
+
+    outcomes = {}
+    for user_id in user_ids:
+        async with session_maker() as db:
+            try:
+                outcomes[user_id] = await ItemService.consolidate_stacks(db, user_id)
+            except Exception as e:
+                logger.error("Stack consolidation of user %s failed: %s", user_id, getattr(e, "detail", e))
+                outcomes[user_id] = e
+                continue
+        if outcomes[user_id]["stacks"]:
+            logger.info("Stack consolidation of user %s: %s", user_id, outcomes[user_id])
+    return outcomes
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Merge duplicate collection rows into stacks")
+    parser.add_argument("--user", type=UUID, action="append", help="Only consolidate this user (repeatable)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    from app.models.database import async_session_maker, engine
+
+    try:
+        outcomes = await run_consolidation(async_session_maker, args.user)
+    finally:
+        await engine.dispose()
+
+    failed = [outcome for outcome in outcomes.values() if isinstance(outcome, Exception)]
+    merged = sum(outcome["merged"] for outcome in outcomes.values() if not isinstance(outcome, Exception))
+    print(f"Consolidated {len(outcomes) - len(failed)} users ({merged} rows merged), {len(failed)} failed")
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
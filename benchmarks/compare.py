@@ -0,0 +1,60 @@
+"""
+Compare two benchmarks.load reports endpoint by endpoint.
+
+Usage:
+    python -m benchmarks.compare baseline.json candidate.json --fail-over 10
+
+Exits with status 1 when any endpoint's p95 latency grew by more than
+--fail-over percent.
+"""
+import argparse
+import json
+import sys
+
+
+METRICS = ("throughput_rps", "p50_ms", "p95_ms", "p99_ms")
+
+
+def _change(before: float, after: float) -> float:
+    if not before:
+        return 0.0
+    return (after - before) / before * 100
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare two load reports")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--fail-over", type=float, default=None, help="Max allowed p95 regression (%%)")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    print(f"baseline  {baseline['meta']['commit']}  candidate  {candidate['meta']['commit']}")
+    print(f"{'endpoint':<28}" + "".join(f"{metric:>24}" for metric in METRICS))
+
+    regressions = []
+    for name, after in candidate["endpoints"].items():
+        before = baseline["endpoints"].get(name)
+        if before is None:
+            print(f"{name:<28}  (new)")
+            continue
+        cells = []
+        for metric in METRICS:
+            change = _change(before[metric], after[metric])
+            cells.append(f"{before[metric]:>9} -> {after[metric]:<9} {change:+5.0f}%")
+        print(f"{name:<28}" + "".join(f"{cell:>24}" for cell in cells))
+        if args.fail_over is not None and _change(before["p95_ms"], after["p95_ms"]) > args.fail_over:
+            regressions.append(name)
+
+    if regressions:
+        print(f"p95 regressions over {args.fail_over}%: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
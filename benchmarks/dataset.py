@@ -0,0 +1,14 @@
+"""
+Value distributions of the seeded benchmark collections.
+
+Kept apart from benchmarks.seed, which imports the app (and so builds
+its settings) on import: the load driver uses these values too and must
+configure the app before anything imports it.
+"""
+
+
+CARD_POOL_SIZE = 50000
+CONDITIONS = (("NM", 55), ("LP", 20), ("M", 10), ("MP", 10), ("HP", 5))
+LANGUAGES = (("en", 60), ("it", 15), ("de", 8), ("fr", 7), ("jp", 5), ("es", 5))
+SOURCES = (("manual", 50), ("cardtrader", 40), (None, 10))
+TAGS = ("trade", "deck:modern", "deck:edh", "binder-1", "binder-2", "graded", "wishlist")
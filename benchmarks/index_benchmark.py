@@ -0,0 +1,137 @@
+"""
+Before/after benchmark for the collection_items index layout (002_indexes).
+
+Builds the table twice - once with the indexes of 001_initial and once
+with the current model indexes - then measures bulk insert throughput
+and list-page latency at increasing offsets for a single power user.
+
+Usage:
+    python -m benchmarks.index_benchmark --url sqlite+aiosqlite:///bench.db
+    python -m benchmarks.index_benchmark --url mysql+asyncmy://u:p@127.0.0.1/bench --rows 200000
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("AUTH_JWKS_URL", "http://127.0.0.1/jwks")
+
+from sqlalchemy import insert, select, text  # noqa: E402
+from sqlalchemy.ext.asyncio import create_async_engine  # noqa: E402
+
+from app.models.database import Base  # noqa: E402
+from app.models.item import CollectionItem  # noqa: E402
+
+
+OLD_INDEXES = {
+    "ix_collection_items_user_id": "user_id",
+    "ix_collection_items_condition": "`condition`",
+    "ix_collection_items_language": "language",
+    "ix_collection_items_source": "source",
+    "ix_collection_items_cardtrader_id": "cardtrader_id",
+}
+NEW_INDEXES = ("idx_user_added", "idx_user_source_added")
+
+
+def _drop_index(dialect: str, name: str) -> str:
+    if dialect == "mysql":
+        return f"DROP INDEX {name} ON collection_items"
+    return f"DROP INDEX {name}"
+
+
+async def _prepare(engine, layout: str) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        if layout == "before":
+            for name in NEW_INDEXES:
+                await conn.execute(text(_drop_index(engine.dialect.name, name)))
+            for name, column in OLD_INDEXES.items():
+                if engine.dialect.name != "mysql":
+                    column = column.replace("`", '"')
+                await conn.execute(
+                    text(f"CREATE INDEX {name} ON collection_items ({column})")
+                )
+
+
+def _rows(user_id: str, count: int, start: datetime):
+    for i in range(count):
+        yield {
+            "id": str(uuid4()),
+            "user_id": user_id,
+            "card_id": str(uuid4()),
+            "quantity": 1 + i % 4,
+            "condition": ("M", "NM", "LP", "MP", "HP")[i % 5],
+            "language": ("en", "it", "de", "jp")[i % 4],
+            "is_foil": i % 7 == 0,
+            "is_signed": False,
+            "is_altered": False,
+            "source": ("manual", "cardtrader")[i % 2],
+            "added_at": start + timedelta(seconds=i),
+            "updated_at": start + timedelta(seconds=i),
+        }
+
+
+async def _run_layout(url: str, layout: str, rows: int, batch: int, repeats: int) -> dict:
+    engine = create_async_engine(url)
+    await _prepare(engine, layout)
+
+    user_id = str(uuid4())
+    table = CollectionItem.__table__
+    pending = list(_rows(user_id, rows, datetime(2024, 1, 1)))
+
+    started = time.perf_counter()
+    async with engine.begin() as conn:
+        for i in range(0, rows, batch):
+            await conn.execute(insert(table), pending[i:i + batch])
+    insert_seconds = time.perf_counter() - started
+
+    page_size = 100
+    latencies = {}
+    async with engine.connect() as conn:
+        for page in (1, 100, 300):
+            offset = min((page - 1) * page_size, max(rows - page_size, 0))
+            query = (
+                select(table)
+                .where(table.c.user_id == user_id)
+                .order_by(table.c.added_at.desc(), table.c.id.desc())
+                .limit(page_size)
+                .offset(offset)
+            )
+            samples = []
+            for _ in range(repeats):
+                t0 = time.perf_counter()
+                (await conn.execute(query)).all()
+                samples.append((time.perf_counter() - t0) * 1000)
+            latencies[f"page_{page}_ms"] = round(statistics.median(samples), 3)
+
+    await engine.dispose()
+    return {
+        "insert_rows_per_s": round(rows / insert_seconds, 1),
+        **latencies,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default="sqlite+aiosqlite:///index_bench.db")
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    results = {"url": args.url.split("@")[-1], "rows": args.rows}
+    for layout in ("before", "after"):
+        results[layout] = await _run_layout(
+            args.url, layout, args.rows, args.batch, args.repeats
+        )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,133 @@
+"""
+Local JWKS server issuing RS256 tokens, so benchmarks need no auth service.
+
+Usage (standalone):
+    python -m benchmarks.jwks_stub --port 8081 --sub <user-uuid>
+
+Prints the JWKS URL and a token for the given subject, then serves
+until interrupted.
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwk, jwt
+
+
+DEFAULT_AUDIENCE = "collection-service"
+DEFAULT_ISSUER = "https://auth.takeyourtrade.com"
+
+
+class StubJWKSServer:
+    """
+    Threaded HTTP server publishing one RSA signing key as a JWKS.
+
+    Args:
+        host: Interface to bind
+        port: Port to bind (0 picks a free one)
+        audience: 'aud' claim of issued tokens
+        issuer: 'iss' claim of issued tokens
+        kid: Key ID of the signing key
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        audience: str = DEFAULT_AUDIENCE,
+        issuer: str = DEFAULT_ISSUER,
+        kid: str = "bench-key"
+    ):
+        self.audience = audience
+        self.issuer = issuer
+        self.kid = kid
+        self.requests = 0
+
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self._private_pem = private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption()
+        ).decode()
+        public_pem = private_key.public_key().public_bytes(
+            serialization.Encoding.PEM,
+            serialization.PublicFormat.SubjectPublicKeyInfo
+        ).decode()
+        public_jwk = jwk.construct(public_pem, "RS256").to_dict()
+        public_jwk.update({"kid": kid, "use": "sig", "alg": "RS256"})
+        body = json.dumps({"keys": [public_jwk]}).encode()
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.requests += 1
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/.well-known/jwks.json"
+
+    def issue_token(self, sub: str, expires_in: int = 3600) -> str:
+        """Sign an RS256 token for a subject."""
+        now = int(time.time())
+        claims = {
+            "sub": sub,
+            "aud": self.audience,
+            "iss": self.issuer,
+            "iat": now,
+            "exp": now + expires_in
+        }
+        return jwt.encode(
+            claims, self._private_pem, algorithm="RS256", headers={"kid": self.kid}
+        )
+
+    def start(self) -> "StubJWKSServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve a local JWKS and issue tokens")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--sub", action="append", default=[], help="Subject to issue a token for")
+    parser.add_argument("--audience", default=DEFAULT_AUDIENCE)
+    parser.add_argument("--issuer", default=DEFAULT_ISSUER)
+    args = parser.parse_args()
+
+    server = StubJWKSServer(args.host, args.port, args.audience, args.issuer).start()
+    print(json.dumps({
+        "jwks_url": server.url,
+        "tokens": {sub: server.issue_token(sub, expires_in=86400) for sub in args.sub}
+    }, indent=2))
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
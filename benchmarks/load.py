@@ -0,0 +1,310 @@
+"""
+Load and latency driver for the collection API.
+
+Runs every items/summary route at a configurable concurrency with real
+RS256 tokens from a local stub JWKS server, and writes per-endpoint
+throughput and latency percentiles as JSON (see benchmarks.compare).
+
+By default the app runs in-process against --url (seed it first with
+benchmarks.seed). With --base-url it targets a running server instead;
+start that server with AUTH_JWKS_URL pointing at
+http://127.0.0.1:<--jwks-port>/.well-known/jwks.json.
+
+Usage:
+    python -m benchmarks.load --url sqlite+aiosqlite:///bench.db --concurrency 16
+    python -m benchmarks.load --base-url http://127.0.0.1:8000 --jwks-port 8081
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import subprocess
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List
+from uuid import uuid4
+
+import httpx
+
+from benchmarks.dataset import TAGS
+from benchmarks.jwks_stub import StubJWKSServer
+
+
+ITEMS = "/api/v1/collections/items"
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of samples."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(int(round(pct / 100 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+class Context:
+    """Shared state for the scenarios: users, tokens and known item ids."""
+
+    def __init__(self, users: List[dict], jwks: StubJWKSServer):
+        self.users = users
+        self.headers = {
+            user["user_id"]: {"Authorization": f"Bearer {jwks.issue_token(user['user_id'])}"}
+            for user in users
+        }
+        self.item_ids: Dict[str, List[str]] = {user["user_id"]: [] for user in users}
+        self.created: List[tuple] = []
+        self.cursors: Dict[str, str] = {}
+        self.etags: Dict[str, str] = {}
+        self._next_user = itertools.cycle([user["user_id"] for user in users])
+        self.rng = random.Random(7)
+
+    def user(self) -> str:
+        return next(self._next_user)
+
+    def known_item(self, user_id: str) -> str:
+        """A seeded item of the user (a missing id, counted as error, if none)."""
+        if not self.item_ids[user_id]:
+            return str(uuid4())
+        return self.rng.choice(self.item_ids[user_id])
+
+    def new_item(self) -> dict:
+        return {
+            "card_id": str(uuid4()),
+            "quantity": self.rng.randint(1, 4),
+            "condition": self.rng.choice(["M", "NM", "LP", "MP", "HP"]),
+            "language": self.rng.choice(["en", "it", "de", "jp"]),
+            "is_foil": self.rng.random() < 0.1,
+            "source": "manual",
+        }
+
+
+async def _list_offset(client: httpx.AsyncClient, ctx: Context) -> httpx.Response:
+    user_id = ctx.user()
+    size = next(user["rows"] for user in ctx.users if user["user_id"] == user_id)
+    offset = ctx.rng.randrange(0, max(size - 100, 1))
+    return await client.get(f"{ITEMS}/", params={"limit": 100, "offset": offset}, headers=ctx.headers[user_id])
+
+
+async def _list_cursor(client: httpx.AsyncClient, ctx: Context) -> httpx.Response:
+    user_id = ctx.user()
+    params = {"limit": 100}
+    if ctx.cursors.get(user_id):
+        params["cursor"] = ctx.cursors[user_id]
+    response = await client.get(f"{ITEMS}/", params=params, headers=ctx.headers[user_id])
+    if response.status_code == 200:
+        ctx.cursors[user_id] = response.json().get("next_cursor")
+    return response
+
+
+async def _list_conditional(client: httpx.AsyncClient, ctx: Context) -> httpx.Response:
+    user_id = ctx.user()
+    headers = dict(ctx.headers[user_id])
+    if ctx.etags.get(user_id):
+        headers["If-None-Match"] = ctx.etags[user_id]
+    response = await client.get(f"{ITEMS}/", params={"limit": 100}, headers=headers)
+    if response.status_code == 200:
+        ctx.etags[user_id] = response.headers.get("etag")
+    return response
+
+
+async def _list_tagged(client: httpx.AsyncClient, ctx: Context) -> httpx.Response:
+    user_id = ctx.user()
+    params = {"limit": 100, "tag": ctx.rng.sample(TAGS, 2), "tag_match": ctx.rng.choice(["any", "all"])}
+    return await client.get(f"{ITEMS}/", params=params, headers=ctx.headers[user_id])
+
+
+async def _search_notes(client: httpx.AsyncClient, ctx: Context) -> httpx.Response:
+    user_id = ctx.user()
+    params = {"limit": 100, "q": f"pack {ctx.rng.randint(1, 500)}"}
+    return await client.get(f"{ITEMS}/", params=params, headers=ctx.headers[user_id])
+
+
+async def _owned(client: httpx.AsyncClient, ctx: Context) -> httpx.Response:
+    user_id = ctx.user()
+    card_ids = [str(uuid4()) for _ in range(200)]
+    return await client.post(f"{ITEMS}/owned", json={"card_ids": card_ids}, headers=ctx.headers[user_id])
+
+
+async def _get_item(client: httpx.AsyncClient, ctx: Context) -> httpx.Response:
+    user_id = ctx.user()
+    item_id = ctx.known_item(user_id)
+    return await client.get(f"{ITEMS}/{item_id}", headers=ctx.headers[user_id])
+
+
+async def _update_item(client: httpx.AsyncClient, ctx: Context) -> httpx.Response:
+    user_id = ctx.user()
+    item_id = ctx.known_item(user_id)
+    return await client.patch(
+        f"{ITEMS}/{item_id}",
+        json={"quantity": ctx.rng.randint(1, 9), "notes": "benchmark"},
+        headers=ctx.headers[user_id]
+    )
+
+
+async def _create_item(client: httpx.AsyncClient, ctx: Context) -> httpx.Response:
+    user_id = ctx.user()
+    response = await client.post(f"{ITEMS}/", json=ctx.new_item(), headers=ctx.headers[user_id])
+    if response.status_code == 201:
+        ctx.created.append((user_id, response.json()["id"]))
+    return response
+
+
+async def _bulk_create(client: httpx.AsyncClient, ctx: Context) -> httpx.Response:
+    user_id = ctx.user()
+    items = [ctx.new_item() for _ in range(100)]
+    return await client.post(f"{ITEMS}/bulk", json={"items": items}, headers=ctx.headers[user_id])
+
+
+async def _delete_item(client: httpx.AsyncClient, ctx: Context) -> httpx.Response:
+    if ctx.created:
+        user_id, item_id = ctx.created.pop()
+    else:
+        user_id, item_id = ctx.user(), str(uuid4())
+    return await client.delete(f"{ITEMS}/{item_id}", headers=ctx.headers[user_id])
+
+
+async def _export(client: httpx.AsyncClient, ctx: Context) -> httpx.Response:
+    user_id = ctx.user()
+    async with client.stream("GET", f"{ITEMS}/export", params={"format": "ndjson"}, headers=ctx.headers[user_id]) as response:
+        async for _ in response.aiter_bytes():
+            pass
+    return response
+
+
+async def _summary(client: httpx.AsyncClient, ctx: Context) -> httpx.Response:
+    user_id = ctx.user()
+    return await client.get("/api/v1/collections/summary", headers=ctx.headers[user_id])
+
+
+# (name, scenario, share of --requests); order matters: deletes consume creates
+SCENARIOS: List[tuple] = [
+    ("GET /items/ (offset)", _list_offset, 1.0),
+    ("GET /items/ (cursor)", _list_cursor, 1.0),
+    ("GET /items/ (If-None-Match)", _list_conditional, 1.0),
+    ("GET /items/?tag=", _list_tagged, 1.0),
+    ("GET /items/?q=", _search_notes, 0.2),
+    ("POST /items/owned", _owned, 1.0),
+    ("GET /items/{item_id}", _get_item, 1.0),
+    ("PATCH /items/{item_id}", _update_item, 1.0),
+    ("GET /summary", _summary, 1.0),
+    ("GET /items/export", _export, 0.05),
+    ("POST /items/", _create_item, 1.0),
+    ("POST /items/bulk", _bulk_create, 0.1),
+    ("DELETE /items/{item_id}", _delete_item, 1.0),
+]
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    ctx: Context,
+    scenario: Callable[[httpx.AsyncClient, Context], Awaitable[httpx.Response]],
+    requests: int,
+    concurrency: int
+) -> dict:
+    """Run one scenario and return its throughput/latency statistics."""
+    latencies: List[float] = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            started = time.perf_counter()
+            try:
+                response = await scenario(client, ctx)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            latencies.append((time.perf_counter() - started) * 1000)
+            errors += failed
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test the collection API")
+    parser.add_argument("--url", default="sqlite+aiosqlite:///bench.db", help="Database URL (in-process mode)")
+    parser.add_argument("--base-url", help="Target a running server instead of the in-process app")
+    parser.add_argument("--jwks-port", type=int, default=0, help="Port of the stub JWKS server")
+    parser.add_argument("--manifest", default="bench_manifest.json")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=500, help="Requests per endpoint")
+    parser.add_argument("--only", nargs="*", help="Run only scenarios whose name contains one of these")
+    parser.add_argument("--output", default="bench_results.json")
+    args = parser.parse_args()
+
+    with open(args.manifest) as f:
+        manifest = json.load(f)
+
+    jwks = StubJWKSServer(port=args.jwks_port).start()
+
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=60)
+    else:
+        os.environ["DATABASE_URL"] = args.url
+        os.environ["AUTH_JWKS_URL"] = jwks.url
+        os.environ["JWT_AUDIENCE"] = jwks.audience
+        os.environ["JWT_ISSUER"] = jwks.issuer
+        from app.main import app
+        client = httpx.AsyncClient(app=app, base_url="http://bench", timeout=60)
+
+    ctx = Context(manifest["users"], jwks)
+    results = {}
+    async with client:
+        # Known item ids for the per-item routes
+        for user_id in ctx.item_ids:
+            response = await client.get(f"{ITEMS}/", params={"limit": 500}, headers=ctx.headers[user_id])
+            response.raise_for_status()
+            ctx.item_ids[user_id] = [item["id"] for item in response.json()["items"]]
+
+        for name, scenario, share in SCENARIOS:
+            if args.only and not any(part in name for part in args.only):
+                continue
+            requests = max(int(args.requests * share), 1)
+            results[name] = await run_scenario(client, ctx, scenario, requests, args.concurrency)
+            print(f"{name:<28} {json.dumps(results[name])}")
+
+    jwks.stop()
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "target": args.base_url or args.url.split("@")[-1],
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "users": [{"rows": user["rows"]} for user in manifest["users"]],
+        },
+        "endpoints": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"results written to {args.output}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,127 @@
+"""
+Before/after benchmark for the list response serialization path.
+
+Builds pages of CollectionItem rows in memory and measures the CPU time
+needed to turn one page into response bytes:
+
+- before: rows validated into ItemResponse, then FastAPI validating the
+  page again against response_model, jsonable_encoder and json.dumps
+  (JSONResponse)
+- after: rows validated once and encoded with orjson (the routers'
+  validated_response helper)
+
+No database or network is involved.
+
+Usage:
+    python -m benchmarks.serialization_benchmark --sizes 100 500 --rounds 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("AUTH_JWKS_URL", "http://127.0.0.1/jwks")
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import APIRoute, serialize_response  # noqa: E402
+
+from app.core.responses import validated_response  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.item import CollectionItem  # noqa: E402
+from app.schemas.item import ItemListResponse, ItemResponse  # noqa: E402
+
+
+def make_rows(count: int, rng: random.Random) -> list:
+    """Transient CollectionItem rows shaped like a real list page."""
+    user_id = uuid4()
+    added_at = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    rows = []
+    for i in range(count):
+        stamp = added_at + timedelta(seconds=i * 37, microseconds=rng.randrange(10**6))
+        rows.append(CollectionItem(
+            id=uuid4(),
+            user_id=user_id,
+            card_id=uuid4(),
+            quantity=rng.randint(1, 4),
+            condition=rng.choice(["M", "NM", "LP", "MP", "HP"]),
+            language=rng.choice(["en", "it", "de", "jp"]),
+            is_foil=rng.random() < 0.12,
+            is_signed=False,
+            is_altered=False,
+            notes="Pulled from pack" if rng.random() < 0.05 else None,
+            tags=["trade", "binder-1"] if rng.random() < 0.1 else None,
+            source=rng.choice(["manual", "cardtrader", None]),
+            cardtrader_id=None,
+            added_at=stamp,
+            updated_at=stamp,
+        ))
+    return rows
+
+
+def _page(rows: list) -> ItemListResponse:
+    return ItemListResponse(
+        items=[ItemResponse.model_validate(row) for row in rows],
+        total=len(rows),
+        limit=len(rows),
+        offset=0,
+        next_cursor=None
+    )
+
+
+async def before(rows: list, field) -> bytes:
+    content = await serialize_response(field=field, response_content=_page(rows))
+    return JSONResponse(content).body
+
+
+async def after(rows: list, field) -> bytes:
+    return validated_response(_page(rows)).body
+
+
+async def measure(path, rows: list, field, rounds: int) -> dict:
+    samples = []
+    for _ in range(rounds):
+        started = time.process_time()
+        await path(rows, field)
+        samples.append((time.process_time() - started) * 1000)
+    return {
+        "mean_ms": round(statistics.mean(samples), 3),
+        "p50_ms": round(statistics.median(samples), 3),
+        "min_ms": round(min(samples), 3),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark list response serialization")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 500])
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    route = next(
+        route for route in app.routes
+        if isinstance(route, APIRoute)
+        and route.path == "/api/v1/collections/items/" and "GET" in route.methods
+    )
+    rng = random.Random(7)
+
+    results = {}
+    for size in args.sizes:
+        rows = make_rows(size, rng)
+        assert json.loads(await before(rows, route.response_field)) == json.loads(await after(rows, route.response_field))
+        results[size] = {
+            "before": await measure(before, rows, route.response_field, args.rounds),
+            "after": await measure(after, rows, route.response_field, args.rounds),
+        }
+        speedup = results[size]["before"]["mean_ms"] / results[size]["after"]["mean_ms"]
+        print(f"{size} items/page: {json.dumps(results[size])} ({speedup:.1f}x)")
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -8,11 +8,11 @@
 
 CREATE TABLE IF NOT EXISTS `collection_items` (
     -- Primary Key
-    `id` CHAR(36) NOT NULL COMMENT 'Unique identifier for the collection item',
+    `id` BINARY(16) NOT NULL COMMENT 'Unique identifier for the collection item',
     
     -- Foreign Keys & Relationships
-    `user_id` CHAR(36) NOT NULL COMMENT 'Owner of this collection item',
-    `card_id` CHAR(36) NOT NULL COMMENT 'Reference to the card',
+    `user_id` BINARY(16) NOT NULL COMMENT 'Owner of this collection item',
+    `card_id` BINARY(16) NOT NULL COMMENT 'Reference to the card',
     
     -- Core Fields
     `quantity` INT NOT NULL DEFAULT 1 COMMENT 'Number of copies of this card',
@@ -31,6 +31,12 @@ CREATE TABLE IF NOT EXISTS `collection_items` (
     `cardtrader_id` BIGINT NULL COMMENT 'External ID from CardTrader platform',
     `last_synced_at` DATETIME NULL COMMENT 'Last synchronization timestamp with external source',
     
+    -- Stacking
+    `is_stack` BOOLEAN NULL COMMENT 'TRUE on the row merged creates add to (one per variant), NULL otherwise',
+    
+    -- Change feed
+    `change_version` BIGINT NOT NULL DEFAULT 0 COMMENT 'Collection version of the last write to the item',
+    
     -- Timestamps
     `added_at` DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP COMMENT 'Creation timestamp',
     `updated_at` DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT 'Last update timestamp',
@@ -38,14 +44,15 @@ CREATE TABLE IF NOT EXISTS `collection_items` (
     -- Constraints
     PRIMARY KEY (`id`),
     UNIQUE KEY `unique_cardtrader_id` (`cardtrader_id`),
+    UNIQUE KEY `uq_user_stack` (`user_id`, `card_id`, `condition`, `language`, `is_foil`, `is_signed`, `is_altered`, `is_stack`),
     CHECK (`quantity` > 0),
     
     -- Indexes
-    INDEX `idx_user_id` (`user_id`),
     INDEX `idx_card_id` (`card_id`),
-    INDEX `idx_condition` (`condition`),
-    INDEX `idx_language` (`language`),
-    INDEX `idx_source` (`source`),
-    INDEX `idx_user_card` (`user_id`, `card_id`)
+    INDEX `idx_user_card` (`user_id`, `card_id`),
+    INDEX `idx_user_added` (`user_id`, `added_at`, `id`),
+    INDEX `idx_user_source_added` (`user_id`, `source`, `added_at`),
+    INDEX `idx_user_changes` (`user_id`, `change_version`, `id`),
+    FULLTEXT INDEX `ft_notes` (`notes`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='Card collection items for users';
 
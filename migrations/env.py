@@ -7,6 +7,12 @@ from alembic import context
 # Import models
 from app.models.database import Base
 from app.models import item  # noqa: F401
+from app.models import summary  # noqa: F401
+from app.models import version  # noqa: F401
+from app.models import tag  # noqa: F401
+from app.models import sync_state  # noqa: F401
+from app.models import import_job  # noqa: F401
+from app.models import tombstone  # noqa: F401
 from app.core.config import settings
 
 # this is the Alembic Config object, which provides
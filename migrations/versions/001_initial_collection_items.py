@@ -9,7 +9,7 @@ from typing import Sequence, Union
 
 from alembic import op
 import sqlalchemy as sa
-from sqlalchemy.dialects.mysql import UUID, JSON
+from sqlalchemy.dialects.mysql import JSON
 from sqlalchemy.sql import func
 
 # revision identifiers, used by Alembic.
@@ -22,9 +22,9 @@ depends_on: Union[str, Sequence[str], None] = None
 def upgrade() -> None:
     op.create_table(
         'collection_items',
-        sa.Column('id', UUID(as_uuid=True), primary_key=True, nullable=False, comment='Unique identifier for the collection item'),
-        sa.Column('user_id', UUID(as_uuid=True), nullable=False, comment='Owner of this collection item'),
-        sa.Column('card_id', UUID(as_uuid=True), nullable=False, comment='Reference to the card'),
+        sa.Column('id', sa.CHAR(length=36), primary_key=True, nullable=False, comment='Unique identifier for the collection item'),
+        sa.Column('user_id', sa.CHAR(length=36), nullable=False, comment='Owner of this collection item'),
+        sa.Column('card_id', sa.CHAR(length=36), nullable=False, comment='Reference to the card'),
         sa.Column('quantity', sa.Integer(), nullable=False, server_default='1', comment='Number of copies of this card'),
         sa.Column('condition', sa.String(length=10), nullable=False, comment='Condition of the card (e.g., \'M\', \'NM\', \'LP\', \'MP\', \'HP\')'),
         sa.Column('language', sa.String(length=5), nullable=False, comment='Language code (e.g., \'en\', \'it\', \'jp\')'),
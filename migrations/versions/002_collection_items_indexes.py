@@ -0,0 +1,46 @@
+"""Composite indexes for collection items access paths
+
+Replaces the single-column user_id/condition/language/source indexes
+with composite indexes matching the list queries, and drops the
+non-unique cardtrader_id index that duplicates the unique key.
+
+Revision ID: 002_indexes
+Revises: 001_initial
+Create Date: 2024-02-01 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '002_indexes'
+down_revision: Union[str, None] = '001_initial'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Create the new indexes first so queries are never left without one
+    op.create_index('idx_user_added', 'collection_items', ['user_id', 'added_at', 'id'])
+    op.create_index('idx_user_source_added', 'collection_items', ['user_id', 'source', 'added_at'])
+
+    # user_id is a prefix of idx_user_card / idx_user_added; the others are
+    # low-cardinality columns only ever filtered together with user_id
+    op.drop_index('ix_collection_items_user_id', table_name='collection_items')
+    op.drop_index('ix_collection_items_condition', table_name='collection_items')
+    op.drop_index('ix_collection_items_language', table_name='collection_items')
+    op.drop_index('ix_collection_items_source', table_name='collection_items')
+    op.drop_index('ix_collection_items_cardtrader_id', table_name='collection_items')
+
+
+def downgrade() -> None:
+    op.create_index('ix_collection_items_cardtrader_id', 'collection_items', ['cardtrader_id'])
+    op.create_index('ix_collection_items_source', 'collection_items', ['source'])
+    op.create_index('ix_collection_items_language', 'collection_items', ['language'])
+    op.create_index('ix_collection_items_condition', 'collection_items', ['condition'])
+    op.create_index('ix_collection_items_user_id', 'collection_items', ['user_id'])
+
+    op.drop_index('idx_user_source_added', table_name='collection_items')
+    op.drop_index('idx_user_added', table_name='collection_items')
@@ -0,0 +1,60 @@
+"""Per-user collection summary table
+
+Creates collection_summaries and backfills it from collection_items.
+
+Revision ID: 003_summaries
+Revises: 002_indexes
+Create Date: 2024-02-15 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '003_summaries'
+down_revision: Union[str, None] = '002_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+BACKFILL = [
+    "SELECT user_id, 'all', '', COUNT(*), SUM(quantity) "
+    "FROM collection_items GROUP BY user_id",
+    "SELECT user_id, 'cards', '', COUNT(DISTINCT card_id), 0 "
+    "FROM collection_items GROUP BY user_id",
+    "SELECT user_id, 'card', card_id, COUNT(*), SUM(quantity) "
+    "FROM collection_items GROUP BY user_id, card_id",
+    "SELECT user_id, 'condition', `condition`, COUNT(*), SUM(quantity) "
+    "FROM collection_items GROUP BY user_id, `condition`",
+    "SELECT user_id, 'language', language, COUNT(*), SUM(quantity) "
+    "FROM collection_items GROUP BY user_id, language",
+    "SELECT user_id, 'foil', IF(is_foil, 'true', 'false'), COUNT(*), SUM(quantity) "
+    "FROM collection_items GROUP BY user_id, is_foil",
+    "SELECT user_id, 'source', COALESCE(source, ''), COUNT(*), SUM(quantity) "
+    "FROM collection_items GROUP BY user_id, COALESCE(source, '')",
+]
+
+
+def upgrade() -> None:
+    op.create_table(
+        'collection_summaries',
+        sa.Column('user_id', sa.String(length=36), nullable=False, comment='Owner of the summarized collection'),
+        sa.Column('dimension', sa.String(length=20), nullable=False, comment='Aggregated dimension (e.g., \'all\', \'language\', \'card\')'),
+        sa.Column('bucket', sa.String(length=50), nullable=False, comment='Value of the dimension (\'\' when not applicable)'),
+        sa.Column('item_count', sa.Integer(), nullable=False, server_default='0', comment='Number of collection items (stacks) in the bucket'),
+        sa.Column('quantity', sa.BigInteger(), nullable=False, server_default='0', comment='Total number of copies in the bucket'),
+        sa.PrimaryKeyConstraint('user_id', 'dimension', 'bucket')
+    )
+
+    for select in BACKFILL:
+        op.execute(
+            "INSERT INTO collection_summaries "
+            "(user_id, dimension, bucket, item_count, quantity) " + select
+        )
+
+
+def downgrade() -> None:
+    op.drop_table('collection_summaries')
@@ -0,0 +1,194 @@
+"""Store UUID keys as BINARY(16)
+
+Converts collection_items.id/user_id/card_id from CHAR(36) to BINARY(16)
+online, in batches:
+
+1. add nullable BINARY(16) shadow columns (in place, no table lock)
+2. triggers fill the shadow columns for rows written concurrently
+3. backfill existing rows in primary-key ranges of BATCH_SIZE rows,
+   each range in its own transaction
+4. under LOCK TABLES ... WRITE, drop the triggers, then swap the columns
+   and rebuild the primary key and indexes in a single ALTER: the
+   triggers reference the shadow columns and would fail every write once
+   they are renamed, and without them a write landing before the swap
+   would leave its shadow columns unset. Writes wait for the rebuild.
+
+collection_summaries is derived data: it is rebuilt with BINARY(16)
+user ids and hex card buckets from the converted items, then swapped in
+with an atomic RENAME TABLE.
+
+Deploy the BINARY(16)-aware application right after this migration:
+instances still writing CHAR(36) keys fail once the columns are swapped.
+Summary changes written during the rebuild are not carried over; call
+POST /api/v1/collections/summary/rebuild if the service took writes.
+
+Revision ID: 004_binary_uuid
+Revises: 003_summaries
+Create Date: 2024-03-01 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '004_binary_uuid'
+down_revision: Union[str, None] = '003_summaries'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+BATCH_SIZE = 10000
+UUID_COLUMNS = ('id', 'user_id', 'card_id')
+COMMENTS = {
+    'id': 'Unique identifier for the collection item',
+    'user_id': 'Owner of this collection item',
+    'card_id': 'Reference to the card',
+}
+
+
+def _to_binary(expr: str) -> str:
+    return f"UNHEX(REPLACE({expr}, '-', ''))"
+
+
+def _to_text(expr: str) -> str:
+    return (
+        f"LOWER(CONCAT_WS('-', SUBSTR(HEX({expr}), 1, 8), SUBSTR(HEX({expr}), 9, 4), "
+        f"SUBSTR(HEX({expr}), 13, 4), SUBSTR(HEX({expr}), 17, 4), SUBSTR(HEX({expr}), 21)))"
+    )
+
+
+def _backfill(assignments: str) -> None:
+    """Run UPDATE collection_items SET <assignments> over primary-key ranges."""
+    bind = op.get_bind()
+    last = None
+    while True:
+        lower = "" if last is None else "WHERE id > :last"
+        upper = bind.execute(
+            sa.text(
+                f"SELECT id FROM collection_items {lower} "
+                f"ORDER BY id LIMIT 1 OFFSET {BATCH_SIZE - 1}"
+            ),
+            {"last": last}
+        ).scalar()
+
+        conditions = []
+        if last is not None:
+            conditions.append("id > :last")
+        if upper is not None:
+            conditions.append("id <= :upper")
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        bind.execute(
+            sa.text(f"UPDATE collection_items SET {assignments} {where}"),
+            {"last": last, "upper": upper}
+        )
+
+        if upper is None:
+            break
+        last = upper
+
+
+def _swap_columns(column_type: str, suffix: str, lock: str = 'NONE') -> None:
+    """Replace the UUID columns by their <name><suffix> shadow columns."""
+    changes = ", ".join(
+        f"CHANGE COLUMN {name}{suffix} {name} {column_type} NOT NULL "
+        f"COMMENT '{COMMENTS[name]}' " + ("FIRST" if name == 'id' else f"AFTER {previous}")
+        for previous, name in zip((None,) + UUID_COLUMNS, UUID_COLUMNS)
+    )
+    op.execute(
+        "ALTER TABLE collection_items "
+        "DROP INDEX idx_user_card, DROP INDEX idx_user_added, "
+        "DROP INDEX idx_user_source_added, DROP INDEX ix_collection_items_card_id, "
+        "DROP PRIMARY KEY, "
+        + ", ".join(f"DROP COLUMN {name}" for name in UUID_COLUMNS) + ", "
+        + changes + ", "
+        "ADD PRIMARY KEY (id), "
+        "ADD INDEX ix_collection_items_card_id (card_id), "
+        "ADD INDEX idx_user_card (user_id, card_id), "
+        "ADD INDEX idx_user_added (user_id, added_at, id), "
+        "ADD INDEX idx_user_source_added (user_id, source, added_at), "
+        f"ALGORITHM=INPLACE, LOCK={lock}"
+    )
+
+
+def _rebuild_summaries(user_id_type: str, card_bucket: str) -> None:
+    """Recreate collection_summaries from collection_items and swap it in."""
+    op.execute("DROP TABLE IF EXISTS collection_summaries_new")
+    op.execute(
+        "CREATE TABLE collection_summaries_new ("
+        f"user_id {user_id_type} NOT NULL COMMENT 'Owner of the summarized collection', "
+        "dimension VARCHAR(20) NOT NULL COMMENT 'Aggregated dimension (e.g., ''all'', ''language'', ''card'')', "
+        "bucket VARCHAR(50) NOT NULL COMMENT 'Value of the dimension ('''' when not applicable)', "
+        "item_count INT NOT NULL DEFAULT 0 COMMENT 'Number of collection items (stacks) in the bucket', "
+        "quantity BIGINT NOT NULL DEFAULT 0 COMMENT 'Total number of copies in the bucket', "
+        "PRIMARY KEY (user_id, dimension, bucket))"
+    )
+    for select in (
+        "SELECT user_id, 'all', '', COUNT(*), SUM(quantity) "
+        "FROM collection_items GROUP BY user_id",
+        "SELECT user_id, 'cards', '', COUNT(DISTINCT card_id), 0 "
+        "FROM collection_items GROUP BY user_id",
+        f"SELECT user_id, 'card', {card_bucket}, COUNT(*), SUM(quantity) "
+        "FROM collection_items GROUP BY user_id, card_id",
+        "SELECT user_id, 'condition', `condition`, COUNT(*), SUM(quantity) "
+        "FROM collection_items GROUP BY user_id, `condition`",
+        "SELECT user_id, 'language', language, COUNT(*), SUM(quantity) "
+        "FROM collection_items GROUP BY user_id, language",
+        "SELECT user_id, 'foil', IF(is_foil, 'true', 'false'), COUNT(*), SUM(quantity) "
+        "FROM collection_items GROUP BY user_id, is_foil",
+        "SELECT user_id, 'source', COALESCE(source, ''), COUNT(*), SUM(quantity) "
+        "FROM collection_items GROUP BY user_id, COALESCE(source, '')",
+    ):
+        op.execute(
+            "INSERT INTO collection_summaries_new "
+            "(user_id, dimension, bucket, item_count, quantity) " + select
+        )
+    op.execute(
+        "RENAME TABLE collection_summaries TO collection_summaries_old, "
+        "collection_summaries_new TO collection_summaries"
+    )
+    op.execute("DROP TABLE collection_summaries_old")
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute(
+            "ALTER TABLE collection_items "
+            + ", ".join(f"ADD COLUMN {name}_bin BINARY(16) NULL" for name in UUID_COLUMNS)
+            + ", ALGORITHM=INPLACE, LOCK=NONE"
+        )
+
+        assignments = ", ".join(
+            f"NEW.{name}_bin = {_to_binary(f'NEW.{name}')}" for name in UUID_COLUMNS
+        )
+        for event in ("INSERT", "UPDATE"):
+            op.execute(
+                f"CREATE TRIGGER collection_items_uuid_bin_{event.lower()} "
+                f"BEFORE {event} ON collection_items FOR EACH ROW SET {assignments}"
+            )
+
+        _backfill(", ".join(f"{name}_bin = {_to_binary(name)}" for name in UUID_COLUMNS))
+
+        op.execute("LOCK TABLES collection_items WRITE")
+        try:
+            for event in ("insert", "update"):
+                op.execute(f"DROP TRIGGER IF EXISTS collection_items_uuid_bin_{event}")
+            _swap_columns("BINARY(16)", "_bin", lock='EXCLUSIVE')
+        finally:
+            op.execute("UNLOCK TABLES")
+
+        _rebuild_summaries("BINARY(16)", "HEX(card_id)")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute(
+            "ALTER TABLE collection_items "
+            + ", ".join(f"ADD COLUMN {name}_txt CHAR(36) NULL" for name in UUID_COLUMNS)
+        )
+        _backfill(", ".join(f"{name}_txt = {_to_text(name)}" for name in UUID_COLUMNS))
+        _swap_columns("CHAR(36)", "_txt")
+
+        _rebuild_summaries("CHAR(36)", "card_id")
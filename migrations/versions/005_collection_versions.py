@@ -0,0 +1,34 @@
+"""Per-user collection version table
+
+Creates collection_versions. Users without a row are at version 0, so
+no backfill is needed.
+
+Revision ID: 005_versions
+Revises: 004_binary_uuid
+Create Date: 2024-03-15 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '005_versions'
+down_revision: Union[str, None] = '004_binary_uuid'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'collection_versions',
+        sa.Column('user_id', sa.BINARY(length=16), nullable=False, comment='Owner of the collection'),
+        sa.Column('version', sa.BigInteger(), nullable=False, server_default='0', comment='Incremented by every write to the collection'),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('collection_versions')
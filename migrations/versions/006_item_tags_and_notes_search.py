@@ -0,0 +1,55 @@
+"""Tag index table and notes FULLTEXT index
+
+Creates collection_item_tags (one row per item and tag, keyed for
+(user_id, tag) range scans) and backfills it from the JSON tags column,
+skipping tags longer than the 64 characters the table stores. Adds a
+FULLTEXT index on collection_items.notes for notes search.
+
+The first FULLTEXT index of an InnoDB table adds the hidden FTS_DOC_ID
+column and rebuilds the table, blocking writes (LOCK=SHARED) for the
+duration: run this migration in a low traffic window.
+
+Revision ID: 006_tags_search
+Revises: 005_versions
+Create Date: 2024-04-01 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '006_tags_search'
+down_revision: Union[str, None] = '005_versions'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'collection_item_tags',
+        sa.Column('user_id', sa.BINARY(length=16), nullable=False, comment='Owner of the tagged item'),
+        sa.Column('tag', sa.String(length=64), nullable=False, comment='Tag, as stored in collection_items.tags'),
+        sa.Column('item_id', sa.BINARY(length=16), nullable=False, comment='Tagged collection item'),
+        sa.PrimaryKeyConstraint('user_id', 'tag', 'item_id')
+    )
+    op.create_index('idx_item_tags_item', 'collection_item_tags', ['item_id'])
+
+    # INSERT IGNORE drops tags repeated within one item
+    op.execute(
+        "INSERT IGNORE INTO collection_item_tags (user_id, tag, item_id) "
+        "SELECT ci.user_id, jt.tag, ci.id "
+        "FROM collection_items ci, "
+        "JSON_TABLE(ci.tags, '$[*]' COLUMNS (tag VARCHAR(255) PATH '$')) jt "
+        "WHERE ci.tags IS NOT NULL AND CHAR_LENGTH(jt.tag) BETWEEN 1 AND 64"
+    )
+
+    op.create_index('ft_notes', 'collection_items', ['notes'], mysql_prefix='FULLTEXT')
+
+
+def downgrade() -> None:
+    op.drop_index('ft_notes', table_name='collection_items')
+    op.drop_index('idx_item_tags_item', table_name='collection_item_tags')
+    op.drop_table('collection_item_tags')
@@ -0,0 +1,38 @@
+"""CardTrader sync state table
+
+Creates cardtrader_sync_state: the CardTrader link and incremental sync
+watermark of each user. New table, nothing to backfill.
+
+Revision ID: 007_cardtrader_sync
+Revises: 006_tags_search
+Create Date: 2024-04-15 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '007_cardtrader_sync'
+down_revision: Union[str, None] = '006_tags_search'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'cardtrader_sync_state',
+        sa.Column('user_id', sa.BINARY(length=16), nullable=False, comment='Linked collection owner'),
+        sa.Column('api_token', sa.String(length=1024), nullable=False, comment='CardTrader API token of the user'),
+        sa.Column('last_synced_at', sa.DateTime(timezone=True), nullable=True, comment='Start of the last successful sync (incremental watermark)'),
+        sa.Column('last_full_sync_at', sa.DateTime(timezone=True), nullable=True, comment='Start of the last successful full sync'),
+        sa.Column('last_error', sa.Text(), nullable=True, comment='Error of the last failed sync (null after a success)'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now(), comment='Last update timestamp'),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('cardtrader_sync_state')
@@ -0,0 +1,47 @@
+"""Import jobs table
+
+Creates import_jobs: status, counters and rejected rows of the CSV
+imports. New table, nothing to backfill.
+
+Revision ID: 008_import_jobs
+Revises: 007_cardtrader_sync
+Create Date: 2024-04-22 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.mysql import JSON
+
+
+# revision identifiers, used by Alembic.
+revision: str = '008_import_jobs'
+down_revision: Union[str, None] = '007_cardtrader_sync'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'import_jobs',
+        sa.Column('id', sa.BINARY(length=16), nullable=False, comment='Unique identifier for the import'),
+        sa.Column('user_id', sa.BINARY(length=16), nullable=False, comment='Owner of the collection imported into'),
+        sa.Column('status', sa.String(length=16), nullable=False, comment='pending, running, completed or failed'),
+        sa.Column('rows_processed', sa.Integer(), nullable=False, comment='Data rows read so far'),
+        sa.Column('created', sa.Integer(), nullable=False, comment='Rows inserted as new items'),
+        sa.Column('updated', sa.Integer(), nullable=False, comment='Rows that updated an item with the same cardtrader_id'),
+        sa.Column('rejected', sa.Integer(), nullable=False, comment='Rows that failed validation'),
+        sa.Column('errors', JSON(), nullable=True, comment='First rejected rows, as a JSON array of {line, error}'),
+        sa.Column('error', sa.Text(), nullable=True, comment='Reason the import failed'),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now(), comment='Upload timestamp'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now(), comment='Last progress update'),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True, comment='Completion or failure timestamp'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_import_jobs_user', 'import_jobs', ['user_id', 'created_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_import_jobs_user', table_name='import_jobs')
+    op.drop_table('import_jobs')
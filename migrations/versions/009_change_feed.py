@@ -0,0 +1,58 @@
+"""Change feed: item change versions and delete tombstones
+
+Adds collection_items.change_version (collection version of the last
+write, 0 for existing rows: they are returned by a first sync, which
+has no token) with its (user_id, change_version, id) keyset index,
+collection_versions.purged_version, and the collection_item_tombstones
+table recording deletes.
+
+The columns are appended with a default, an instant change on MySQL
+8.0+; the index is built online.
+
+Revision ID: 009_change_feed
+Revises: 008_import_jobs
+Create Date: 2024-05-01 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '009_change_feed'
+down_revision: Union[str, None] = '008_import_jobs'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'collection_items',
+        sa.Column('change_version', sa.BigInteger(), nullable=False, server_default='0', comment='Collection version of the last write to the item')
+    )
+    op.create_index('idx_user_changes', 'collection_items', ['user_id', 'change_version', 'id'])
+
+    op.add_column(
+        'collection_versions',
+        sa.Column('purged_version', sa.BigInteger(), nullable=False, server_default='0', comment='Highest version of a compacted tombstone (older change tokens expire)')
+    )
+
+    op.create_table(
+        'collection_item_tombstones',
+        sa.Column('user_id', sa.BINARY(length=16), nullable=False, comment='Owner of the deleted item'),
+        sa.Column('version', sa.BigInteger(), nullable=False, comment='Collection version of the delete'),
+        sa.Column('item_id', sa.BINARY(length=16), nullable=False, comment='Deleted collection item'),
+        sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now(), comment='Deletion timestamp'),
+        sa.PrimaryKeyConstraint('user_id', 'version', 'item_id')
+    )
+    op.create_index('idx_tombstones_deleted', 'collection_item_tombstones', ['deleted_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_tombstones_deleted', table_name='collection_item_tombstones')
+    op.drop_table('collection_item_tombstones')
+    op.drop_column('collection_versions', 'purged_version')
+    op.drop_index('idx_user_changes', table_name='collection_items')
+    op.drop_column('collection_items', 'change_version')
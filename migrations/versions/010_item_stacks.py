@@ -0,0 +1,43 @@
+"""Item stacks: merge target of each card variant
+
+Adds collection_items.is_stack and the uq_user_stack unique key on
+(user_id, card_id, condition, language, is_foil, is_signed, is_altered,
+is_stack). Existing rows stay NULL, so existing duplicates do not
+conflict; python -m app.workers.consolidate_stacks merges them.
+
+The column is appended without a default value, an instant change on
+MySQL 8.0+; the unique key is built online.
+
+Revision ID: 010_item_stacks
+Revises: 009_change_feed
+Create Date: 2024-05-06 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '010_item_stacks'
+down_revision: Union[str, None] = '009_change_feed'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'collection_items',
+        sa.Column('is_stack', sa.Boolean(), nullable=True, comment='TRUE on the row merged creates add to (one per variant), NULL otherwise')
+    )
+    op.create_unique_constraint(
+        'uq_user_stack',
+        'collection_items',
+        ['user_id', 'card_id', 'condition', 'language', 'is_foil', 'is_signed', 'is_altered', 'is_stack']
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_user_stack', 'collection_items', type_='unique')
+    op.drop_column('collection_items', 'is_stack')
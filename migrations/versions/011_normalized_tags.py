@@ -0,0 +1,51 @@
+"""Normalized tag index with a binary collation
+
+Switches collection_item_tags.tag to utf8mb4_bin and rewrites the
+indexed tags in the form TagService now writes (trimmed, lowercase).
+Under utf8mb4_unicode_ci the primary key treated 'Foo', 'foo' and
+'foo ' as the same tag, so an item carrying two of them failed to
+index (duplicate key); filters were case-insensitive on MySQL only.
+
+UPDATE IGNORE leaves a tag alone when the item already has its
+normalized form; such leftovers, and blank tags, are then deleted.
+The column change rebuilds the (narrow) table.
+
+Revision ID: 011_normalized_tags
+Revises: 010_item_stacks
+Create Date: 2024-05-08 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '011_normalized_tags'
+down_revision: Union[str, None] = '010_item_stacks'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "ALTER TABLE collection_item_tags MODIFY tag VARCHAR(64) "
+        "CHARACTER SET utf8mb4 COLLATE utf8mb4_bin NOT NULL "
+        "COMMENT 'Tag of collection_items.tags, normalized (trimmed, lowercase)'"
+    )
+    op.execute(
+        "UPDATE IGNORE collection_item_tags SET tag = LOWER(TRIM(tag)) "
+        "WHERE tag <> LOWER(TRIM(tag))"
+    )
+    op.execute(
+        "DELETE FROM collection_item_tags "
+        "WHERE tag <> LOWER(TRIM(tag)) OR tag = ''"
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        "ALTER TABLE collection_item_tags MODIFY tag VARCHAR(64) "
+        "CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL "
+        "COMMENT 'Tag, as stored in collection_items.tags'"
+    )
@@ -0,0 +1,43 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def run_module(module: str, *args: str, cwd: Path) -> subprocess.CompletedProcess:
+    """Run a benchmarks module as documented, without the test suite's settings."""
+    env = {
+        name: value
+        for name, value in os.environ.items()
+        if name not in ("DATABASE_URL", "AUTH_JWKS_URL", "JWT_AUDIENCE", "JWT_ISSUER")
+    }
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(ROOT), env.get("PYTHONPATH")]))
+    return subprocess.run(
+        [sys.executable, "-m", module, *args],
+        cwd=cwd, env=env, capture_output=True, text=True, timeout=240
+    )
+
+
+def test_load_driver_in_process_smoke(tmp_path):
+    """Test the documented seed + load commands run against a SQLite file."""
+    url = f"sqlite+aiosqlite:///{tmp_path / 'bench.db'}"
+
+    seeded = run_module("benchmarks.seed", "--url", url, "--sizes", "200", "--reset", cwd=tmp_path)
+    assert seeded.returncode == 0, seeded.stderr
+
+    loaded = run_module(
+        "benchmarks.load", "--url", url, "--concurrency", "2", "--requests", "10",
+        "--only", "GET /items/{item_id}", "GET /items/?tag=",
+        cwd=tmp_path
+    )
+    assert loaded.returncode == 0, loaded.stderr
+
+    report = json.loads((tmp_path / "bench_results.json").read_text())
+    assert set(report["endpoints"]) == {"GET /items/{item_id}", "GET /items/?tag="}
+    for stats in report["endpoints"].values():
+        assert stats["requests"] == 10
+        assert stats["errors"] == 0
@@ -0,0 +1,212 @@
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.cardtrader import CardTraderClient, blueprint_card_id
+from app.models.database import Base
+from app.models.item import CollectionItem
+from app.services.cardtrader_sync_service import CardTraderSyncService
+from app.services.summary_service import SummaryService
+from app.workers.cardtrader_sync import run_sync
+
+
+class StubCardTraderServer:
+    """Local HTTP server serving per-token CardTrader inventories."""
+
+    def __init__(self):
+        # token -> {product id: product}
+        self.inventories = {}
+        self.requests = []
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                params = parse_qs(url.query)
+                token = self.headers.get("Authorization", "").removeprefix("Bearer ")
+                stub.requests.append((token, params))
+                if url.path != "/api/v2/products/export" or token not in stub.inventories:
+                    self.send_response(401)
+                    self.end_headers()
+                    return
+
+                products = list(stub.inventories[token].values())
+                if "updated_since" in params:
+                    since = datetime.fromisoformat(params["updated_since"][0])
+                    products = [p for p in products if p["updated_at"] >= since]
+                body = json.dumps(products, default=str).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}/api/v2"
+
+    def put(self, token: str, product_id: int, blueprint_id: int, quantity: int, **properties):
+        self.inventories.setdefault(token, {})[product_id] = {
+            "id": product_id,
+            "blueprint_id": blueprint_id,
+            "quantity": quantity,
+            "properties_hash": {"condition": "Near Mint", "mtg_language": "en", **properties},
+            "updated_at": datetime.now(timezone.utc)
+        }
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def cardtrader_server():
+    server = StubCardTraderServer()
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+async def session_maker(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'sync.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest.fixture
+async def client(cardtrader_server):
+    client = CardTraderClient(cardtrader_server.url)
+    yield client
+    await client.close()
+
+
+async def _items(session_maker, user_id) -> dict:
+    async with session_maker() as db:
+        result = await db.execute(
+            select(CollectionItem).where(CollectionItem.user_id == user_id)
+        )
+        return {item.cardtrader_id: item for item in result.scalars()}
+
+
+@pytest.mark.asyncio
+async def test_sync_applies_changes_since_watermark(cardtrader_server, session_maker, client):
+    """The first sync pulls everything, later ones only what changed."""
+    alice, bob, mallory = uuid4(), uuid4(), uuid4()
+    cardtrader_server.put("alice-token", 1, 100, 2, condition="Slightly Played", mtg_foil=True)
+    cardtrader_server.put("alice-token", 2, 101, 1, mtg_language="it")
+    cardtrader_server.put("alice-token", 3, 102, 4)
+    cardtrader_server.put("bob-token", 10, 100, 1)
+    async with session_maker() as db:
+        await CardTraderSyncService.link(db, alice, "alice-token")
+        await CardTraderSyncService.link(db, bob, "bob-token")
+        await CardTraderSyncService.link(db, mallory, "revoked-token")
+
+    outcomes = await run_sync(session_maker, client)
+
+    assert outcomes[alice]["mode"] == "full"
+    assert outcomes[alice]["created"] == 3
+    assert outcomes[bob]["created"] == 1
+    # A failing user does not stop the others and records its error
+    assert isinstance(outcomes[mallory], Exception)
+    async with session_maker() as db:
+        state = await CardTraderSyncService.get_state(db, mallory)
+        assert state.last_synced_at is None
+        assert "401" in state.last_error
+
+    items = await _items(session_maker, alice)
+    assert items[1].card_id == blueprint_card_id(100)
+    assert (items[1].condition, items[1].is_foil, items[1].source) == ("LP", True, "cardtrader")
+    assert items[2].language == "it"
+    assert all(item.last_synced_at is not None for item in items.values())
+    first_synced_at = items[3].last_synced_at
+
+    # User edits to notes survive the sync
+    async with session_maker() as db:
+        await db.execute(
+            update(CollectionItem).where(CollectionItem.id == items[1].id).values(notes="binder 2")
+        )
+        await db.commit()
+
+    cardtrader_server.put("alice-token", 1, 100, 5, condition="Slightly Played", mtg_foil=True)
+    cardtrader_server.put("alice-token", 2, 101, 0, mtg_language="it")
+    cardtrader_server.put("alice-token", 4, 103, 1)
+    # Changed long before the watermark: not pulled again
+    cardtrader_server.inventories["alice-token"][3]["updated_at"] -= timedelta(days=1)
+
+    outcomes = await run_sync(session_maker, client, [alice])
+
+    assert outcomes[alice]["mode"] == "incremental"
+    assert outcomes[alice]["fetched"] == 3
+    assert (outcomes[alice]["created"], outcomes[alice]["updated"], outcomes[alice]["deleted"]) == (1, 1, 1)
+    assert "updated_since" in cardtrader_server.requests[-1][1]
+
+    items = await _items(session_maker, alice)
+    assert sorted(items) == [1, 3, 4]
+    assert (items[1].quantity, items[1].notes) == (5, "binder 2")
+    assert items[3].last_synced_at == first_synced_at
+
+    async with session_maker() as db:
+        summary = await SummaryService.get_summary(db, alice)
+    assert (summary["total_items"], summary["total_quantity"]) == (3, 10)
+
+
+@pytest.mark.asyncio
+async def test_sync_skips_unchanged_listings(cardtrader_server, session_maker, client):
+    """Listings re-sent within the overlap window are not rewritten."""
+    user_id = uuid4()
+    cardtrader_server.put("token", 1, 100, 2)
+    async with session_maker() as db:
+        await CardTraderSyncService.link(db, user_id, "token")
+        await CardTraderSyncService.sync_user(db, client, user_id)
+        first_synced_at = (await _items(session_maker, user_id))[1].last_synced_at
+
+        stats = await CardTraderSyncService.sync_user(db, client, user_id)
+
+    assert (stats["mode"], stats["fetched"], stats["unchanged"], stats["updated"]) == ("incremental", 1, 1, 0)
+    assert (await _items(session_maker, user_id))[1].last_synced_at == first_synced_at
+
+
+@pytest.mark.asyncio
+async def test_full_sync_deletes_unlisted_items(cardtrader_server, session_maker, client):
+    """Removed listings are only detected, and deleted, by a full sync."""
+    user_id = uuid4()
+    cardtrader_server.put("token", 1, 100, 2)
+    cardtrader_server.put("token", 2, 101, 1)
+    async with session_maker() as db:
+        await CardTraderSyncService.link(db, user_id, "token")
+        await CardTraderSyncService.sync_user(db, client, user_id)
+        db.add(CollectionItem(
+            user_id=user_id, card_id=uuid4(), quantity=1, condition="NM", language="en"
+        ))
+        await db.commit()
+
+        del cardtrader_server.inventories["token"][2]
+        stats = await CardTraderSyncService.sync_user(db, client, user_id)
+        assert stats["deleted"] == 0
+
+        stats = await CardTraderSyncService.sync_user(db, client, user_id, full=True)
+        assert (stats["mode"], stats["deleted"]) == ("full", 1)
+        assert "updated_since" not in cardtrader_server.requests[-1][1]
+
+    items = await _items(session_maker, user_id)
+    assert sorted(items, key=str) == [1, None]
@@ -8,7 +8,8 @@ from sqlalchemy.pool import StaticPool
 import json
 
 from app.main import app
-from app.models.database import Base, async_session_maker
+from app.dependencies import get_db_read_session, get_db_session, get_session_maker
+from app.models.database import Base, ReadOnlySession
 from app.models.item import CollectionItem
 
 
@@ -40,17 +41,37 @@ async def test_db_session():
 
 
 @pytest.fixture(scope="function")
-async def client(test_db_session):
+def fake_user_id() -> UUID:
+    """ID of the user authenticated by the test client."""
+    return uuid4()
+
+
+@pytest.fixture(scope="function")
+async def client(test_db_session, fake_user_id):
     """Create a test client with database override."""
     app.dependency_overrides.clear()
     
     async def get_test_db():
         yield test_db_session
     
-    app.dependency_overrides[async_session_maker] = get_test_db
+    read_session_maker = async_sessionmaker(
+        test_db_session.bind,
+        sync_session_class=ReadOnlySession,
+        autoflush=False,
+        expire_on_commit=False
+    )
+    
+    async def get_test_read_db():
+        async with read_session_maker() as session:
+            yield session
+    
+    app.dependency_overrides[get_db_session] = get_test_db
+    app.dependency_overrides[get_db_read_session] = get_test_read_db
+    app.dependency_overrides[get_session_maker] = lambda: async_sessionmaker(
+        test_db_session.bind, expire_on_commit=False
+    )
     
     # Mock authentication
-    fake_user_id = uuid4()
     
     async def mock_verify_token():
         return {"user_id": fake_user_id, "payload": {"sub": str(fake_user_id)}}
@@ -123,10 +144,10 @@ async def test_list_items_empty(client: AsyncClient):
 
 
 @pytest.mark.asyncio
-async def test_list_items_with_filtering(client: AsyncClient, test_db_session: AsyncSession):
+async def test_list_items_with_filtering(client: AsyncClient, test_db_session: AsyncSession, fake_user_id: UUID):
     """Test listing items with filtering."""
     # Create test items
-    user_id = uuid4()
+    user_id = fake_user_id
     card_id_1 = uuid4()
     card_id_2 = uuid4()
     
@@ -179,11 +200,11 @@ async def test_list_items_with_filtering(client: AsyncClient, test_db_session: A
 
 
 @pytest.mark.asyncio
-async def test_get_item_success(client: AsyncClient, test_db_session: AsyncSession):
+async def test_get_item_success(client: AsyncClient, test_db_session: AsyncSession, fake_user_id: UUID):
     """Test getting a specific item."""
     item = CollectionItem(
         id=uuid4(),
-        user_id=uuid4(),
+        user_id=fake_user_id,
         card_id=uuid4(),
         quantity=1,
         condition="NM",
@@ -210,11 +231,11 @@ async def test_get_item_not_found(client: AsyncClient):
 
 
 @pytest.mark.asyncio
-async def test_update_item_success(client: AsyncClient, test_db_session: AsyncSession):
+async def test_update_item_success(client: AsyncClient, test_db_session: AsyncSession, fake_user_id: UUID):
     """Test updating an item."""
     item = CollectionItem(
         id=uuid4(),
-        user_id=uuid4(),
+        user_id=fake_user_id,
         card_id=uuid4(),
         quantity=1,
         condition="NM",
@@ -246,11 +267,11 @@ async def test_update_item_not_found(client: AsyncClient):
 
 
 @pytest.mark.asyncio
-async def test_delete_item_success(client: AsyncClient, test_db_session: AsyncSession):
+async def test_delete_item_success(client: AsyncClient, test_db_session: AsyncSession, fake_user_id: UUID):
     """Test deleting an item."""
     item = CollectionItem(
         id=uuid4(),
-        user_id=uuid4(),
+        user_id=fake_user_id,
         card_id=uuid4(),
         quantity=1,
         condition="NM",
@@ -273,13 +294,13 @@ async def test_delete_item_not_found(client: AsyncClient):
 
 
 @pytest.mark.asyncio
-async def test_pagination(client: AsyncClient, test_db_session: AsyncSession):
+async def test_pagination(client: AsyncClient, test_db_session: AsyncSession, fake_user_id: UUID):
     """Test pagination."""
     # Create 5 items
     for i in range(5):
         item = CollectionItem(
             id=uuid4(),
-            user_id=uuid4(),
+            user_id=fake_user_id,
             card_id=uuid4(),
             quantity=1,
             condition="NM",
@@ -310,3 +331,943 @@ async def test_health_endpoint(client: AsyncClient):
     assert "service" in data
     assert "version" in data
 
+
+
+@pytest.mark.asyncio
+async def test_list_items_cursor_pagination(test_db_session: AsyncSession):
+    """Test keyset pagination walks every item exactly once."""
+    from datetime import datetime, timedelta
+    from app.services.item_service import ItemService
+    
+    user_id = uuid4()
+    base = datetime(2024, 1, 1, 12, 0, 0)
+    
+    # Two items share each timestamp to exercise the id tie-breaker
+    for i in range(7):
+        test_db_session.add(CollectionItem(
+            id=uuid4(),
+            user_id=user_id,
+            card_id=uuid4(),
+            quantity=1,
+            condition="NM",
+            language="en" if i % 3 else "it",
+            is_foil=False,
+            added_at=base + timedelta(minutes=i // 2)
+        ))
+    await test_db_session.commit()
+    
+    seen = []
+    cursor = None
+    while True:
+        items, total, cursor = await ItemService.list_items(
+            db=test_db_session, user_id=user_id, limit=3, cursor=cursor
+        )
+        assert total == 7
+        seen.extend(item.id for item in items)
+        if cursor is None:
+            break
+    
+    assert len(seen) == 7
+    assert len(set(seen)) == 7
+    
+    # Offset mode returns the same ordering
+    items, _, _ = await ItemService.list_items(
+        db=test_db_session, user_id=user_id, limit=7
+    )
+    assert [item.id for item in items] == seen
+    
+    # Filters apply in cursor mode as well
+    items, total, cursor = await ItemService.list_items(
+        db=test_db_session, user_id=user_id, limit=2, language="en"
+    )
+    items_2, _, _ = await ItemService.list_items(
+        db=test_db_session, user_id=user_id, limit=2, language="en", cursor=cursor
+    )
+    assert total == 4
+    assert all(item.language == "en" for item in items + items_2)
+    assert not {item.id for item in items} & {item.id for item in items_2}
+
+
+@pytest.mark.asyncio
+async def test_cursor_pagination_over_created_items(client: AsyncClient, monkeypatch):
+    """Test cursor pages over items created through the API, in the same instant."""
+    from datetime import datetime, timezone
+    
+    url = "/api/v1/collections/items/"
+    created_at = datetime.now(timezone.utc).replace(microsecond=0)
+    added_at = CollectionItem.__table__.c.added_at.default
+    monkeypatch.setattr(added_at, "arg", lambda context: created_at)
+    
+    ids = set()
+    for _ in range(5):
+        response = await client.post(url, json={
+            "card_id": str(uuid4()), "condition": "NM", "language": "en"
+        })
+        ids.add(response.json()["id"])
+    
+    seen = []
+    params = {"limit": 2, "include_total": "false"}
+    while True:
+        page = (await client.get(url, params=params)).json()
+        seen.extend(item["id"] for item in page["items"])
+        assert len(seen) <= 5, "a page repeated items"
+        if page["next_cursor"] is None:
+            break
+        params["cursor"] = page["next_cursor"]
+    
+    assert len(seen) == 5
+    assert set(seen) == ids
+
+
+@pytest.mark.asyncio
+async def test_list_items_invalid_cursor(test_db_session: AsyncSession):
+    """Test a malformed cursor is rejected."""
+    from fastapi import HTTPException
+    from app.services.item_service import ItemService
+    
+    with pytest.raises(HTTPException) as exc_info:
+        await ItemService.list_items(
+            db=test_db_session, user_id=uuid4(), cursor="not-a-cursor"
+        )
+    assert exc_info.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_items(test_db_session: AsyncSession):
+    """Test bulk upsert creates, updates and rejects rows."""
+    from sqlalchemy import select
+    from app.services.item_service import ItemService
+    
+    user_id = uuid4()
+    other_user_id = uuid4()
+    existing_id = uuid4()
+    test_db_session.add_all([
+        CollectionItem(
+            id=existing_id, user_id=user_id, card_id=uuid4(),
+            quantity=1, condition="NM", language="en", cardtrader_id=100
+        ),
+        CollectionItem(
+            id=uuid4(), user_id=other_user_id, card_id=uuid4(),
+            quantity=1, condition="NM", language="en", cardtrader_id=200
+        )
+    ])
+    await test_db_session.commit()
+    
+    card_id = uuid4()
+    results = await ItemService.bulk_upsert_items(
+        db=test_db_session,
+        user_id=user_id,
+        items=[
+            {"card_id": card_id, "quantity": 4, "condition": "LP", "language": "en", "cardtrader_id": 100},
+            {"card_id": card_id, "condition": "NM", "language": "it", "cardtrader_id": 101},
+            {"card_id": card_id, "condition": "NM", "language": "de"},
+            {"card_id": card_id, "quantity": 0, "condition": "NM", "language": "en"},
+            {"card_id": card_id, "condition": "NM", "language": "en", "cardtrader_id": 101},
+            {"card_id": card_id, "condition": "NM", "language": "en", "cardtrader_id": 200},
+        ]
+    )
+    
+    assert [r["status"] for r in results] == [
+        "updated", "created", "created", "rejected", "rejected", "rejected"
+    ]
+    assert results[0]["id"] == existing_id
+    assert "quantity" in results[3]["error"]
+    
+    test_db_session.expire_all()
+    rows = (await test_db_session.execute(
+        select(CollectionItem).where(CollectionItem.user_id == user_id)
+    )).scalars().all()
+    assert len(rows) == 3
+    updated = next(row for row in rows if row.id == existing_id)
+    assert updated.quantity == 4
+    assert updated.condition == "LP"
+    
+    # The other user's item is untouched
+    foreign = (await test_db_session.execute(
+        select(CollectionItem).where(CollectionItem.cardtrader_id == 200)
+    )).scalar_one()
+    assert foreign.user_id == other_user_id
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_never_writes_other_users_rows(test_db_session: AsyncSession):
+    """Test a cardtrader_id claimed by another user after the lookup."""
+    from sqlalchemy import select
+    from app.services.item_service import ItemService
+    from app.services.summary_service import SummaryService
+    
+    owner, intruder = uuid4(), uuid4()
+    await ItemService.bulk_upsert_items(test_db_session, owner, [
+        {"card_id": str(uuid4()), "quantity": 2, "condition": "NM", "language": "en", "cardtrader_id": 7}
+    ])
+    
+    # Hide the owner's row from the lookup, as if it were inserted right after
+    def blind_lookup(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("SELECT collection_items.cardtrader_id, collection_items.id"):
+            statement += " AND 1 = 0"
+        return statement, parameters
+    
+    engine = test_db_session.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", blind_lookup, retval=True)
+    try:
+        results = await ItemService.bulk_upsert_items(test_db_session, intruder, [
+            {"card_id": str(uuid4()), "quantity": 9, "condition": "HP", "language": "de", "cardtrader_id": 7},
+            {"card_id": str(uuid4()), "quantity": 1, "condition": "NM", "language": "en", "cardtrader_id": 8}
+        ])
+    finally:
+        event.remove(engine, "before_cursor_execute", blind_lookup)
+    
+    assert [outcome["status"] for outcome in results] == ["rejected", "created"]
+    assert "another collection" in results[0]["error"]
+    
+    test_db_session.expire_all()
+    owned = (await test_db_session.execute(
+        select(CollectionItem).where(CollectionItem.cardtrader_id == 7)
+    )).scalar_one()
+    assert (owned.user_id, owned.quantity, owned.condition) == (owner, 2, "NM")
+    summary = await SummaryService.get_summary(test_db_session, intruder)
+    assert (summary["total_items"], summary["total_quantity"]) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_export_items_streams_in_batches(test_db_session: AsyncSession):
+    """Test the export streams every item in bounded batches."""
+    import csv
+    import io
+    from sqlalchemy import insert
+    from app.routers.items import EXPORT_COLUMNS, _render_csv, _render_ndjson
+    from app.services.item_service import ItemService, EXPORT_BATCH_SIZE
+    
+    user_id = uuid4()
+    rows = [
+        {
+            "id": uuid4(), "user_id": user_id, "card_id": uuid4(),
+            "quantity": 1, "condition": "NM", "language": "en",
+            "is_foil": False, "is_signed": False, "is_altered": False,
+            "tags": ["binder, 1"] if i == 0 else None
+        }
+        for i in range(EXPORT_BATCH_SIZE * 2 + 5)
+    ]
+    await test_db_session.execute(insert(CollectionItem.__table__), rows)
+    test_db_session.add(CollectionItem(
+        id=uuid4(), user_id=uuid4(), card_id=uuid4(),
+        quantity=1, condition="NM", language="en"
+    ))
+    await test_db_session.commit()
+    
+    batch_sizes = [
+        len(batch) async for batch in ItemService.stream_items(
+            test_db_session, user_id, EXPORT_COLUMNS
+        )
+    ]
+    assert batch_sizes == [EXPORT_BATCH_SIZE, EXPORT_BATCH_SIZE, 5]
+    
+    ndjson = "".join([
+        chunk async for chunk in _render_ndjson(
+            ItemService.stream_items(test_db_session, user_id, EXPORT_COLUMNS)
+        )
+    ])
+    lines = ndjson.splitlines()
+    assert len(lines) == len(rows)
+    assert {json.loads(line)["user_id"] for line in lines} == {str(user_id)}
+    
+    exported = "".join([
+        chunk async for chunk in _render_csv(
+            ItemService.stream_items(test_db_session, user_id, EXPORT_COLUMNS)
+        )
+    ])
+    records = list(csv.DictReader(io.StringIO(exported)))
+    assert len(records) == len(rows)
+    assert list(records[0]) == EXPORT_COLUMNS
+    assert ["binder, 1"] in [json.loads(r["tags"]) for r in records if r["tags"]]
+
+
+@pytest.mark.asyncio
+async def test_collection_summary_maintained_by_writes(test_db_session: AsyncSession):
+    """Test write paths keep the summary equal to a full GROUP BY rebuild."""
+    from app.services.item_service import ItemService
+    from app.services.summary_service import SummaryService
+    
+    user_id = uuid4()
+    card_a, card_b = uuid4(), uuid4()
+    
+    first = await ItemService.create_item(test_db_session, user_id, {
+        "card_id": card_a, "quantity": 2, "condition": "NM", "language": "en"
+    })
+    second = await ItemService.create_item(test_db_session, user_id, {
+        "card_id": card_a, "quantity": 1, "condition": "LP", "language": "it",
+        "is_foil": True, "source": "manual"
+    })
+    await ItemService.create_item(test_db_session, user_id, {
+        "card_id": card_b, "quantity": 5, "condition": "NM", "language": "en"
+    })
+    await ItemService.bulk_upsert_items(test_db_session, user_id, [
+        {"card_id": card_b, "quantity": 3, "condition": "MP", "language": "de",
+         "source": "cardtrader", "cardtrader_id": 1},
+    ])
+    
+    summary = await SummaryService.get_summary(test_db_session, user_id)
+    assert summary["total_items"] == 4
+    assert summary["total_quantity"] == 11
+    assert summary["unique_cards"] == 2
+    assert summary["by_language"]["en"] == {"items": 2, "quantity": 7}
+    assert summary["by_foil"]["true"] == {"items": 1, "quantity": 1}
+    assert summary["by_source"]["none"] == {"items": 2, "quantity": 7}
+    
+    await ItemService.update_item(test_db_session, first.id, user_id, {
+        "quantity": 4, "language": "jp"
+    })
+    await ItemService.bulk_upsert_items(test_db_session, user_id, [
+        {"card_id": card_b, "quantity": 1, "condition": "NM", "language": "de",
+         "source": "cardtrader", "cardtrader_id": 1},
+    ])
+    await ItemService.delete_item(test_db_session, second.id, user_id)
+    
+    maintained = await SummaryService.get_summary(test_db_session, user_id)
+    assert maintained["total_quantity"] == 10
+    assert maintained["unique_cards"] == 2
+    assert "it" not in maintained["by_language"]
+    
+    await SummaryService.rebuild(test_db_session, user_id)
+    assert await SummaryService.get_summary(test_db_session, user_id) == maintained
+    
+    # Removing the last copy of a card drops it from the distinct count
+    await ItemService.delete_item(test_db_session, first.id, user_id)
+    summary = await SummaryService.get_summary(test_db_session, user_id)
+    assert summary["unique_cards"] == 1
+
+
+@pytest.mark.asyncio
+async def test_update_and_delete_round_trips(test_db_session: AsyncSession):
+    """Test update/delete issue one ownership-scoped statement per item."""
+    from fastapi import HTTPException
+    from app.services.item_service import ItemService
+    
+    user_id = uuid4()
+    item = await ItemService.create_item(test_db_session, user_id, {
+        "card_id": uuid4(), "quantity": 2, "condition": "NM", "language": "en"
+    })
+    item_id = item.id
+    
+    statements = []
+    
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    engine = test_db_session.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        updated = await ItemService.update_item(test_db_session, item_id, user_id, {"notes": "binder 2"})
+        assert updated.notes == "binder 2"
+        assert updated.quantity == 2
+        # The collection version bump (taken first) plus the update itself
+        assert len(statements) == 2
+        assert "collection_versions" in statements[0]
+        assert statements[1].startswith("UPDATE collection_items")
+        assert "RETURNING" in statements[1]
+        
+        statements.clear()
+        with pytest.raises(HTTPException) as exc_info:
+            await ItemService.update_item(test_db_session, item_id, uuid4(), {"notes": "stolen"})
+        assert exc_info.value.status_code == 404
+        assert len(statements) == 2
+        
+        statements.clear()
+        with pytest.raises(HTTPException) as exc_info:
+            await ItemService.delete_item(test_db_session, item_id, uuid4())
+        assert exc_info.value.status_code == 404
+        assert len(statements) == 2
+        
+        # The version bump, the delete itself, the summary maintenance
+        # (bucket deltas, card bucket check, distinct-card counter) and
+        # the tombstone
+        statements.clear()
+        assert await ItemService.delete_item(test_db_session, item_id, user_id)
+        assert statements[1].startswith("DELETE FROM collection_items")
+        assert statements[-1].startswith("INSERT INTO collection_item_tombstones")
+        assert len(statements) == 6
+        assert not any(s.startswith("SELECT") and "FROM collection_items" in s for s in statements)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+@pytest.mark.asyncio
+async def test_list_items_total_cached_until_write(test_db_session: AsyncSession):
+    """Test totals are optional, cached per filter and invalidated by writes."""
+    from app.services.item_service import ItemService
+    
+    user_id = uuid4()
+    for language in ("en", "en", "it"):
+        await ItemService.create_item(test_db_session, user_id, {
+            "card_id": uuid4(), "condition": "NM", "language": language
+        })
+    
+    statements = []
+    
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    engine = test_db_session.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        items, total, _ = await ItemService.list_items(test_db_session, user_id, include_total=False)
+        assert (len(items), total) == (3, None)
+        assert len(statements) == 1
+        
+        _, total, _ = await ItemService.list_items(test_db_session, user_id, language="en")
+        assert total == 2
+        statements.clear()
+        _, total, _ = await ItemService.list_items(test_db_session, user_id, language="en", limit=1)
+        assert total == 2
+        assert len(statements) == 1
+        
+        _, total, _ = await ItemService.list_items(test_db_session, user_id)
+        assert total == 3
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    
+    await ItemService.create_item(test_db_session, user_id, {
+        "card_id": uuid4(), "condition": "NM", "language": "en"
+    })
+    assert (await ItemService.list_items(test_db_session, user_id, language="en"))[1] == 3
+    assert (await ItemService.list_items(test_db_session, user_id))[1] == 4
+
+
+
+@pytest.mark.asyncio
+async def test_list_items_count_cache_bounded_per_user(test_db_session: AsyncSession, monkeypatch):
+    """Test distinct searches cannot grow a user's cached totals without bound."""
+    from app.core.config import settings
+    from app.services import item_service
+    from app.services.item_service import ItemService
+    
+    monkeypatch.setattr(settings, "COUNT_CACHE_FILTERS", 2)
+    item_service.reset_count_cache()
+    
+    user_id = uuid4()
+    await ItemService.create_item(test_db_session, user_id, {
+        "card_id": uuid4(), "condition": "NM", "language": "en", "notes": "binder"
+    })
+    for i in range(5):
+        await ItemService.list_items(test_db_session, user_id, q=f"search {i}")
+    _, total, _ = await ItemService.list_items(test_db_session, user_id, q="binder")
+    assert total == 1
+    
+    _, counts = item_service._get_count_cache()[str(user_id)]
+    assert len(counts) == 2
+    item_service.reset_count_cache()
+
+
+@pytest.mark.asyncio
+async def test_conditional_reads(client: AsyncClient, test_db_session: AsyncSession):
+    """Test ETags on reads and 304 responses for matching If-None-Match."""
+    response = await client.post("/api/v1/collections/items/", json={
+        "card_id": str(uuid4()), "condition": "NM", "language": "en"
+    })
+    item_url = f"/api/v1/collections/items/{response.json()['id']}"
+    list_url = "/api/v1/collections/items/"
+    
+    listed = await client.get(list_url)
+    etag = listed.headers["etag"]
+    assert listed.headers["cache-control"] == "private, no-cache"
+    assert (await client.get(list_url)).headers["etag"] == etag
+    
+    # Another URL is another representation
+    fetched = await client.get(item_url)
+    assert fetched.headers["etag"] != etag
+    
+    statements = []
+    
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    engine = test_db_session.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        not_modified = await client.get(list_url, headers={"If-None-Match": etag})
+        assert not_modified.status_code == 304
+        assert not_modified.content == b""
+        assert not_modified.headers["etag"] == etag
+        # Only the version lookup, no item rows
+        assert len(statements) == 1
+        assert "collection_versions" in statements[0]
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    
+    response = await client.get(item_url, headers={"If-None-Match": f'"x", W/{fetched.headers["etag"]}'})
+    assert response.status_code == 304
+    
+    # "*" only matches an item that exists (and is the caller's)
+    assert (await client.get(item_url, headers={"If-None-Match": "*"})).status_code == 304
+    missing_url = f"/api/v1/collections/items/{uuid4()}"
+    assert (await client.get(missing_url, headers={"If-None-Match": "*"})).status_code == 404
+    
+    # Any write changes the version, and with it every ETag
+    await client.patch(item_url, json={"notes": "sleeved"})
+    refreshed = await client.get(list_url, headers={"If-None-Match": etag})
+    assert refreshed.status_code == 200
+    assert refreshed.headers["etag"] != etag
+    assert refreshed.json()["items"][0]["notes"] == "sleeved"
+
+
+@pytest.mark.asyncio
+async def test_validated_response_keeps_wire_format():
+    """Test responses encode like FastAPI's response_model path (UTC as "Z")."""
+    from datetime import datetime, timezone
+    from fastapi.routing import APIRoute, serialize_response
+    from app.core.responses import validated_response
+    from app.schemas.item import ItemResponse
+    
+    stamp = datetime(2024, 5, 1, 12, 30, 15, 250000, tzinfo=timezone.utc)
+    model = ItemResponse(
+        id=uuid4(), user_id=uuid4(), card_id=uuid4(), quantity=2,
+        condition="NM", language="en", tags=["trade"],
+        added_at=stamp, updated_at=stamp
+    )
+    route = next(
+        route for route in app.routes
+        if isinstance(route, APIRoute)
+        and route.path == "/api/v1/collections/items/{item_id}" and "GET" in route.methods
+    )
+    
+    body = json.loads(validated_response(model).body)
+    assert body == await serialize_response(field=route.response_field, response_content=model)
+    assert body["added_at"] == "2024-05-01T12:30:15.250000Z"
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint(client: AsyncClient, monkeypatch):
+    """Test /metrics exposes per-route request histograms."""
+    from app.core.config import settings
+    
+    await client.get(f"/api/v1/collections/items/{uuid4()}")
+    await client.get("/no/such/path")
+    
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/v1/collections/items/{item_id}",status="404"}' in body
+    assert 'route="unmatched"' in body
+    assert 'http_requests_in_progress{method="GET"} 1.0' in body
+    for family in ("db_query_duration_seconds", "token_verify_duration_seconds", "jwks_fetch_duration_seconds", "db_pool_checked_out"):
+        assert f"# TYPE {family} " in body
+    
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape-secret")
+    assert (await client.get("/metrics")).status_code == 401
+    response = await client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_list_items_tag_and_notes_filters(client: AsyncClient, test_db_session: AsyncSession):
+    """Test tag (any/all) and notes filters, and the tag index maintenance."""
+    from sqlalchemy import select
+    from app.models.tag import CollectionItemTag
+    
+    url = "/api/v1/collections/items/"
+    created = {}
+    for name, tags, notes in (
+        ("binder", ["binder-1", "trade"], "Pulled from a booster pack"),
+        ("deck", ["deck:edh"], "Signed at GP 100%"),
+        ("both", ["binder-1", "deck:edh", "binder-1"], None),
+        ("plain", None, "Booster box topper"),
+    ):
+        response = await client.post(url, json={
+            "card_id": str(uuid4()), "condition": "NM", "language": "en",
+            "tags": tags, "notes": notes
+        })
+        assert response.status_code == 201
+        created[name] = response.json()["id"]
+    
+    async def listed(**params):
+        response = await client.get(url, params=params)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == len(data["items"])
+        return {name for name, item_id in created.items() if item_id in {item["id"] for item in data["items"]}}
+    
+    assert await listed(tag="binder-1") == {"binder", "both"}
+    assert await listed(tag=["trade", "deck:edh"]) == {"binder", "deck", "both"}
+    assert await listed(tag=["binder-1", "deck:edh"], tag_match="all") == {"both"}
+    assert await listed(tag="missing") == set()
+    assert await listed(q="booster") == {"binder", "plain"}
+    assert await listed(q="booster pack") == {"binder"}
+    assert await listed(q="100%") == {"deck"}
+    assert await listed(q="booster", tag="trade") == {"binder"}
+    
+    # Retagging and deleting keep the index in step
+    response = await client.patch(f"{url}{created['binder']}", json={"tags": ["deck:edh"]})
+    assert response.status_code == 200
+    assert await listed(tag="binder-1") == {"both"}
+    assert await listed(tag="deck:edh") == {"binder", "deck", "both"}
+    
+    assert (await client.delete(f"{url}{created['both']}")).status_code == 204
+    assert await listed(tag="deck:edh") == {"binder", "deck"}
+    
+    result = await test_db_session.execute(select(CollectionItemTag.tag))
+    assert sorted(result.scalars()) == ["deck:edh", "deck:edh"]
+    
+    # Tags differing by case or spaces are one tag (as for MySQL's collation)
+    response = await client.post(url, json={
+        "card_id": str(uuid4()), "condition": "NM", "language": "en",
+        "tags": ["Foo", "foo", "foo "]
+    })
+    assert response.status_code == 201
+    assert response.json()["tags"] == ["Foo", "foo", "foo "]
+    created["cased"] = response.json()["id"]
+    result = await test_db_session.execute(
+        select(CollectionItemTag.tag).where(CollectionItemTag.item_id == UUID(created["cased"]))
+    )
+    assert result.scalars().all() == ["foo"]
+    assert await listed(tag="FOO") == {"cased"}
+    assert await listed(tag=[" foo", "Deck:EDH"], tag_match="all") == set()
+    
+    response = await client.get(url, params={"tag": [f"t{i}" for i in range(21)]})
+    assert response.status_code == 400
+    response = await client.post(url, json={
+        "card_id": str(uuid4()), "condition": "NM", "language": "en", "tags": ["x" * 65]
+    })
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_owned_cards_lookup(client: AsyncClient, test_db_session: AsyncSession, monkeypatch):
+    """Test per-card owned quantities, split by variant, in request order."""
+    from app.services import item_service
+    
+    url = "/api/v1/collections/items/"
+    owned, other = uuid4(), uuid4()
+    for condition, language, is_foil, quantity in (
+        ("NM", "en", False, 2), ("NM", "en", False, 1), ("LP", "it", True, 4)
+    ):
+        await client.post(url, json={
+            "card_id": str(owned), "condition": condition, "language": language,
+            "is_foil": is_foil, "quantity": quantity
+        })
+    await client.post(url, json={"card_id": str(other), "condition": "NM", "language": "en"})
+    
+    # Another user's copies are not counted
+    from app.services.item_service import ItemService
+    await ItemService.create_item(test_db_session, uuid4(), {
+        "card_id": owned, "condition": "NM", "language": "en", "quantity": 9
+    })
+    
+    statements = []
+    
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    monkeypatch.setattr(item_service, "OWNED_BATCH_SIZE", 2)
+    engine = test_db_session.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = await client.post(f"{url}owned", json={
+            "card_ids": [str(other), str(uuid4()), str(owned), str(other)]
+        })
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    
+    assert response.status_code == 200
+    cards = response.json()["cards"]
+    assert [card["card_id"] for card in cards] == [str(other), str(owned)]
+    assert cards[0]["quantity"] == 1
+    assert cards[1]["quantity"] == 7
+    assert sorted((v["condition"], v["language"], v["is_foil"], v["quantity"]) for v in cards[1]["variants"]) == [
+        ("LP", "it", True, 4), ("NM", "en", False, 3)
+    ]
+    # Three distinct cards in batches of two
+    assert len([s for s in statements if "GROUP BY" in s]) == 2
+    
+    response = await client.post(f"{url}owned", json={"card_ids": []})
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_cardtrader_link_status_unlink(client: AsyncClient):
+    """Test linking a CardTrader account; the token is never returned."""
+    url = "/api/v1/collections/cardtrader"
+    
+    response = await client.get(url)
+    assert response.status_code == 404
+    
+    response = await client.put(url, json={"api_token": "secret-token"})
+    assert response.status_code == 200
+    assert response.json() == {"last_synced_at": None, "last_full_sync_at": None, "last_error": None}
+    
+    response = await client.get(url)
+    assert response.status_code == 200
+    assert "secret-token" not in response.text
+    
+    response = await client.put(url, json={"api_token": ""})
+    assert response.status_code == 422
+    
+    response = await client.delete(url)
+    assert response.status_code == 204
+    response = await client.delete(url)
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_csv_import_job(client: AsyncClient, monkeypatch):
+    """Test a background CSV import, its progress and rejected rows."""
+    import asyncio
+    from app.core.config import settings
+    from app.services import import_service
+    
+    monkeypatch.setattr(settings, "IMPORT_CHUNK_SIZE", 2)
+    url = "/api/v1/collections/items/import"
+    card_id = str(uuid4())
+    csv_body = (
+        "card_id,quantity,condition,language,is_foil,tags,cardtrader_id,price\r\n"
+        f"{card_id},2,NM,en,true,\"binder, trade\",77,1.50\r\n"
+        f"{uuid4()},0,NM,en,false,,,\r\n"
+        f"{uuid4()},1,LP,it,false,\"[\"\"deck\"\"]\",,\r\n"
+        f"{card_id},5,NM,en,true,binder,77,\r\n"
+        "not-a-uuid,1,NM,en,false,,,\r\n"
+    )
+    
+    response = await client.post(url, content=csv_body, headers={"Content-Type": "text/csv"})
+    assert response.status_code == 202
+    job = response.json()
+    assert job["status"] == "pending"
+    assert response.headers["location"].endswith(f"{url}/{job['id']}")
+    
+    await asyncio.gather(*import_service.running_imports())
+    
+    response = await client.get(f"{url}/{job['id']}")
+    assert response.status_code == 200
+    job = response.json()
+    assert job["status"] == "completed"
+    assert (job["rows_processed"], job["created"], job["updated"], job["rejected"]) == (5, 2, 1, 2)
+    assert [error["line"] for error in job["errors"]] == [3, 6]
+    assert job["errors"][0]["error"].startswith("quantity")
+    assert job["finished_at"] is not None
+    
+    response = await client.get("/api/v1/collections/items/?include_total=true")
+    items = {item["card_id"]: item for item in response.json()["items"]}
+    assert len(items) == 2
+    assert (items[card_id]["quantity"], items[card_id]["tags"]) == (5, ["binder"])
+    assert [item["tags"] for item in items.values() if item["card_id"] != card_id] == [["deck"]]
+    
+    response = await client.get(f"{url}/{uuid4()}")
+    assert response.status_code == 404
+    
+    response = await client.post(url, content="card_id,quantity\r\n", headers={"Content-Type": "text/csv"})
+    assert response.status_code == 400
+    assert "condition, language" in response.json()["detail"]
+    
+    response = await client.post(url, json={"items": []})
+    assert response.status_code == 415
+
+
+@pytest.mark.asyncio
+async def test_change_feed(client: AsyncClient, test_db_session: AsyncSession):
+    """Test the change feed: first sync, pages, deletes and expired tokens."""
+    from datetime import datetime, timedelta, timezone
+    from app.services.change_service import ChangeService
+    
+    url = "/api/v1/collections/items"
+    
+    def new_item():
+        return {"card_id": str(uuid4()), "quantity": 1, "condition": "NM", "language": "en"}
+    
+    ids = []
+    for _ in range(3):
+        response = await client.post(f"{url}/", json=new_item())
+        ids.append(response.json()["id"])
+    
+    # First sync, in pages of two
+    response = await client.get(f"{url}/changes?limit=2")
+    assert response.status_code == 200
+    page = response.json()
+    assert (len(page["items"]), page["deleted"], page["has_more"]) == (2, [], True)
+    response = await client.get(f"{url}/changes", params={"since": page["next_token"], "limit": 2})
+    page = response.json()
+    assert (len(page["items"]), page["has_more"]) == (1, False)
+    token = page["next_token"]
+    
+    response = await client.get(f"{url}/changes", params={"since": token})
+    assert response.json() == {"items": [], "deleted": [], "next_token": token, "has_more": False}
+    
+    await client.patch(f"{url}/{ids[0]}", json={"quantity": 4})
+    await client.delete(f"{url}/{ids[1]}")
+    created = (await client.post(f"{url}/", json=new_item())).json()["id"]
+    await client.delete(f"{url}/{created}")
+    
+    response = await client.get(f"{url}/changes", params={"since": token})
+    page = response.json()
+    assert [(item["id"], item["quantity"]) for item in page["items"]] == [(ids[0], 4)]
+    assert page["deleted"] == [ids[1], created]
+    assert page["has_more"] is False
+    
+    # The same changes, one per page
+    seen, next_token = [], token
+    while True:
+        page = (await client.get(f"{url}/changes", params={"since": next_token, "limit": 1})).json()
+        seen += [item["id"] for item in page["items"]] + page["deleted"]
+        next_token = page["next_token"]
+        if not page["has_more"]:
+            break
+    assert seen == [ids[0], ids[1], created]
+    
+    response = await client.get(f"{url}/changes", params={"since": "not-a-token"})
+    assert response.status_code == 400
+    
+    # Compacted deletes expire the tokens that have not seen them
+    compacted = await ChangeService.compact_tombstones(
+        test_db_session, datetime.now(timezone.utc) + timedelta(days=1)
+    )
+    assert compacted == 2
+    response = await client.get(f"{url}/changes", params={"since": token})
+    assert response.status_code == 410
+    response = await client.get(f"{url}/changes", params={"since": next_token})
+    assert response.status_code == 200
+    
+    response = await client.get(f"{url}/changes")
+    assert sorted(item["id"] for item in response.json()["items"]) == sorted([ids[0], ids[2]])
+
+
+@pytest.mark.asyncio
+async def test_merge_create_and_stack_consolidation(client: AsyncClient, test_db_session: AsyncSession, fake_user_id: UUID):
+    """Test merged creates adding to one stack and the consolidation job."""
+    from sqlalchemy import select
+    from app.services.item_service import ItemService
+    from app.services.summary_service import SummaryService
+    
+    url = "/api/v1/collections/items/"
+    card_id = str(uuid4())
+    variant = {"card_id": card_id, "condition": "NM", "language": "en"}
+    
+    response = await client.post(f"{url}?merge=true", json={**variant, "quantity": 2, "notes": "binder 1"})
+    assert response.status_code == 201
+    stack = response.json()
+    
+    response = await client.post(f"{url}?merge=true", json={**variant, "quantity": 3, "notes": "ignored"})
+    assert response.status_code == 200
+    assert (response.json()["id"], response.json()["quantity"]) == (stack["id"], 5)
+    assert response.json()["notes"] == "binder 1"
+    
+    # Other variants get their own stack
+    response = await client.post(f"{url}?merge=true", json={**variant, "is_foil": True})
+    assert response.status_code == 201
+    assert response.json()["id"] != stack["id"]
+    
+    response = await client.post(f"{url}?merge=true", json={**variant, "cardtrader_id": 5})
+    assert response.status_code == 400
+    
+    # Null flags are the default (False) flags of the same variant
+    response = await client.post(
+        f"{url}?merge=true", json={**variant, "is_signed": None, "is_altered": None}
+    )
+    assert response.status_code == 200
+    assert (response.json()["id"], response.json()["quantity"]) == (stack["id"], 6)
+    
+    # Plain creates are not merged
+    for quantity in (1, 1):
+        response = await client.post(url, json={**variant, "quantity": quantity})
+        assert response.status_code == 201
+    # Rows with notes or a CardTrader listing are kept apart
+    await client.post(url, json={**variant, "notes": "signed by the artist"})
+    await client.post("/api/v1/collections/items/bulk", json={"items": [{**variant, "cardtrader_id": 9}]})
+    other_card = str(uuid4())
+    for _ in range(2):
+        await client.post(url, json={"card_id": other_card, "condition": "LP", "language": "it"})
+    
+    stats = await ItemService.consolidate_stacks(test_db_session, fake_user_id)
+    assert stats == {"stacks": 2, "merged": 3}
+    assert await ItemService.consolidate_stacks(test_db_session, fake_user_id) == {"stacks": 0, "merged": 0}
+    
+    result = await test_db_session.execute(
+        select(CollectionItem).where(CollectionItem.user_id == fake_user_id)
+        .execution_options(populate_existing=True)
+    )
+    rows = {(str(item.card_id), item.is_foil, item.notes, item.cardtrader_id): item for item in result.scalars()}
+    assert len(rows) == 5
+    assert (str(rows[(card_id, False, "binder 1", None)].id), rows[(card_id, False, "binder 1", None)].quantity) == (stack["id"], 8)
+    assert rows[(other_card, False, None, None)].quantity == 2
+    assert rows[(other_card, False, None, None)].is_stack
+    assert rows[(card_id, False, "signed by the artist", None)].is_stack is None
+    
+    # The next merged create adds to the consolidated stack
+    response = await client.post(f"{url}?merge=true", json={"card_id": other_card, "condition": "LP", "language": "it"})
+    assert (response.status_code, response.json()["quantity"]) == (200, 3)
+    
+    maintained = await SummaryService.get_summary(test_db_session, fake_user_id)
+    assert (maintained["total_items"], maintained["total_quantity"]) == (5, 14)
+    await SummaryService.rebuild(test_db_session, fake_user_id)
+    assert await SummaryService.get_summary(test_db_session, fake_user_id) == maintained
+
+
+@pytest.mark.asyncio
+async def test_adjust_quantities(client: AsyncClient, test_db_session: AsyncSession, fake_user_id: UUID):
+    """Test atomic quantity adjustments, single and batched."""
+    from app.services.summary_service import SummaryService
+    
+    url = "/api/v1/collections/items"
+    ids = []
+    for quantity in (3, 1, 2):
+        response = await client.post(f"{url}/", json={
+            "card_id": str(uuid4()), "quantity": quantity, "condition": "NM", "language": "en",
+            "tags": ["trade"]
+        })
+        ids.append(response.json()["id"])
+    
+    statements = []
+    
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    engine = test_db_session.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = await client.post(f"{url}/{ids[0]}/adjust", json={"delta": -2})
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert response.status_code == 200
+    assert response.json()["quantity"] == 1
+    # Applied in place: the item is not read first
+    assert not any(s.startswith("SELECT") and "FROM collection_items" in s for s in statements)
+    
+    response = await client.post(f"{url}/{ids[0]}/adjust", json={"delta": -1})
+    assert response.status_code == 409
+    response = await client.post(f"{url}/{ids[0]}/adjust", json={"delta": -2, "delete_if_empty": True})
+    assert response.status_code == 409
+    response = await client.post(f"{url}/{uuid4()}/adjust", json={"delta": 1})
+    assert response.status_code == 404
+    response = await client.post(f"{url}/{ids[0]}/adjust", json={"delta": 0})
+    assert response.status_code == 422
+    
+    response = await client.post(f"{url}/{ids[0]}/adjust", json={"delta": -1, "delete_if_empty": True})
+    assert response.status_code == 204
+    assert (await client.get(f"{url}/{ids[0]}")).status_code == 404
+    
+    response = await client.post(f"{url}/adjust", json={"adjustments": [
+        {"item_id": ids[1], "delta": 1}, {"item_id": ids[2], "delta": 0}
+    ]})
+    assert response.status_code == 422
+    assert (await client.get(f"{url}/{ids[1]}")).json()["quantity"] == 1
+    
+    # Batches are all or nothing
+    response = await client.post(f"{url}/adjust", json={"adjustments": [
+        {"item_id": ids[1], "delta": 4}, {"item_id": ids[2], "delta": -5}
+    ]})
+    assert response.status_code == 409
+    assert ids[2] in response.json()["detail"]
+    assert (await client.get(f"{url}/{ids[1]}")).json()["quantity"] == 1
+    
+    response = await client.post(f"{url}/adjust", json={"adjustments": [
+        {"item_id": ids[2], "delta": -1}, {"item_id": ids[1], "delta": 4},
+        {"item_id": ids[2], "delta": -1}
+    ], "delete_if_empty": True})
+    assert response.status_code == 200
+    assert [(item["id"], item["quantity"]) for item in response.json()["items"]] == [(ids[1], 5)]
+    assert response.json()["deleted"] == [ids[2]]
+    
+    response = await client.get(f"{url}/?tag=trade")
+    assert [item["id"] for item in response.json()["items"]] == [ids[1]]
+    
+    maintained = await SummaryService.get_summary(test_db_session, fake_user_id)
+    assert (maintained["total_items"], maintained["total_quantity"]) == (1, 5)
+    await SummaryService.rebuild(test_db_session, fake_user_id)
+    assert await SummaryService.get_summary(test_db_session, fake_user_id) == maintained
@@ -0,0 +1,261 @@
+import pytest
+from httpx import AsyncClient
+from uuid import uuid4
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+from app.dependencies import get_db_read_session, get_db_session
+from app.main import app
+from app.models.database import ReadOnlySession
+from app.models.item import CollectionItem
+from app.models.pool import InstrumentedQueuePool, engine_options, get_pool_stats, instrument_pool
+from app.models import replicas
+from app.models.queries import fingerprint, instrument_queries, profiler
+from app.models.version import CollectionVersion
+from app.services.version_service import VersionService
+
+
+@pytest.fixture
+async def pooled_engine(tmp_path, monkeypatch):
+    """File-backed SQLite engine built with the configured pool options."""
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 2)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 1)
+    monkeypatch.setattr(settings, "DB_PRE_PING", "idle")
+    monkeypatch.setattr(settings, "DB_PRE_PING_IDLE_SECONDS", 60.0)
+    
+    url = f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}"
+    engine = create_async_engine(url, **engine_options(url))
+    instrument_pool(engine)
+    yield engine
+    await engine.dispose()
+
+
+def test_engine_options_follow_settings(monkeypatch):
+    """Test pool settings are applied, except to in-memory SQLite."""
+    monkeypatch.setattr(settings, "DB_PRE_PING", "always")
+    options = engine_options("mysql+asyncmy://u:p@db/collection")
+    assert options["poolclass"] is InstrumentedQueuePool
+    assert options["pool_size"] == settings.DB_POOL_SIZE
+    assert options["pool_pre_ping"] is True
+    
+    assert "poolclass" not in engine_options("sqlite+aiosqlite:///:memory:")
+
+
+@pytest.mark.asyncio
+async def test_pool_pings_only_idle_connections(pooled_engine, monkeypatch):
+    """Test idle pre-ping and the recorded pool statistics."""
+    for _ in range(3):
+        async with pooled_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    
+    stats = get_pool_stats(pooled_engine)
+    assert stats["connects"] == 1
+    assert stats["pings"] == 0
+    assert stats["checked_out"] == 0
+    assert stats["checkout_seconds"]["count"] == 3
+    assert stats["wait_seconds"]["buckets"]["+Inf"] == 3
+    
+    # Every checked-in connection now counts as idle
+    monkeypatch.setattr(settings, "DB_PRE_PING_IDLE_SECONDS", 0.0)
+    async with pooled_engine.connect() as conn:
+        assert get_pool_stats(pooled_engine)["checked_out"] == 1
+        await conn.execute(text("SELECT 1"))
+    
+    stats = get_pool_stats(pooled_engine)
+    assert stats["pings"] == 1
+    assert stats["ping_failures"] == 0
+
+
+@pytest.mark.asyncio
+async def test_pool_stats_endpoint_requires_admin(monkeypatch):
+    """Test the internal pool endpoint is restricted to administrators."""
+    from app.dependencies import verify_token_dependency
+    
+    user_id = uuid4()
+    
+    async def mock_verify_token():
+        return {"user_id": user_id, "payload": {"sub": str(user_id)}}
+    
+    app.dependency_overrides[verify_token_dependency] = mock_verify_token
+    try:
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            assert (await client.get("/internal/pool")).status_code == 403
+            
+            monkeypatch.setattr(settings, "ADMIN_USER_IDS", [str(user_id)])
+            response = await client.get("/internal/pool")
+            assert response.status_code == 200
+            assert response.json()["pre_ping"] == settings.DB_PRE_PING
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_fingerprint_normalizes_literals():
+    """Test statements differing only in literals share a fingerprint."""
+    first = fingerprint("SELECT a FROM t WHERE id IN (?, ?, ?) AND note = 'it''s'\n  LIMIT 10")
+    second = fingerprint("SELECT a FROM t WHERE id IN (?) AND note = 'x' LIMIT 50")
+    assert first == second == "SELECT a FROM t WHERE id IN (?+) AND note = ? LIMIT ?"
+    
+    assert fingerprint("INSERT INTO t (a, b) VALUES (%s, %s), (%s, %s)") == "INSERT INTO t (a, b) VALUES (?+), ..."
+    assert fingerprint("SELECT * FROM t WHERE k = X'0a1b'") == "SELECT * FROM t WHERE k = ?"
+
+
+@pytest.mark.asyncio
+async def test_query_profiler_collects_fingerprints(pooled_engine, monkeypatch, caplog):
+    """Test sampled statements are grouped and slow ones are logged."""
+    monkeypatch.setattr(settings, "QUERY_PROFILER_ENABLED", True)
+    monkeypatch.setattr(settings, "QUERY_PROFILER_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(settings, "QUERY_PROFILER_SLOW_MS", 1000.0)
+    profiler.reset()
+    instrument_queries(pooled_engine, name="profiled")
+    
+    try:
+        async with pooled_engine.connect() as conn:
+            for value in range(5):
+                await conn.execute(text(f"SELECT {value}"))
+            await conn.execute(text("SELECT 'a', 'b'"))
+        
+        top = profiler.top(order_by="count")
+        assert top[0]["fingerprint"] == "SELECT ?"
+        assert top[0]["samples"] == 5
+        assert top[1]["fingerprint"] == "SELECT ?, ?"
+        assert profiler.slow == 0
+        
+        # Slow statements are logged even when not sampled
+        monkeypatch.setattr(settings, "QUERY_PROFILER_SAMPLE_RATE", 0.0)
+        monkeypatch.setattr(settings, "QUERY_PROFILER_SLOW_MS", 0.0)
+        with caplog.at_level("WARNING", logger="app.models.queries"):
+            async with pooled_engine.connect() as conn:
+                await conn.execute(text("SELECT 42"))
+        assert profiler.slow == 1
+        assert "Slow query" in caplog.text and "<no request>" in caplog.text
+        assert profiler.top(order_by="count")[0]["samples"] == 6
+    finally:
+        profiler.reset()
+
+
+@pytest.mark.asyncio
+async def test_query_stats_endpoint_requires_admin(monkeypatch):
+    """Test the internal query profiler endpoints are restricted to administrators."""
+    from app.dependencies import verify_token_dependency
+    
+    user_id = uuid4()
+    
+    async def mock_verify_token():
+        return {"user_id": user_id, "payload": {"sub": str(user_id)}}
+    
+    app.dependency_overrides[verify_token_dependency] = mock_verify_token
+    try:
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            assert (await client.get("/internal/queries")).status_code == 403
+            assert (await client.delete("/internal/queries")).status_code == 403
+            
+            monkeypatch.setattr(settings, "ADMIN_USER_IDS", [str(user_id)])
+            response = await client.get("/internal/queries", params={"order_by": "p99", "limit": 5})
+            assert response.status_code == 200
+            assert response.json()["enabled"] == settings.QUERY_PROFILER_ENABLED
+            assert (await client.delete("/internal/queries")).status_code == 200
+    finally:
+        app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_rejected_tokens_never_open_a_session():
+    """Test sessions are only created once authentication succeeded."""
+    opened = []
+    
+    async def tracking_session():
+        opened.append(True)
+        yield None
+    
+    app.dependency_overrides[get_db_session] = tracking_session
+    app.dependency_overrides[get_db_read_session] = tracking_session
+    try:
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            headers = {"Authorization": "Bearer not-a-jwt"}
+            for _ in range(5):
+                assert (await client.get("/api/v1/collections/items/", headers=headers)).status_code == 401
+                assert (await client.get("/api/v1/collections/summary", headers=headers)).status_code == 401
+                assert (await client.delete(f"/api/v1/collections/items/{uuid4()}", headers=headers)).status_code == 401
+                assert (await client.post("/api/v1/collections/summary/rebuild", headers=headers)).status_code == 401
+    finally:
+        app.dependency_overrides.clear()
+    
+    assert opened == []
+
+
+@pytest.mark.asyncio
+async def test_read_only_session_rejects_writes(pooled_engine):
+    """Test the read-only session reads normally but refuses to flush."""
+    async with pooled_engine.begin() as conn:
+        await conn.run_sync(CollectionItem.metadata.create_all)
+    
+    read_session_maker = async_sessionmaker(
+        pooled_engine,
+        sync_session_class=ReadOnlySession,
+        autoflush=False,
+        expire_on_commit=False
+    )
+    async with read_session_maker() as session:
+        assert (await session.execute(text("SELECT COUNT(*) FROM collection_items"))).scalar_one() == 0
+        
+        session.add(CollectionItem(user_id=uuid4(), card_id=uuid4(), quantity=1))
+        with pytest.raises(exc.InvalidRequestError, match="Read-only session"):
+            await session.flush()
+
+
+@pytest.mark.asyncio
+async def test_replica_reads_fenced_on_written_version(tmp_path, monkeypatch):
+    """Test reads move to a replica once it has the user's last write."""
+    monkeypatch.setattr(settings, "READ_YOUR_WRITES_SECONDS", 60.0)
+    primary_url = f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}"
+    replica_url = f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}"
+    
+    primary = create_async_engine(primary_url)
+    router = replicas.ReplicaRouter([replica_url])
+    monkeypatch.setattr(replicas, "router", router)
+    for engine in (primary, router.replicas[0].engine):
+        async with engine.begin() as conn:
+            await conn.run_sync(CollectionVersion.metadata.create_all)
+    
+    user_id = uuid4()
+    try:
+        session = await router.open_session(user_id)
+        assert session.get_bind() is router.replicas[0].engine.sync_engine
+        await session.close()
+        
+        # The write commits on the primary; the replica has not caught up
+        async with async_sessionmaker(primary)() as db:
+            assert await VersionService.bump(db, user_id) == 1
+            await db.commit()
+        assert await router.open_session(user_id) is None
+        
+        # Other users are not fenced
+        session = await router.open_session(uuid4())
+        assert session is not None
+        await session.close()
+        
+        # Replication catches up
+        async with async_sessionmaker(router.replicas[0].engine)() as db:
+            await VersionService.bump(db, user_id)
+            await db.commit()
+        session = await router.open_session(user_id)
+        assert session is not None
+        assert await VersionService.get_version(session, user_id) == 1
+        await session.close()
+    finally:
+        await router.dispose()
+        await primary.dispose()
+
+
+@pytest.mark.asyncio
+async def test_unreachable_replica_falls_back_to_primary(tmp_path, monkeypatch):
+    """Test a replica that fails to connect is skipped for a while."""
+    monkeypatch.setattr(settings, "REPLICA_RETRY_SECONDS", 60.0)
+    router = replicas.ReplicaRouter([f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'replica.db'}"])
+    try:
+        assert await router.open_session(uuid4()) is None
+        assert router.replicas[0].down_until > 0
+        assert router._rotation() == []
+    finally:
+        await router.dispose()
@@ -0,0 +1,300 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from fastapi import HTTPException
+from jose import jwk, jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from app.core import security
+from app.core.jwks import JWKSManager
+
+
+AUDIENCE = "collection-service"
+ISSUER = "https://auth.test"
+
+
+class StubJWKSServer:
+    """Local HTTP server publishing a mutable JWKS document."""
+    
+    def __init__(self):
+        self.document = {"keys": []}
+        self.requests = 0
+        self.delay = 0.0
+        self.fail = False
+        
+        stub = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.requests += 1
+                time.sleep(stub.delay)
+                if stub.fail:
+                    self.send_response(500)
+                    self.end_headers()
+                    return
+                body = json.dumps(stub.document).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, *args):
+                pass
+        
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+    
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}/.well-known/jwks.json"
+    
+    def start(self):
+        self._thread.start()
+    
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def make_key(kid: str):
+    """Generate an RSA key pair, returning (private PEM, public JWK)."""
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption()
+    ).decode()
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode()
+    public_jwk = jwk.construct(public_pem, "RS256").to_dict()
+    public_jwk.update({"kid": kid, "use": "sig", "alg": "RS256"})
+    return private_pem, public_jwk
+
+
+def make_token(private_pem: str, kid: str, expires_in: float = 3600, **claims) -> str:
+    """Sign a token for the test audience/issuer."""
+    payload = {
+        "sub": "6f1c1d0e-4c8b-4f51-9f4e-6e0b0b3b1a11",
+        "aud": AUDIENCE,
+        "iss": ISSUER,
+        "exp": int(time.time() + expires_in),
+        **claims
+    }
+    return jwt.encode(payload, private_pem, algorithm="RS256", headers={"kid": kid})
+
+
+@pytest.fixture
+def signing_key():
+    return make_key("key-1")
+
+
+@pytest.fixture
+def jwks_server():
+    server = StubJWKSServer()
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+async def manager(monkeypatch, jwks_server):
+    """Key store for the stub server, registered for verify_token."""
+    manager = JWKSManager(jwks_server.url, min_refetch_interval=0)
+    monkeypatch.setitem(security._jwks_managers, jwks_server.url, manager)
+    yield manager
+    await manager.stop()
+
+
+@pytest.fixture
+def jwks(jwks_server, manager, signing_key):
+    """Publish the signing key and start with an empty token cache."""
+    jwks_server.document = {"keys": [signing_key[1]]}
+    security.reset_token_cache()
+    yield jwks_server.document
+    security.reset_token_cache()
+
+
+@pytest.fixture
+def decode_calls(monkeypatch):
+    """Count full signature verifications."""
+    calls = []
+    original = security.jwt.decode
+    
+    def counting_decode(*args, **kwargs):
+        calls.append(1)
+        return original(*args, **kwargs)
+    
+    monkeypatch.setattr(security.jwt, "decode", counting_decode)
+    return calls
+
+
+@pytest.fixture
+def verify(jwks_server):
+    async def verify(token: str) -> dict:
+        return await security.verify_token(token, jwks_server.url, AUDIENCE, ISSUER)
+    return verify
+
+
+@pytest.mark.asyncio
+async def test_verified_token_served_from_cache(jwks, signing_key, decode_calls, verify):
+    """Test a valid token is verified once and then served from the cache."""
+    token = make_token(signing_key[0], "key-1")
+    
+    for _ in range(3):
+        payload = await verify(token)
+        assert payload["aud"] == AUDIENCE
+    
+    assert len(decode_calls) == 1
+    stats = security.get_token_cache_stats()
+    assert stats["misses"] == 1
+    assert stats["hits"] == 2
+    assert stats["size"] == 1
+
+
+@pytest.mark.asyncio
+async def test_invalid_token_negative_cached(jwks, signing_key, decode_calls, verify):
+    """Test a rejected token is not re-verified while negatively cached."""
+    token = make_token(signing_key[0], "key-1", aud="someone-else")
+    
+    for _ in range(3):
+        with pytest.raises(HTTPException) as exc_info:
+            await verify(token)
+        assert exc_info.value.status_code == 401
+    
+    assert len(decode_calls) == 1
+    assert security.get_token_cache_stats()["hits"] == 2
+
+
+@pytest.mark.asyncio
+async def test_expired_token_never_served_from_cache(jwks, signing_key, verify):
+    """Test a cached payload stops being served once the token expires."""
+    token = make_token(signing_key[0], "key-1", expires_in=1)
+    await verify(token)
+    
+    # python-jose compares 'exp' against whole seconds
+    exp = jwt.get_unverified_claims(token)["exp"]
+    await asyncio.sleep(max(exp + 1 - time.time(), 0) + 0.1)
+    
+    with pytest.raises(HTTPException) as exc_info:
+        await verify(token)
+    assert exc_info.value.status_code == 401
+    assert "expired" in exc_info.value.detail.lower()
+
+
+@pytest.mark.asyncio
+async def test_unknown_kid_never_served_from_cache(jwks_server, jwks, manager, signing_key, verify):
+    """Test a cached payload is dropped once its key leaves the JWKS."""
+    token = make_token(signing_key[0], "key-1")
+    await verify(token)
+    
+    # Key rotation: key-1 is no longer published
+    jwks_server.document = {"keys": [make_key("key-2")[1]]}
+    await manager.refresh()
+    
+    with pytest.raises(HTTPException) as exc_info:
+        await verify(token)
+    assert exc_info.value.status_code == 401
+    assert "signing key" in exc_info.value.detail
+    
+    # A token with a kid that was never published is rejected too
+    other_pem, _ = make_key("key-3")
+    with pytest.raises(HTTPException):
+        await verify(make_token(other_pem, "key-3"))
+
+
+@pytest.mark.asyncio
+async def test_jwks_single_flight_fetch(jwks_server, signing_key):
+    """Test concurrent cold lookups share a single HTTP request."""
+    jwks_server.document = {"keys": [signing_key[1]]}
+    jwks_server.delay = 0.2
+    manager = JWKSManager(jwks_server.url)
+    
+    keys = await asyncio.gather(*(manager.get_key("key-1") for _ in range(20)))
+    
+    assert all(key["kid"] == "key-1" for key in keys)
+    assert jwks_server.requests == 1
+    await manager.stop()
+
+
+@pytest.mark.asyncio
+async def test_jwks_unknown_kid_refetch_rate_limited(jwks_server, signing_key):
+    """Test an unknown kid triggers a refetch at most once per interval."""
+    jwks_server.document = {"keys": [signing_key[1]]}
+    manager = JWKSManager(jwks_server.url, min_refetch_interval=60)
+    assert await manager.get_key("key-1") is not None
+    
+    for _ in range(5):
+        assert await manager.get_key("missing") is None
+    assert jwks_server.requests == 1
+    
+    # Once the interval has passed, a rotated key is picked up on demand
+    new_key = make_key("key-2")[1]
+    jwks_server.document = {"keys": [signing_key[1], new_key]}
+    manager.min_refetch_interval = 0
+    assert (await manager.get_key("key-2"))["kid"] == "key-2"
+    assert jwks_server.requests == 2
+    await manager.stop()
+
+
+@pytest.mark.asyncio
+async def test_jwks_background_refresh_before_expiry(jwks_server, signing_key):
+    """Test keys close to expiry are served immediately and refreshed behind."""
+    jwks_server.document = {"keys": [signing_key[1]]}
+    manager = JWKSManager(jwks_server.url, ttl=60, refresh_ahead=60, min_refetch_interval=0)
+    await manager.get_key("key-1")
+    
+    jwks_server.delay = 0.2
+    started = time.perf_counter()
+    assert await manager.get_key("key-1") is not None
+    assert time.perf_counter() - started < 0.1
+    
+    for _ in range(50):
+        if jwks_server.requests == 2 and manager.age < 0.2:
+            break
+        await asyncio.sleep(0.02)
+    assert jwks_server.requests == 2
+    await manager.stop()
+
+
+@pytest.mark.asyncio
+async def test_jwks_stale_while_error(jwks_server, signing_key):
+    """Test expired keys keep being served while the auth server is down."""
+    jwks_server.fail = True
+    manager = JWKSManager(jwks_server.url, ttl=0.05, min_refetch_interval=0)
+    
+    # Nothing to fall back to on a cold start
+    with pytest.raises(HTTPException) as exc_info:
+        await manager.get_key("key-1")
+    assert exc_info.value.status_code == 503
+    
+    jwks_server.fail = False
+    jwks_server.document = {"keys": [signing_key[1]]}
+    assert await manager.get_key("key-1") is not None
+    
+    # Expired keys are served right away; the failing refetch runs behind,
+    # at most once per min_refetch_interval
+    manager.min_refetch_interval = 0.5
+    jwks_server.fail = True
+    jwks_server.delay = 0.2
+    await asyncio.sleep(0.6)
+    started = time.perf_counter()
+    for _ in range(10):
+        assert await manager.get_key("key-1") is not None
+    assert time.perf_counter() - started < 0.1
+    
+    for _ in range(50):
+        if manager._background.done():
+            break
+        await asyncio.sleep(0.02)
+    for _ in range(10):
+        assert await manager.get_key("key-1") is not None
+    assert jwks_server.requests == 3
+    await manager.stop()